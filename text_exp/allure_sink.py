@@ -0,0 +1,130 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import uuid
+
+import allure
+import allure_commons
+from allure_commons.logger import AllureFileLogger
+from attr import asdict
+
+
+# --------------------------
+# Allure结果异步写入：
+# 1. 同一步骤内的小文本附件先缓存在内存中，步骤/用例结束时合并为一个附件（少写大量小文件）
+# 2. 结果、容器、附件文件交给后台写线程落盘，不占用用例的执行时间；
+#    测试会话结束、异常中断、解释器退出时都会把队列写完，文件先写临时文件再原子替换，不会留下半个文件
+# --------------------------
+SMALL_TEXT_LIMIT = 4096    # 小于该字节数的文本附件参与合并
+
+_texts = []                # 当前步骤/用例缓存的小文本附件：[(名称, 内容)]
+_texts_lock = threading.Lock()
+
+
+def attach_text(body, name):
+    """附加文本（替代 allure.attach(文本, 名称)）：小文本先缓存，步骤/用例结束时合并写入"""
+    body = str(body)
+    if len(body.encode("utf-8")) >= SMALL_TEXT_LIMIT:
+        allure.attach(body, name, allure.attachment_type.TEXT)
+        return
+    with _texts_lock:
+        _texts.append((name, body))
+
+
+def flush_texts():
+    """把缓存的小文本合并为一个附件挂到当前步骤/用例上"""
+    with _texts_lock:
+        texts = list(_texts)
+        _texts.clear()
+    if not texts:
+        return
+    names = list(dict.fromkeys(name for name, _ in texts))
+    if len(names) == 1:
+        allure.attach("\n".join(body for _, body in texts), names[0], allure.attachment_type.TEXT)
+    else:
+        body = "\n\n".join(f"【{name}】\n{text}" for name, text in texts)
+        allure.attach(body, " / ".join(names), allure.attachment_type.TEXT)
+
+
+class _StepTextFlusher:
+    """Allure钩子：步骤结束前合并写入该步骤的小文本附件"""
+
+    @allure_commons.hookimpl(tryfirst=True)
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        flush_texts()
+
+
+step_text_flusher = _StepTextFlusher()
+
+
+class BatchedAllureFileLogger(AllureFileLogger):
+    """allure-pytest文件写入器的异步版本：写文件操作进入队列，由后台线程完成"""
+
+    def start_writer(self):
+        self._queue = queue.Queue()
+        self._errors = []
+        self._thread = threading.Thread(target=self._run, name="allure-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            file_name, data = self._queue.get()
+            try:
+                tmp_path = self._report_dir / f"{file_name}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._report_dir / file_name)
+            except OSError as e:
+                self._errors.append(f"{file_name}：{e}")
+            finally:
+                self._queue.task_done()
+
+    def _report_item(self, item):
+        # 结果对象在调用线程中序列化（之后不再依赖对象状态），写文件交给后台线程
+        data = asdict(item, filter=lambda _, v: v or v is False)
+        file_name = item.file_pattern.format(prefix=uuid.uuid4())
+        self._queue.put((file_name, json.dumps(data, ensure_ascii=False).encode("utf-8")))
+
+    @allure_commons.hookimpl
+    def report_attached_data(self, body, file_name):
+        self._queue.put((file_name, body.encode("utf-8") if isinstance(body, str) else bytes(body)))
+
+    def flush(self):
+        """等待队列中的文件全部写完"""
+        self._queue.join()
+        if self._errors:
+            errors, self._errors = self._errors, []
+            print(f"❌ Allure结果写入失败 {len(errors)} 个：\n" + "\n".join(errors))
+
+
+_logger = None
+
+
+def install():
+    """
+    把allure-pytest注册的文件写入器切换为异步版本（在allure-pytest的pytest_configure之后调用）
+    沿用同一个对象和注册名，allure-pytest退出时的清理逻辑不受影响
+    返回：异步写入器；未启用 --alluredir 时返回None
+    """
+    global _logger
+    if _logger is not None:
+        return _logger
+    for plugin in allure_commons.plugin_manager.get_plugins():
+        if type(plugin) is AllureFileLogger:
+            name = allure_commons.plugin_manager.get_name(plugin)
+            allure_commons.plugin_manager.unregister(plugin)
+            plugin.__class__ = BatchedAllureFileLogger
+            plugin.start_writer()
+            allure_commons.plugin_manager.register(plugin, name)
+            _logger = plugin
+            return plugin
+    return None
+
+
+def flush():
+    """写完所有缓存的文本和排队的文件（测试会话结束、异常中断时调用）"""
+    if _logger is not None:
+        _logger.flush()
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import case_loader
+import settings
+from step_dsl import compile_steps
+
+
+# --------------------------
+# 登录态快照：每个worker只走一次UI登录，保存Cookie/localStorage，后续用例直接注入，跳过登录点击流程
+# 快照过期（超过有效期、Cookie过期或服务端校验未登录）时自动重新登录
+# --------------------------
+_memo = {}                 # 进程内缓存：用户名 -> 登录态
+_lock = threading.Lock()
+
+
+def default_credentials():
+    """默认登录账号：取Sheet1中预期结果为“登录成功”的第一个用例的用户名/密码"""
+    for case in case_loader.load_sheet("Sheet1"):
+        if str(case.get("预期结果", "")).strip() == "登录成功":
+            plan = compile_steps(case["测试步骤"])
+            return plan.arg("input_username"), plan.arg("input_password")
+    raise LookupError("Sheet1中没有预期结果为“登录成功”的用例，无法确定登录账号")
+
+
+def _state_path(username):
+    name = hashlib.sha1(f"{settings.BASE_URL}|{username}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(settings.AUTH_STATE_DIR, f"{name}.json")
+
+
+def load_state(username):
+    try:
+        with open(_state_path(username), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(state):
+    path = _state_path(state["username"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)  # 原子替换，并行worker不会读到半个文件
+
+
+def is_expired(state, now=None):
+    """超过有效期，或任一带过期时间的Cookie已过期"""
+    now = now or time.time()
+    if now - state["captured_at"] > settings.AUTH_STATE_TTL:
+        return True
+    return any(cookie.get("expiry") and cookie["expiry"] <= now for cookie in state["cookies"])
+
+
+def validate_on_server(state):
+    """带上快照Cookie请求用户中心，未被重定向到登录页才算登录态有效（一次HTTP请求）"""
+    from http_tier import new_session  # 延迟导入
+
+    session = new_session()  # 挂在共享连接池上，用完不 close（会关闭所有会话共用的连接）
+    for cookie in state["cookies"]:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    response = session.get(settings.BASE_URL + settings.USER_CENTER_PATH, timeout=15)
+    return response.ok and settings.LOGIN_PAGE_PATH.lstrip("/") not in response.url
+
+
+def login_and_capture(shop, username, password):
+    """走一次完整登录流程并抓取登录态"""
+    shop.open(settings.BASE_URL)
+    shop.goto_login()
+    shop.input_login_username(username)
+    shop.input_login_password(password)
+    shop.submit_login()
+    if shop.current_url.rstrip("/") != settings.BASE_URL.rstrip("/"):
+        raise RuntimeError(f"账号 {username} 登录失败（当前URL：{shop.current_url}），无法生成登录态快照")
+    state = shop.export_state()
+    state.update({"username": username, "captured_at": time.time()})
+    return state
+
+
+def authenticate(shop, username=None, password=None):
+    """
+    让执行层（浏览器/纯HTTP）直接处于已登录状态
+    优先使用进程内缓存的登录态，其次磁盘快照（需通过服务端校验），都不可用时才走UI登录
+    返回：本次使用的登录态
+    """
+    if username is None:
+        username, password = default_credentials()
+    with _lock:
+        state = _memo.get(username)
+        if state is None or is_expired(state):
+            state = load_state(username)
+            if state is not None and (is_expired(state) or not validate_on_server(state)):
+                state = None
+            if state is None:
+                state = login_and_capture(shop, username, password)
+                save_state(state)
+                _memo[username] = state
+                return state  # 刚登录过，当前会话已是登录状态
+            _memo[username] = state
+    shop.import_state(state)
+    return state
+
+
+def invalidate(username=None):
+    """清除登录态快照（如用例中执行了退出登录）"""
+    username = username or default_credentials()[0]
+    with _lock:
+        _memo.pop(username, None)
+    try:
+        os.remove(_state_path(username))
+    except OSError:
+        pass
@@ -0,0 +1,97 @@
+import profiler
+import settings
+
+
+# --------------------------
+# 极速浏览器配置（--browser-profile fast，可选配置见 settings.BROWSER_PROFILES）：用例断言不关心的图片/字体/媒体/统计脚本直接屏蔽，
+# 关闭CSS过渡动画和jQuery动画，固定视口大小（不再最大化窗口，各机器上布局一致）
+# 屏蔽通过 CDP Network.setBlockedURLs 按URL通配符实现（Edge基于Chromium）；资源类型换算为对应的URL通配符
+# --------------------------
+# 资源类型 -> URL通配符
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m3u8"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*hm.baidu.com*", "*cnzz.com*",
+                  "*51.la*", "*doubleclick.net*"],
+}
+
+# 每个新文档加载时注入：去掉CSS动画/过渡，关闭jQuery动画（弹层、下拉菜单立即显示）
+_NO_ANIMATION_JS = """
+document.addEventListener('DOMContentLoaded', () => {
+    const style = document.createElement('style');
+    style.textContent = '*, *::before, *::after { animation: none !important; transition: none !important;'
+        + ' scroll-behavior: auto !important; caret-color: transparent !important; }';
+    document.head.appendChild(style);
+    if (window.jQuery) { window.jQuery.fx.off = true; }
+});
+"""
+
+
+def _split(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def blocked_url_patterns():
+    """按配置的资源类型和自定义通配符生成屏蔽列表"""
+    patterns = []
+    for resource_type in _split(settings.BLOCK_RESOURCE_TYPES):
+        if resource_type not in RESOURCE_TYPE_PATTERNS:
+            raise ValueError(f"未知的资源类型：{resource_type}（可选：{', '.join(RESOURCE_TYPE_PATTERNS)}）")
+        patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+    patterns.extend(_split(settings.BLOCK_URL_PATTERNS))
+    return list(dict.fromkeys(patterns))
+
+
+def viewport_size():
+    width, height = (int(value) for value in settings.VIEWPORT_SIZE.split(","))
+    return width, height
+
+
+def apply_options(options):
+    """启动参数：固定窗口大小、减少动态效果；屏蔽图片时同时关闭图片加载（覆盖没有扩展名的图片地址）"""
+    width, height = viewport_size()
+    options.add_argument(f"--window-size={width},{height}")
+    options.add_argument("--force-prefers-reduced-motion")
+    if "image" in _split(settings.BLOCK_RESOURCE_TYPES):
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+
+def apply_session(driver):
+    """会话创建后通过CDP设置：屏蔽URL、固定视口、关闭动画（对该会话后续所有页面生效）"""
+    width, height = viewport_size()
+    driver.set_window_size(width, height)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns()})
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride",
+                           {"width": width, "height": height, "deviceScaleFactor": 1, "mobile": False})
+    driver.execute_cdp_cmd("Emulation.setEmulatedMedia",
+                           {"features": [{"name": "prefers-reduced-motion", "value": "reduce"}]})
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _NO_ANIMATION_JS})
+
+
+def _size(value):
+    return f"{value / 1024:.0f}KB" if value < 1024 * 1024 else f"{value / 1024 / 1024:.1f}MB"
+
+
+def _saved(before, after):
+    return f"-{(before - after) / before:.0%}" if before else "-"
+
+
+def savings_summary(saved_path, baseline_runs=5):
+    """
+    本次运行（极速配置）与最近几次默认配置运行对比：相同页面的平均加载耗时和平均传输量
+    数据来自耗时剖析（.profile），没有剖析数据或基准时返回提示文本
+    """
+    current = profiler.load_run(saved_path)
+    baselines = [run for run in profiler.load_runs() if run.get("browser_profile", "default") == "default"]
+    baselines = baselines[-baseline_runs:]
+    if not baselines:
+        return "极速浏览器配置：暂无默认配置的基准数据（用 --browser-profile default 运行一次后即可对比节省量）"
+    savings = profiler.page_savings([current], baselines)
+    if savings is None:
+        return "极速浏览器配置：本次访问的页面在基准运行中没有记录，无法对比"
+    (load_before, load_after), (bytes_before, bytes_after) = savings["load"], savings["bytes"]
+    return (f"极速浏览器配置节省：页面平均加载 {load_before:.0f}ms → {load_after:.0f}ms（{_saved(load_before, load_after)}），"
+            f"平均传输 {_size(bytes_before)} → {_size(bytes_after)}（{_saved(bytes_before, bytes_after)}）；"
+            f"对比最近 {len(baselines)} 次默认配置运行中的 {savings['pages']} 个相同页面")
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+import case_loader
+import settings
+from case_loader import ID_COLUMN, filter_records
+
+
+# --------------------------
+# 用例发现插件：收集阶段以只读流式方式逐行读取Excel（不整表加载），按工作表生成参数化用例（含矩阵展开出的用例）；
+# 收集到Excel用例后、执行之前对整本Excel做预检（preflight.py：校验、规整、展开数据矩阵），
+# 预检结论按Excel版本缓存，未通过时直接报错退出，不会启动浏览器
+# 用法：@pytest.mark.excel_cases("Sheet1") 标记的测试函数，会按工作表中的每个用例ID生成一个用例（参数名 case_id）
+# --------------------------
+def iter_sheet_rows(sheet_name, excel_path=None):
+    """
+    生成器：逐行读取工作表（openpyxl只读模式，不整表加载）
+    按预检的同一套规则规整（case_loader.normalize_rows）：空行跳过、空单元格向下填充（预算列只在本用例内）、
+    无ID行跳过、按用例ID去重、测试步骤中的 {a|b} 展开为多个用例（用例ID加 -序号 后缀）
+    """
+    from openpyxl import load_workbook  # 延迟导入，仅收集用例时需要
+
+    workbook = load_workbook(excel_path or settings.EXCEL_PATH, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = [str(col) if col is not None else "" for col in next(rows, ())]
+        for _, record in case_loader.normalize_rows(header, rows):
+            yield record
+    finally:
+        workbook.close()
+
+
+def iter_cases(sheet_name, prefixes=None, modules=None, priorities=None, excel_path=None):
+    """生成器：按用例ID前缀、模块、优先级过滤后的用例（任一条件为空表示不过滤）"""
+    yield from filter_records(iter_sheet_rows(sheet_name, excel_path), prefixes, modules, priorities)
+
+
+def _split_option(value):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+
+# --------------------------
+# pytest插件钩子
+# --------------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("excel_cases", "Excel用例筛选")
+    group.addoption("--case-prefix", default=os.environ.get("CASE_PREFIX"),
+                    help="只执行用例ID以指定前缀开头的用例（逗号分隔多个），如 Login-,Search-")
+    group.addoption("--case-module", default=os.environ.get("CASE_MODULE"),
+                    help="只执行“模块”列为指定值的用例（逗号分隔多个），如 登录,注册")
+    group.addoption("--case-priority", default=os.environ.get("CASE_PRIORITY"),
+                    help="只执行“优先级”列为指定值的用例（逗号分隔多个），如 P0,P1")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "excel_cases(sheet): 按Excel工作表中的用例ID参数化 case_id")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    收集到Excel用例时预检整本Excel（Excel未修改时直接使用缓存的预检结论），在其他插件按用例读取Excel之前执行
+    没有收集到Excel用例（如只运行单元测试）时不预检，也不要求Excel存在
+    """
+    if not any(item.get_closest_marker("excel_cases") for item in items):
+        return
+    try:
+        case_loader.preflight_workbook()
+    except ValueError as e:  # preflight.CaseValidationError：捕获基类，预检结论有缓存时不必导入pandas
+        raise pytest.UsageError(str(e)) from None
+    except OSError as e:
+        raise pytest.UsageError(f"❌ 无法读取用例Excel：{e}") from None
+
+
+def pytest_generate_tests(metafunc):
+    marker = metafunc.definition.get_closest_marker("excel_cases")
+    if marker is None or "case_id" not in metafunc.fixturenames:
+        return
+    sheet_name = marker.args[0] if marker.args else marker.kwargs["sheet"]
+    config = metafunc.config
+    # 只保留用例ID（字符串），用例内容在执行时按ID从公共加载层取，收集阶段内存占用很小
+    case_ids = (str(record[ID_COLUMN]) for record in iter_cases(
+        sheet_name,
+        prefixes=_split_option(config.getoption("case_prefix")),
+        modules=_split_option(config.getoption("case_module")),
+        priorities=_split_option(config.getoption("case_priority")),
+    ))
+    metafunc.parametrize("case_id", list(case_ids))
@@ -0,0 +1,276 @@
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+
+import settings
+
+
+# --------------------------
+# 公共用例加载层：每个Excel只解析一次，解析结果缓存到磁盘，并按“用例 ID”建立索引
+# --------------------------
+ID_COLUMN = "用例 ID"
+MODULE_COLUMN = "模块"
+PRIORITY_COLUMN = "优先级"
+STEPS_COLUMN = "测试步骤"
+# 可选的性能预算列（perf_budget.py）：每个用例各自的值，只在本用例的续行内向下填充
+PAGE_BUDGET_COLUMN = "页面加载预算(ms)"
+STEP_BUDGET_COLUMN = "步骤耗时预算(ms)"
+CASE_ONLY_COLUMNS = (PAGE_BUDGET_COLUMN, STEP_BUDGET_COLUMN)
+CACHE_VERSION = 4
+# 数据矩阵占位：{值1|值2|...}（预检和收集阶段的流式读取都按它展开用例）
+MATRIX_PATTERN = r"\{[^{}]*\|[^{}]*\}"
+_MATRIX_SPLIT = re.compile(r"\{([^{}]*\|[^{}]*)\}")
+
+_memo = {}                 # 进程内缓存：Excel绝对路径 -> (文件指纹, {工作表名: CaseSheet})
+_lock = threading.Lock()
+
+
+class CaseSheet:
+    """
+    单个工作表的用例集合（已清洗：向下填充空值、去掉无ID行、按用例ID去重）
+    - records：用例字典列表（保持Excel中的顺序）
+    - get(case_id)：按用例ID直接取用例（字典索引，O(1)）
+    """
+
+    def __init__(self, name, columns, rows):
+        self.name = name
+        self.columns = columns
+        self.records = [dict(zip(columns, row)) for row in rows]
+        self.index = {str(record[ID_COLUMN]): record for record in self.records}
+
+    def get(self, case_id):
+        try:
+            return self.index[case_id]
+        except KeyError:
+            raise KeyError(f"工作表 {self.name} 中不存在用例：{case_id}") from None
+
+    def ids(self):
+        return list(self.index)
+
+    def require(self, columns):
+        """检查必要列是否存在"""
+        missing_cols = [col for col in columns if col not in self.columns]
+        if missing_cols:
+            raise KeyError(f"Excel缺少必要列：{', '.join(missing_cols)}")
+        return self
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def expand_text(text):
+    """把步骤文本中的 {a|b} 占位按笛卡尔积展开为多段步骤文本"""
+    parts = _MATRIX_SPLIT.split(text)
+    # split 后奇数位是占位内容，偶数位是普通文本
+    choices = [[part] if index % 2 == 0 else part.split("|") for index, part in enumerate(parts)]
+    return ["".join(combination) for combination in itertools.product(*choices)]
+
+
+def clean_value(value):
+    """字符串单元格去掉首尾空白并统一换行符（其他值原样返回）"""
+    return value.replace("\r\n", "\n").strip() if isinstance(value, str) else value
+
+
+def normalize_rows(header, rows, duplicates=None):
+    """
+    生成器：逐行规整工作表（预检 preflight.check_sheet 和收集阶段的流式读取共用同一套规则）
+    - 字符串单元格去掉首尾空白、统一换行符；整行为空的行跳过
+    - 空单元格（None）沿用上一行的值（合并单元格）；性能预算列只在本用例的续行内沿用
+    - 没有用例ID的行跳过；同一用例ID只保留第一行（duplicates 为集合时，记入重复ID所在的行位置，含首次出现的行）
+    - 测试步骤中的 {a|b} 按笛卡尔积展开为多个用例，用例ID依次加后缀 -1、-2...
+    产出：（行位置, 用例字典），行位置从0开始、不含表头（Excel行号 = 行位置 + 2）
+    """
+    id_index = header.index(ID_COLUMN) if ID_COLUMN in header else None
+    case_only = [column in CASE_ONLY_COLUMNS for column in header]
+    last = [None] * len(header)
+    first_rows = {}            # 用例ID -> 首次出现的行位置
+    for position, row in enumerate(rows):
+        row = [clean_value(value) for value in row[:len(header)]]
+        if all(value is None for value in row):
+            continue
+        row += [None] * (len(header) - len(row))
+        new_case = id_index is not None and row[id_index] not in (None, "")
+        last = [value if value is not None else (None if new_case and case_only[i] else last[i])
+                for i, value in enumerate(row)]
+        record = dict(zip(header, last))
+        case_id = record.get(ID_COLUMN)
+        if case_id in (None, ""):
+            continue
+        if case_id in first_rows:
+            if new_case and duplicates is not None:
+                duplicates.update((first_rows[case_id], position))
+            continue
+        first_rows[case_id] = position
+        steps = record.get(STEPS_COLUMN)
+        if isinstance(steps, str) and _MATRIX_SPLIT.search(steps):
+            for number, text in enumerate(expand_text(steps), 1):
+                yield position, {**record, ID_COLUMN: f"{case_id}-{number}", STEPS_COLUMN: text}
+        else:
+            yield position, record
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_path(excel_path):
+    name = hashlib.sha1(excel_path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(settings.CASE_CACHE_DIR, f"{name}.json.gz")
+
+
+def _check_path(excel_path):
+    """预检结论（只有指纹和问题清单，不含用例数据）：会话开始时据此判断是否需要重新预检"""
+    return _cache_path(excel_path)[:-len(".json.gz")] + ".check.json"
+
+
+def _parse_workbook(excel_path):
+    """
+    解析整个Excel（一次读取全部工作表），经预检校验、规整并展开数据矩阵（preflight.py）
+    返回：（{工作表名: {"columns": [...], "rows": [[...], ...]}}，问题记录列表）
+    """
+    import preflight  # 仅缓存失效时才需要pandas
+
+    frames, errors = preflight.run(preflight.read_workbook(excel_path))
+    sheets = {}
+    for sheet_name, df in frames.items():
+        df = df.astype(object).where(df.notna(), None)
+        sheets[sheet_name] = {
+            "columns": [str(col) for col in df.columns],
+            "rows": df.values.tolist(),
+        }
+    return sheets, errors
+
+
+def _read_cache(cache_path):
+    try:
+        with gzip.open(cache_path, "rt", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if cache.get("version") == CACHE_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_path, cache, check_path=None):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(",", ":"), default=str)
+    os.replace(tmp_path, cache_path)  # 原子替换，并发进程不会读到半个文件
+    if check_path:
+        check = {key: cache[key] for key in ("version", "fingerprint", "sha1", "errors")}
+        with open(f"{check_path}.{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+            json.dump(check, f, ensure_ascii=False, default=str)
+        os.replace(f"{check_path}.{os.getpid()}.tmp", check_path)
+
+
+def _current_cache(excel_path, fingerprint):
+    """与Excel当前内容一致的解析缓存（缓存失效时重新解析并预检）；调用方持有 _lock"""
+    cache_path = _cache_path(excel_path)
+    cache = _read_cache(cache_path)
+    if cache and cache["fingerprint"] != fingerprint:
+        # 修改时间变了但内容没变（如复制/检出），更新指纹后继续使用缓存
+        if cache["sha1"] == _file_sha1(excel_path):
+            cache["fingerprint"] = fingerprint
+            _write_cache(cache_path, cache, _check_path(excel_path))
+        else:
+            cache = None
+    if cache is None:
+        sheets, errors = _parse_workbook(excel_path)
+        cache = {
+            "version": CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "sha1": _file_sha1(excel_path),
+            "sheets": sheets,
+            "errors": errors,
+        }
+        _write_cache(cache_path, cache, _check_path(excel_path))
+    return cache
+
+
+def _fingerprint(excel_path):
+    stat = os.stat(excel_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def preflight_workbook(excel_path=None):
+    """
+    预检整本Excel（每个Excel版本只做一次）：预检结论与指纹一致时直接使用，不读取用例数据
+    预检未通过时抛出 preflight.CaseValidationError（ValueError子类）
+    """
+    excel_path = os.path.abspath(excel_path or settings.EXCEL_PATH)
+    fingerprint = _fingerprint(excel_path)
+    with _lock:
+        try:
+            with open(_check_path(excel_path), encoding="utf-8") as f:
+                check = json.load(f)
+        except (OSError, ValueError):
+            check = None
+        if not check or check.get("version") != CACHE_VERSION or check["fingerprint"] != fingerprint:
+            check = _current_cache(excel_path, fingerprint)
+    if check["errors"]:
+        from preflight import CaseValidationError  # 仅预检未通过时才需要
+
+        raise CaseValidationError(check["errors"])
+
+
+def load_workbook(excel_path=None):
+    """
+    加载整个Excel的全部工作表
+    优先级：进程内缓存 -> 磁盘缓存（mtime+大小一致，或内容哈希一致） -> 重新解析（含预检）
+    预检未通过时抛出 preflight.CaseValidationError（ValueError子类）
+    返回：{工作表名: CaseSheet}
+    """
+    excel_path = os.path.abspath(excel_path or settings.EXCEL_PATH)
+    fingerprint = _fingerprint(excel_path)
+
+    with _lock:
+        memo = _memo.get(excel_path)
+        if memo and memo[0] == fingerprint:
+            return memo[1]
+
+        cache = _current_cache(excel_path, fingerprint)
+        # 预检结果同样缓存：有问题的Excel在修改之前每次加载都直接报错，不会启动浏览器
+        if cache["errors"]:
+            from preflight import CaseValidationError  # 仅预检未通过时才需要
+
+            raise CaseValidationError(cache["errors"])
+
+        sheets = {name: CaseSheet(name, data["columns"], data["rows"]) for name, data in cache["sheets"].items()}
+        _memo[excel_path] = (fingerprint, sheets)
+        return sheets
+
+
+def load_sheet(sheet_name, excel_path=None):
+    """加载单个工作表的用例"""
+    sheets = load_workbook(excel_path)
+    if sheet_name not in sheets:
+        raise KeyError(f"Excel中不存在工作表：{sheet_name}")
+    return sheets[sheet_name]
+
+
+def get_case(sheet_name, case_id, excel_path=None):
+    """按用例ID获取单条用例（字典）"""
+    return load_sheet(sheet_name, excel_path).get(case_id)
+
+
+def filter_records(records, prefixes=None, modules=None, priorities=None):
+    """生成器：按用例ID前缀、模块、优先级过滤用例（任一条件为空表示不过滤）"""
+    for record in records:
+        if prefixes and not str(record[ID_COLUMN]).startswith(tuple(prefixes)):
+            continue
+        if modules and str(record.get(MODULE_COLUMN)) not in modules:
+            continue
+        if priorities and str(record.get(PRIORITY_COLUMN)) not in priorities:
+            continue
+        yield record
@@ -0,0 +1,239 @@
+import os
+import sys
+
+import allure_commons
+import pytest
+
+import allure_sink
+import auth_state
+import browser_profile
+import driver_pool
+import locators
+import parallel_runner
+import profiler
+import screenshots
+import settings
+from shop_flows import BrowserShopFlow
+from step_dsl import compile_steps
+from waits import SmartWait
+
+# Excel用例发现插件（按工作表流式生成参数化用例）、增量执行插件（只跑有变化/上次失败的用例）、
+# 失败重试与隔离插件（只重试瞬时错误，隔离长期不稳定的用例）、性能预算插件（Excel中的页面加载/步骤耗时预算）
+pytest_plugins = ["case_discovery", "run_state", "retry_policy", "perf_budget"]
+
+
+def pytest_addoption(parser):
+    parser.addoption("--screenshots", default=settings.SCREENSHOT_MODE, choices=settings.SCREENSHOT_MODES,
+                     help="截图策略：all=每步，first_last=首张和最后一张，failure=仅失败时，off=不截图")
+    parser.addoption("--tier", default=settings.EXEC_TIER, choices=settings.EXEC_TIERS,
+                     help="执行层级：browser=完整浏览器，headless=无头浏览器，http=纯HTTP（仅登录/注册用例）")
+    parser.addoption("--allure-sync-writer", action="store_true", default=not settings.ALLURE_ASYNC_WRITER,
+                     help="Allure结果同步写入（默认由后台线程异步写入）")
+    parser.addoption("--base-url", default=settings.BASE_URL,
+                     help="被测商城地址（Excel步骤中的原站点地址会替换为该地址）")
+    parser.addoption("--mock-shop", action="store_true", default=False,
+                     help="启动本地商城替身（mock_shop.py）并以它为被测地址，离线运行用例")
+    parser.addoption("--browser-profile", default=settings.BROWSER_PROFILE, choices=settings.BROWSER_PROFILES,
+                     help="浏览器配置：default=原样加载，fast=屏蔽图片/字体/媒体/统计脚本、关闭动画、固定视口")
+    parser.addoption("--fake-driver", action="store_true", default=settings.FAKE_DRIVER,
+                     help="使用进程内假驱动代替Edge（没有浏览器延迟，用于测量测试框架自身的开销）")
+    parser.addoption("--no-profile", action="store_true", default=not settings.PROFILE_ENABLED,
+                     help="不记录步骤/命令/等待/页面耗时（默认记录到 .profile 目录）")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    settings.EXEC_TIER = config.getoption("tier")
+    settings.SCREENSHOT_MODE = config.getoption("screenshots")
+    settings.PROFILE_ENABLED = not config.getoption("no_profile")
+    settings.BROWSER_PROFILE = config.getoption("browser_profile")
+    settings.FAKE_DRIVER = config.getoption("fake_driver")
+    settings.BASE_URL = config.getoption("base_url").rstrip("/")
+    if config.getoption("mock_shop"):
+        import mock_shop  # 延迟导入，只有离线运行时才需要
+
+        config._mock_shop = mock_shop.start()
+        settings.BASE_URL = config._mock_shop.base_url
+    compile_steps.cache_clear()  # 步骤中的站点地址按新的被测地址重新替换
+    # 记录当前步骤（截图附件按步骤命名，用例结束时统一附加），步骤结束时合并写入小文本附件，并记录步骤耗时
+    for flusher in (screenshots.step_tracker, allure_sink.step_text_flusher, profiler.step_timer):
+        if not allure_commons.plugin_manager.is_registered(flusher):
+            allure_commons.plugin_manager.register(flusher)
+    # allure-pytest的结果写入器已注册（trylast），切换为后台线程异步写入
+    if not config.getoption("allure_sync_writer"):
+        allure_sink.install()
+
+
+def pytest_unconfigure(config):
+    if getattr(config, "_mock_shop", None) is not None:
+        config._mock_shop.stop()
+    for flusher in (screenshots.step_tracker, allure_sink.step_text_flusher, profiler.step_timer):
+        if allure_commons.plugin_manager.is_registered(flusher):
+            allure_commons.plugin_manager.unregister(flusher)
+
+
+# 准备/主体/清理三个阶段结束时（含异常），都把未归属步骤的小文本附件合并挂到当前用例上，
+# Fixture准备/清理中附加的文本不会留在缓存里、被挂到下一个用例
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    yield
+    allure_sink.flush_texts()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    yield
+    allure_sink.flush_texts()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    yield
+    allure_sink.flush_texts()
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session):
+    """测试会话结束时等待Allure结果全部落盘，保存本次运行的耗时剖析数据和成功的定位方式，关闭HTTP连接池"""
+    allure_sink.flush()
+    profiler.save_run()
+    locators.registry.save()
+    http_tier = sys.modules.get("http_tier")  # 只有用到纯HTTP层/登录态校验时才会导入
+    if http_tier is not None:
+        http_tier.close_shared_adapter()
+
+
+def pytest_keyboard_interrupt(excinfo):
+    allure_sink.flush()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """把各阶段的测试报告挂到用例上（rep_setup/rep_call/rep_teardown），供Fixture判断用例是否失败"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
+@pytest.fixture(autouse=True)
+def step_profile(request):
+    """用例级耗时剖析：记录步骤、WebDriver命令、等待和页面加载耗时（--no-profile 关闭）"""
+    recorder = profiler.start_case(request.node.nodeid)
+    yield recorder
+    profiler.finish_case(recorder)
+
+
+# --------------------------
+# 浏览器会话Fixture（readexcel02/03/04 共用驱动池）
+# --------------------------
+@pytest.fixture(scope="session")
+def browser_pool():
+    """会话级驱动池：整个测试会话共享，结束时关闭所有空闲浏览器"""
+    pool = driver_pool.get_default_pool()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def screenshot_recorder():
+    """用例级截图记录器：按截图策略截图，用例结束时等待编码完成并把截图附加到报告"""
+    recorder = screenshots.start_case()
+    yield recorder
+    screenshots.finish_case(recorder)
+
+
+@pytest.fixture
+def driver(browser_pool, screenshot_recorder, request):
+    """
+    用例级浏览器Fixture：从驱动池借出会话，用例结束后清理Cookie/存储并归还
+    用例失败且还没有失败截图时（如仅失败截图策略），归还前补一张失败截图
+    因瞬时错误（超时/元素失效/驱动崩溃）失败时丢弃该会话，重试时借出新会话
+    """
+    session = browser_pool.acquire()
+    profiler.attach_driver(session)
+    yield session
+    report = getattr(request.node, "rep_call", None)
+    if report is not None and report.failed and not screenshot_recorder.failure_captured:
+        screenshot_recorder.capture(session, "失败时页面截图", force=True)
+    profiler.before_release(session)
+    # 瞬时错误分类由重试插件标注在报告上（retry_policy.classify）
+    broken = report is not None and report.failed and getattr(report, "transient", None) is not None
+    browser_pool.release(session, broken=broken)
+
+
+@pytest.fixture
+def waiter(driver):
+    """用例级等待引擎：按条件等待并记录耗时，用例结束时把等待统计附加到报告"""
+    smart_wait = SmartWait(driver)
+    yield smart_wait
+    smart_wait.attach()
+    profiler.record_waits(smart_wait.records)
+
+
+@pytest.fixture
+def shop(request):
+    """
+    登录/注册用例的执行层：按 --tier 选择浏览器（含无头）或纯HTTP
+    纯HTTP层不会借出浏览器会话
+    """
+    if settings.EXEC_TIER == "http":
+        from http_tier import HttpShopFlow  # 延迟导入，浏览器层不需要requests
+
+        flow = HttpShopFlow()
+        yield flow
+        flow.close()
+    else:
+        yield BrowserShopFlow(request.getfixturevalue("driver"), request.getfixturevalue("waiter"))
+
+
+@pytest.fixture
+def logged_in_shop(shop):
+    """
+    已登录的执行层：注入登录态快照（每个worker只真正登录一次），省去首页->登录链接->输入->提交的UI流程
+    """
+    auth_state.authenticate(shop)
+    yield shop
+
+
+def pytest_terminal_summary(terminalreporter):
+    if driver_pool.default_pool_created():
+        terminalreporter.write_line(f"ℹ️ {driver_pool.get_default_pool().summary()}")
+    if screenshots.totals["captured"]:
+        terminalreporter.write_line(f"ℹ️ {screenshots.summary()}")
+    if profiler.last_saved:
+        terminalreporter.write_line(f"ℹ️ 耗时剖析已保存：{profiler.last_saved}（python profiler.py 查看最慢步骤/定位器/页面）")
+        if settings.BROWSER_PROFILE == "fast" and driver_pool.default_pool_created():
+            terminalreporter.write_line(f"🚀 {browser_profile.savings_summary(profiler.last_saved)}")
+
+
+# --------------------------
+# 并行执行支持（parallel_runner.py 启动的worker进程）
+# --------------------------
+def pytest_collection_modifyitems(config, items):
+    """worker进程只执行分配给自己的用例，并保持分配顺序"""
+    case_file = os.environ.get(parallel_runner.ENV_CASE_FILE)
+    if not case_file:
+        return
+    with open(case_file, encoding="utf-8") as f:
+        order = {line.strip(): index for index, line in enumerate(f) if line.strip()}
+    selected = [item for item in items if item.nodeid in order]
+    deselected = [item for item in items if item.nodeid not in order]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = sorted(selected, key=lambda item: order[item.nodeid])
+
+
+def _write_progress(event, nodeid):
+    progress_file = os.environ.get(parallel_runner.ENV_PROGRESS_FILE)
+    if progress_file:
+        # 每条记录立即落盘，worker中途崩溃时也能准确判断用例归属
+        with open(progress_file, "a", encoding="utf-8") as f:
+            f.write(f"{event}\t{nodeid}\n")
+
+
+def pytest_runtest_logstart(nodeid, location):
+    _write_progress("start", nodeid)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    _write_progress("done", nodeid)
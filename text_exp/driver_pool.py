@@ -0,0 +1,195 @@
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.edge.service import Service
+
+import browser_profile
+import settings
+
+
+def create_edge_driver():
+    """
+    冷启动一个Edge浏览器（与各用例原先的启动方式一致；执行层级为headless时使用无头模式）
+    浏览器配置为fast时按极速配置启动（屏蔽资源、关闭动画、固定视口）
+    返回：WebDriver实例
+    """
+    service = Service(executable_path=settings.EDGE_DRIVER_PATH)
+    options = webdriver.EdgeOptions()
+    headless = settings.EXEC_TIER == "headless"
+    fast = settings.BROWSER_PROFILE == "fast"
+    if fast:
+        browser_profile.apply_options(options)
+    if headless:
+        options.add_argument("--headless=new")
+        if not fast:
+            options.add_argument(f"--window-size={settings.HEADLESS_WINDOW_SIZE}")
+    driver = webdriver.Edge(service=service, options=options)
+    if fast:
+        browser_profile.apply_session(driver)
+    elif not headless:
+        driver.maximize_window()  # 最大化窗口，避免元素定位受分辨率影响
+    return driver
+
+
+def create_driver():
+    """按配置创建浏览器会话：--fake-driver 时为进程内假驱动（测量测试框架自身开销，没有浏览器延迟）"""
+    if settings.FAKE_DRIVER:
+        import fake_driver  # 延迟导入，只有基准测试时才需要
+
+        return fake_driver.create_fake_driver()
+    return create_edge_driver()
+
+
+def is_healthy(driver):
+    """健康检查：会话仍存活且能执行脚本才视为可复用"""
+    try:
+        driver.window_handles
+        return driver.execute_script("return 1") == 1
+    except WebDriverException:
+        return False
+
+
+def reset_session(driver):
+    """
+    用例之间清理浏览器状态：关闭多余窗口、关闭弹窗、清空Cookie和本地存储，最后回到空白页
+    清理失败会抛出 WebDriverException，由调用方回收该会话
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    try:
+        driver.switch_to.alert.dismiss()
+    except WebDriverException:
+        pass  # 没有弹窗
+    driver.delete_all_cookies()
+    # about:blank 等页面访问 storage 会抛 SecurityError，需在脚本内兜底
+    driver.execute_script(
+        "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+    )
+    driver.implicitly_wait(0)  # 恢复默认，由各用例按需设置
+    driver.get("about:blank")
+
+
+class DriverPool:
+    """
+    浏览器会话池：用例从池中借出会话，结束后清理归还，避免每个用例冷启动浏览器
+    - 借出前做健康检查，失效会话直接丢弃
+    - 会话使用次数达到 max_uses 或清理失败（崩溃）时回收重建
+    """
+
+    def __init__(self, factory=create_driver, max_uses=None, max_idle=None):
+        self._factory = factory
+        self.max_uses = max_uses or settings.DRIVER_POOL_MAX_USES
+        self.max_idle = max_idle or settings.DRIVER_POOL_MAX_IDLE
+        self._idle = []   # 空闲会话
+        self._uses = {}   # id(driver) -> 已执行用例数
+        self._lock = threading.Lock()
+        # 统计信息（用于报告节省的冷启动次数）
+        self.cold_starts = 0
+        self.checkouts = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    def acquire(self):
+        """借出一个可用会话（优先复用空闲会话，否则冷启动）"""
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                break
+            if is_healthy(driver):
+                with self._lock:
+                    self.checkouts += 1
+                return driver
+            self._discard(driver)
+            with self._lock:
+                self.crashed += 1
+
+        driver = self._factory()
+        with self._lock:
+            self.cold_starts += 1
+            self.checkouts += 1
+            self._uses[id(driver)] = 0
+        return driver
+
+    def release(self, driver, broken=False):
+        """
+        归还会话：清理状态后放回池中；已损坏、超过复用次数或池已满时直接回收
+        :param broken: 调用方已确认会话异常（如驱动崩溃）时传True
+        """
+        with self._lock:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+        if broken or not is_healthy(driver):
+            with self._lock:
+                self.crashed += 1
+            self._discard(driver)
+            return
+        if uses >= self.max_uses:
+            with self._lock:
+                self.recycled += 1
+            self._discard(driver)
+            return
+        try:
+            reset_session(driver)
+        except WebDriverException:
+            with self._lock:
+                self.crashed += 1
+            self._discard(driver)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(driver)
+                return
+        self._discard(driver)
+
+    @contextmanager
+    def session(self):
+        """上下文管理器形式借用会话：with pool.session() as driver: ..."""
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass  # 会话已失效，忽略关闭异常
+
+    def close(self):
+        """关闭池内全部空闲会话（测试会话结束时调用）"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    @property
+    def saved_cold_starts(self):
+        return self.checkouts - self.cold_starts
+
+    def summary(self):
+        return (f"驱动池统计：借出 {self.checkouts} 次，冷启动 {self.cold_starts} 次，"
+                f"节省冷启动 {self.saved_cold_starts} 次（回收 {self.recycled} 次，异常丢弃 {self.crashed} 次）")
+
+
+# 进程级默认驱动池（每个pytest进程一个）
+_default_pool = None
+
+
+def get_default_pool():
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = DriverPool()
+    return _default_pool
+
+
+def default_pool_created():
+    return _default_pool is not None
@@ -0,0 +1,305 @@
+import base64
+import hashlib
+import struct
+import threading
+import zlib
+from urllib.parse import parse_qs, urlsplit
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+
+import locators
+import mock_shop
+import settings
+
+
+# --------------------------
+# 进程内假驱动（--fake-driver）：替换的是WebDriver协议层（command_executor），
+# Selenium客户端、定位器注册表、等待引擎、耗时剖析、截图编码等测试框架代码全部照常执行，只是没有浏览器和网络延迟
+# 页面按商城替身（mock_shop）的页面结构建模：元素按定位器注册表中的定位方式识别，登录/注册/搜索的业务规则直接调用商城替身
+# 用于测量测试框架自身的开销（harness_bench.py），不用于验证被测系统
+# --------------------------
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+WINDOW_HANDLE = "fake-window"
+SCREENSHOT_SIZE = (1366, 768)
+
+# 页面 -> 页面上的元素（所有页面都有顶部导航、搜索框和搜索结果区域，与商城替身的页面模板一致）
+_COMMON_ELEMENTS = ("nav.login_link", "nav.register_link", "search.input", "search.button", "search.results")
+PAGE_ELEMENTS = {
+    "blank": (),
+    "home": _COMMON_ELEMENTS,
+    "login": _COMMON_ELEMENTS + ("login.username", "login.password", "login.submit"),
+    "register": _COMMON_ELEMENTS + ("register.username", "register.password", "register.agreement",
+                                    "register.submit"),
+    "search": _COMMON_ELEMENTS,
+    "user": _COMMON_ELEMENTS,
+}
+# 路由（?s=...） -> 页面
+ROUTES = {
+    "": "home",
+    "index/index.html": "home",
+    "user/logininfo.html": "login",
+    "user/reginfo.html": "register",
+    "search/index.html": "search",
+    "user/index.html": "user",
+}
+
+_shop = None
+_shop_lock = threading.Lock()
+
+
+def shop():
+    """进程内共享的商城业务逻辑（账号、会话、商品），只调用其业务方法，不启动HTTP服务"""
+    global _shop
+    with _shop_lock:
+        if _shop is None:
+            _shop = mock_shop.MockShop(port=0)
+            _shop.server.server_close()  # 不对外提供服务，立即释放端口
+        return _shop
+
+
+def _w3c_locator(by, value):
+    """与Selenium客户端相同的定位方式转换（W3C协议只支持CSS/XPath/链接文本）"""
+    if by == By.ID:
+        return By.CSS_SELECTOR, f'[id="{value}"]'
+    if by == By.NAME:
+        return By.CSS_SELECTOR, f'[name="{value}"]'
+    if by == By.CLASS_NAME:
+        return By.CSS_SELECTOR, f".{value}"
+    if by == By.TAG_NAME:
+        return By.CSS_SELECTOR, value
+    return by, value
+
+
+# 定位方式 -> 元素名
+LOCATOR_NAMES = {_w3c_locator(by, value): name for name, candidates in locators.LOCATORS.items()
+                 for by, value in candidates}
+
+
+def _png(width, height, seed):
+    """生成截图（纯色背景 + 随页面变化的色带，相同页面的截图相同，便于截图去重照常工作）"""
+    digest = hashlib.md5(seed.encode("utf-8")).digest()
+    background, band = bytes(digest[0:3]), bytes(digest[3:6])
+    band_top = digest[6] * height // 256
+    plain = b"\x00" + background * width
+    banded = b"\x00" + band * width
+    raw = b"".join(banded if band_top <= y < band_top + height // 8 else plain for y in range(height))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+def _error(error, message):
+    return {"status": error, "value": {"error": error, "message": message, "stacktrace": ""}}
+
+
+class FakeBrowser:
+    """假浏览器：实现WebDriver协议命令（execute），状态为当前页面、表单输入、Cookie"""
+
+    _screenshots = {}          # 页面 -> base64截图（所有假浏览器共用）
+
+    def __init__(self):
+        self.url = "about:blank"
+        self.page = "blank"
+        self.generation = 0    # 每次导航加1，旧页面的元素引用随之失效
+        self.fields = {}       # 元素名 -> 输入值
+        self.agreed = False
+        self.tips = ""
+        self.products = []
+        self.cookies = []
+        self.commands = 0
+
+    # ---- 页面 ----
+    def _origin(self):
+        parts = urlsplit(self.url if self.url.startswith("http") else settings.BASE_URL)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def navigate(self, url):
+        parts = urlsplit(url)
+        self.generation += 1
+        self.fields, self.agreed, self.tips, self.products = {}, False, "", []
+        if not parts.scheme.startswith("http"):
+            self.url, self.page = url, "blank"
+            return
+        query = parse_qs(parts.query)
+        page = ROUTES.get(query.get("s", [""])[0], "home")
+        if page == "user" and not self._session_user():
+            url, page = f"{parts.scheme}://{parts.netloc}{settings.LOGIN_PAGE_PATH}", "login"
+        if page == "search":
+            self.products = shop().search_page(query.get("wd", [""])[0], 1)[0]
+        self.url, self.page = url, page
+
+    def _session_user(self):
+        token = next((c["value"] for c in self.cookies if c["name"] == mock_shop.SESSION_COOKIE), None)
+        return shop().sessions.get(token)
+
+    def _login_session(self, token):
+        self.cookies = [c for c in self.cookies if c["name"] != mock_shop.SESSION_COOKIE]
+        self.cookies.append({"name": mock_shop.SESSION_COOKIE, "value": token, "path": "/", "httpOnly": True})
+
+    def _elements(self):
+        names = list(PAGE_ELEMENTS[self.page])
+        if self.page == "search":
+            names.append("search.result_list" if self.products else "search.no_result")
+        return names
+
+    def _element_id(self, name):
+        return f"{self.generation}:{name}"
+
+    def _element(self, element_id):
+        """元素引用 -> 元素名（旧页面的引用返回None，由调用方报告元素已失效）"""
+        generation, _, name = element_id.partition(":")
+        if int(generation) != self.generation:
+            return None
+        return name
+
+    # ---- 交互 ----
+    def _submit_form(self, result, token):
+        if result["code"] == 0:
+            self._login_session(token)
+            self.navigate(self._origin() + result.get("data", "/"))
+        else:
+            self.tips = result["msg"]
+
+    def click(self, name):
+        if name == "nav.login_link":
+            self.navigate(self._origin() + settings.LOGIN_PAGE_PATH)
+        elif name == "nav.register_link":
+            self.navigate(self._origin() + settings.REGISTER_PAGE_PATH)
+        elif name == "login.submit":
+            self._submit_form(*shop().login({"accounts": self.fields.get("login.username", ""),
+                                             "pwd": self.fields.get("login.password", "")}))
+        elif name == "register.agreement":
+            self.agreed = not self.agreed
+        elif name == "register.submit":
+            form = {"type": "username", "accounts": self.fields.get("register.username", ""),
+                    "pwd": self.fields.get("register.password", "")}
+            if self.agreed:
+                form["is_agree_agreement"] = "1"
+            self._submit_form(*shop().register(form))
+        elif name == "search.button":
+            keyword = self.fields.get("search.input", "")
+            self.navigate(self._origin() + settings.SEARCH_PATH)
+            self.products = shop().search_page(keyword, 1)[0]
+
+    def text(self, name):
+        if name == "search.no_result":
+            return "没有相关数据"
+        if name.startswith("search.item."):
+            return self.products[int(name.rsplit(".", 1)[1])]
+        return ""
+
+    # ---- 脚本：按脚本内容识别框架中用到的几段脚本 ----
+    def script(self, script, args):
+        if "isDisplayed" in script:
+            return True
+        if "getAttribute" in script:
+            name = self._element(args[0][ELEMENT_KEY]) if isinstance(args[0], dict) else None
+            return self.fields.get(name, "") if args[1] == "value" else None
+        if "getEntriesByType('navigation')" in script:
+            if self.page == "blank":
+                return None
+            return {"origin": self.generation, "url": self.url, "ttfb": 0, "dom_ready": 0, "load": 0,
+                    "transfer": 0, "resources": []}
+        if "getEntriesByType('resource').length" in script:
+            return ["complete", 0, 0]
+        if "document.readyState" in script:
+            return "complete"
+        if "offsetParent" in script:  # 表单提交失败的提示是否显示
+            return bool(self.tips)
+        if "querySelectorAll(itemSelector)" in script:
+            fields = args[2]
+            return [{field: product for field in fields} for product in self.products]
+        if script.strip() == "return 1":
+            return 1
+        if "localStorage.length" in script:
+            return {}
+        return None
+
+    def screenshot(self):
+        if self.page not in self._screenshots:
+            self._screenshots[self.page] = base64.b64encode(_png(*SCREENSHOT_SIZE, self.page)).decode("ascii")
+        return self._screenshots[self.page]
+
+    # ---- WebDriver协议 ----
+    def execute(self, command, params):
+        """command_executor 接口：返回与远程驱动相同格式的响应"""
+        self.commands += 1
+        params = params or {}
+        if command == Command.NEW_SESSION:
+            return {"value": {"sessionId": f"fake-{id(self):x}", "capabilities": {"browserName": "fake"}}}
+        if command == Command.GET:
+            self.navigate(params["url"])
+        elif command == Command.REFRESH:
+            self.navigate(self.url)
+        elif command == Command.GET_CURRENT_URL:
+            return {"value": self.url}
+        elif command == Command.GET_TITLE:
+            return {"value": self.page}
+        elif command in (Command.FIND_ELEMENT, Command.FIND_ELEMENTS):
+            name = LOCATOR_NAMES.get((params["using"], params["value"]))
+            found = [{ELEMENT_KEY: self._element_id(name)}] if name in self._elements() else []
+            if command == Command.FIND_ELEMENTS:
+                return {"value": found}
+            return {"value": found[0]} if found else _error("no such element", f"{params['value']}")
+        elif command in (Command.FIND_CHILD_ELEMENT, Command.FIND_CHILD_ELEMENTS):
+            items = []
+            if self._element(params["id"]) == "search.result_list" and params["value"] == "li":
+                items = [{ELEMENT_KEY: self._element_id(f"search.item.{index}")} for index in range(len(self.products))]
+            if command == Command.FIND_CHILD_ELEMENTS:
+                return {"value": items}
+            return {"value": items[0]} if items else _error("no such element", f"{params['value']}")
+        elif command in (Command.CLICK_ELEMENT, Command.SEND_KEYS_TO_ELEMENT, Command.CLEAR_ELEMENT,
+                         Command.GET_ELEMENT_TEXT, Command.IS_ELEMENT_SELECTED, Command.IS_ELEMENT_ENABLED,
+                         Command.GET_ELEMENT_PROPERTY, Command.GET_ELEMENT_ATTRIBUTE):
+            name = self._element(params["id"])
+            if name is None:
+                return _error("stale element reference", "元素所在页面已刷新")
+            return {"value": self._element_command(command, name, params)}
+        elif command == Command.W3C_EXECUTE_SCRIPT:
+            return {"value": self.script(params["script"], params.get("args", []))}
+        elif command == Command.SCREENSHOT:
+            return {"value": self.screenshot()}
+        elif command == Command.GET_ALL_COOKIES:
+            return {"value": [dict(cookie) for cookie in self.cookies]}
+        elif command == Command.ADD_COOKIE:
+            self.cookies = [c for c in self.cookies if c["name"] != params["cookie"]["name"]]
+            self.cookies.append(dict(params["cookie"]))
+        elif command == Command.DELETE_ALL_COOKIES:
+            self.cookies = []
+        elif command == Command.W3C_GET_WINDOW_HANDLES:
+            return {"value": [WINDOW_HANDLE]}
+        elif command == Command.W3C_GET_CURRENT_WINDOW_HANDLE:
+            return {"value": WINDOW_HANDLE}
+        elif command in (Command.W3C_GET_ALERT_TEXT, Command.W3C_DISMISS_ALERT, Command.W3C_ACCEPT_ALERT):
+            return _error("no such alert", "没有弹窗")
+        return {"value": None}
+
+    def _element_command(self, command, name, params):
+        if command == Command.CLICK_ELEMENT:
+            self.click(name)
+        elif command == Command.SEND_KEYS_TO_ELEMENT:
+            self.fields[name] = self.fields.get(name, "") + params["text"]
+        elif command == Command.CLEAR_ELEMENT:
+            self.fields[name] = ""
+        elif command == Command.GET_ELEMENT_TEXT:
+            return self.text(name)
+        elif command == Command.IS_ELEMENT_SELECTED:
+            return name == "register.agreement" and self.agreed
+        elif command == Command.IS_ELEMENT_ENABLED:
+            return True
+        elif command in (Command.GET_ELEMENT_PROPERTY, Command.GET_ELEMENT_ATTRIBUTE):
+            return self.fields.get(name, "") if params.get("name") == "value" else None
+        return None
+
+    def close(self):
+        pass
+
+
+def create_fake_driver():
+    """创建一个假驱动（Selenium的远程驱动 + 进程内假浏览器），可直接放入驱动池"""
+    return webdriver.Remote(command_executor=FakeBrowser(), options=webdriver.EdgeOptions())
@@ -0,0 +1,459 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unicodedata
+
+import pytest
+
+import settings
+
+try:
+    import resource  # 峰值内存（Linux/macOS）
+except ImportError:  # Windows：有psutil时用psutil
+    resource = None
+
+
+# --------------------------
+# 测试框架自身的基准测试：用合成用例表（10 ~ 10万行，按 text_cases.xlsx 中的用例为模板复制）测量
+# - 用例加载：解析+预检（无缓存）、读缓存、readexcel02/04 的 get_test_cases()/load_test_cases()、步骤文本编译
+# - 启动与收集：pytest --collect-only 的启动耗时、收集耗时、峰值内存
+# - 用例开销：三个模块的用例在进程内假驱动（fake_driver.py）上执行，没有浏览器延迟，
+#   单个用例的耗时即框架开销（Fixture准备/清理、等待、截图、Allure写入、耗时剖析），以及峰值内存
+# 每项测量都在独立子进程中进行；结果追加到 .bench/history.jsonl，可保存为基准（--save-baseline）并与之对比
+#   python harness_bench.py --sizes 10,1000,100000 --run-cases 24
+#   python harness_bench.py --report                 只对比最近一次结果与基准
+# --------------------------
+BENCH_VERSION = 1
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+DEFAULT_RUN_CASES = 24
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENV_OUTPUT = "HARNESS_BENCH_OUTPUT"
+
+# 指标：键 -> (名称, 单位)；均为越小越好，超出基准 BENCH_REGRESSION_RATIO 视为退化
+METRICS = {
+    "load_cold_s": ("解析+预检（无缓存）", "s"),
+    "load_warm_ms": ("读用例缓存", "ms"),
+    "legacy_load_ms": ("get_test_cases/load_test_cases", "ms"),
+    "steps_us": ("步骤编译/行", "us"),
+    "load_peak_mb": ("加载峰值内存", "MB"),
+    "startup_s": ("pytest启动", "s"),
+    "collect_s": ("用例收集", "s"),
+    "collect_peak_mb": ("收集峰值内存", "MB"),
+    "setup_ms": ("Fixture准备/用例", "ms"),
+    "call_ms": ("用例主体/用例", "ms"),
+    "teardown_ms": ("Fixture清理/用例", "ms"),
+    "waits_ms": ("其中等待/用例", "ms"),
+    "overhead_ms": ("框架开销/用例（不含等待）", "ms"),
+    "finish_ms": ("会话收尾（Allure落盘等）", "ms"),
+    "run_peak_mb": ("执行峰值内存", "MB"),
+}
+
+
+def peak_memory_mb():
+    """当前进程的峰值内存（MB）；无法获取时返回None"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 1)
+    try:
+        import psutil
+
+        return round(psutil.Process().memory_info().peak_wset / 1024 / 1024, 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+# --------------------------
+# 合成用例表
+# --------------------------
+def _templates():
+    """模板用例：真实用例表中三个工作表的全部用例（合成表的列与真实表一致）"""
+    import case_loader
+    import run
+
+    templates = []
+    for sheet_name in run.SHEET_MODULES:
+        sheet = case_loader.load_sheet(sheet_name)
+        templates.extend((sheet_name, sheet.columns, record) for record in sheet.records)
+    return templates
+
+
+def _synthetic_rows(templates, size):
+    """按模板轮流生成 size 行：用例ID为 前缀-序号；注册成功的用例改用不重复的用户名"""
+    from case_loader import ID_COLUMN
+
+    for index in range(size):
+        sheet_name, columns, record = templates[index % len(templates)]
+        row = dict(record)
+        row[ID_COLUMN] = f"{str(record[ID_COLUMN]).split('-')[0]}-{index:06d}"
+        if row.get("预期结果") == "注册成功":
+            row["测试步骤"] = re.sub(r"(用户名[:：])[^\n]*", rf"\g<1>bench{index:06d}", row["测试步骤"])
+        yield sheet_name, columns, row
+
+
+def synthetic_workbook(size, directory):
+    """生成（或复用已生成的）size 行合成用例表；返回（路径，{工作表名: [用例ID]}）"""
+    from case_loader import ID_COLUMN
+
+    templates = _templates()
+    digest = hashlib.sha1(json.dumps([BENCH_VERSION, templates], ensure_ascii=False, default=str)
+                          .encode("utf-8")).hexdigest()[:8]
+    path = os.path.join(directory, f"rows-{size}-{digest}.xlsx")
+    ids = {}
+    rows = {}
+    for sheet_name, columns, row in _synthetic_rows(templates, size):
+        ids.setdefault(sheet_name, []).append(row[ID_COLUMN])
+        rows.setdefault(sheet_name, (columns, []))[1].append([row.get(column) for column in columns])
+    if not os.path.exists(path):
+        from openpyxl import Workbook
+
+        os.makedirs(directory, exist_ok=True)
+        workbook = Workbook(write_only=True)
+        for sheet_name, (columns, values) in rows.items():
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append(columns)
+            for value in values:
+                sheet.append(value)
+        tmp_path = path + ".tmp.xlsx"
+        workbook.save(tmp_path)
+        os.replace(tmp_path, path)
+    return path, ids
+
+
+# --------------------------
+# 子进程测量
+# --------------------------
+def measure_load(excel_path):
+    """（子进程内）用例加载：无缓存解析、读缓存、旧入口函数、步骤编译"""
+    import case_loader
+    from step_dsl import compile_steps
+
+    started = time.perf_counter()
+    sheets = case_loader.load_workbook(excel_path)
+    load_cold = time.perf_counter() - started
+
+    case_loader._memo.clear()
+    started = time.perf_counter()
+    case_loader.load_workbook(excel_path)
+    load_warm = time.perf_counter() - started
+
+    # 各模块原有的加载入口（子进程的 CASE_EXCEL_PATH 已指向合成表；readexcel03 的 setup Fixture 同样是 load_sheet）
+    import readexcel02
+    import readexcel04
+
+    case_loader._memo.clear()
+    started = time.perf_counter()
+    readexcel02.get_test_cases()
+    readexcel04.load_test_cases()
+    legacy_load = time.perf_counter() - started
+
+    texts = [record["测试步骤"] for sheet in sheets.values() for record in sheet.records]
+    compile_steps.cache_clear()
+    started = time.perf_counter()
+    for text in texts:
+        compile_steps(text)
+    steps = time.perf_counter() - started
+    return {
+        "rows": len(texts),
+        "load_cold_s": round(load_cold, 3),
+        "load_warm_ms": round(load_warm * 1000, 1),
+        "legacy_load_ms": round(legacy_load * 1000, 1),
+        "steps_us": round(steps / max(len(texts), 1) * 1e6, 2),
+        "load_peak_mb": peak_memory_mb(),
+    }
+
+
+def _run_subprocess(args, env, timeout=None):
+    started = time.time()
+    result = subprocess.run(args, cwd=HERE, env=env, capture_output=True, text=True, encoding="utf-8",
+                            errors="replace", timeout=timeout)
+    return result, started
+
+
+def _read_output(path, result):
+    if not os.path.exists(path):
+        raise RuntimeError(f"子进程没有输出测量结果（退出码 {result.returncode}）：\n{result.stdout[-2000:]}"
+                           f"{result.stderr[-2000:]}")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _bench_env(work_dir, excel_path, output_path):
+    """子进程环境：用例表指向合成表，各类状态文件写到临时目录，不影响日常运行的数据"""
+    env = dict(os.environ)
+    env.update({
+        "CASE_EXCEL_PATH": excel_path,
+        "CASE_CACHE_DIR": os.path.join(work_dir, "case_cache"),
+        "PROFILE_DIR": os.path.join(work_dir, "profile"),
+        "RUN_STATE_PATH": os.path.join(work_dir, "run_state.json"),
+        "LOCATOR_CACHE_PATH": os.path.join(work_dir, "locator_cache.json"),
+        "AUTH_STATE_DIR": os.path.join(work_dir, "auth_state"),
+        "FAKE_DRIVER": "1",
+        ENV_OUTPUT: output_path,
+    })
+    return env
+
+
+def bench_size(size, run_cases, workbook_dir):
+    """测量一种用例表规模：返回指标字典"""
+    import parallel_runner
+    import profiler
+    import run
+
+    excel_path, ids = synthetic_workbook(size, workbook_dir)
+    modules = [run.SHEET_MODULES[sheet] for sheet in ids]
+    work_dir = tempfile.mkdtemp(prefix="harness-bench-")
+    try:
+        # 1. 用例加载（子进程：无缓存 -> 生成缓存）
+        output = os.path.join(work_dir, "load.json")
+        env = _bench_env(work_dir, excel_path, output)
+        result, _ = _run_subprocess([sys.executable, __file__, "--measure-load", excel_path, "--output", output], env)
+        metrics = _read_output(output, result)
+
+        # 2. 启动与收集（读缓存）
+        output = os.path.join(work_dir, "collect.json")
+        env = _bench_env(work_dir, excel_path, output)
+        base_args = [sys.executable, "-m", "pytest", "-p", "harness_bench", "-p", "no:cacheprovider",
+                     "--rootdir", HERE, "-q"]
+        result, launched = _run_subprocess(base_args + ["--collect-only", *modules], env)
+        collected = _read_output(output, result)
+        metrics.update({
+            "startup_s": round(collected["configured"] - launched, 3),
+            "collect_s": collected["collect_s"],
+            "collect_items": collected["items"],
+            "collect_peak_mb": collected["peak_mb"],
+        })
+
+        # 3. 用例执行（假驱动）：每个工作表取前几个用例，与真实用例的组合相同
+        if run_cases:
+            output = os.path.join(work_dir, "run.json")
+            env = _bench_env(work_dir, excel_path, output)
+            per_sheet = -(-run_cases // len(ids))
+            nodeids = [f"{run.SHEET_MODULES[sheet]}::{run.SHEET_TESTS[sheet]}[{case_id}]"
+                       for sheet, case_ids in ids.items() for case_id in case_ids[:per_sheet]]
+            case_file = os.path.join(work_dir, "cases.txt")
+            with open(case_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(nodeids))
+            env[parallel_runner.ENV_CASE_FILE] = case_file
+            result, _ = _run_subprocess(base_args + ["--fake-driver", "--alluredir", os.path.join(work_dir, "allure"),
+                                                     "--select", "all", *modules], env)
+            ran = _read_output(output, result)
+            cases = max(ran["cases"], 1)
+            waits = sum(row["duration"] for run_data in profiler.load_runs(env["PROFILE_DIR"])
+                        for row in profiler.iter_rows([run_data], "waits"))
+            metrics.update({
+                "run_cases": ran["cases"],
+                "run_failed": ran["failed"],
+                "setup_ms": round(ran["setup"] / cases * 1000, 2),
+                "call_ms": round(ran["call"] / cases * 1000, 2),
+                "teardown_ms": round(ran["teardown"] / cases * 1000, 2),
+                "waits_ms": round(waits / cases * 1000, 2),
+                "overhead_ms": round((ran["setup"] + ran["call"] + ran["teardown"] - waits) / cases * 1000, 2),
+                "finish_ms": round(ran["finish_s"] * 1000, 1),
+                "run_peak_mb": ran["peak_mb"],
+            })
+        return metrics
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# --------------------------
+# 结果保存与基准对比
+# --------------------------
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _history_path():
+    return os.path.join(settings.BENCH_DIR, "history.jsonl")
+
+
+def _baseline_path():
+    return os.path.join(settings.BENCH_DIR, "baseline.json")
+
+
+def save_result(result, baseline=False):
+    os.makedirs(settings.BENCH_DIR, exist_ok=True)
+    with open(_history_path(), "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    if baseline:
+        with open(_baseline_path(), "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def load_history():
+    if not os.path.exists(_history_path()):
+        return []
+    with open(_history_path(), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_baseline():
+    if not os.path.exists(_baseline_path()):
+        return None
+    with open(_baseline_path(), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _pad(text, width):
+    """按显示宽度补齐（中文占两列）"""
+    return text + " " * max(width - sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text), 0)
+
+
+def compare(result, baseline, ratio=None):
+    """逐个规模、逐项指标与基准对比；返回（输出行，退化项列表）"""
+    ratio = settings.BENCH_REGRESSION_RATIO if ratio is None else ratio
+    lines, regressions = [], []
+    for size, metrics in result["sizes"].items():
+        base = (baseline or {}).get("sizes", {}).get(size, {})
+        lines.append(f"📊 {int(size):,} 行（执行 {metrics.get('run_cases', 0)} 个用例）")
+        for key, (label, unit) in METRICS.items():
+            value = metrics.get(key)
+            if value is None:
+                continue
+            text = f"  {_pad(label, 30)}{value:>12,.2f} {unit}"
+            old = base.get(key)
+            if old:
+                change = (value - old) / old
+                text += f"   基准 {old:,.2f}（{change:+.0%}）"
+                # 等待是其余阶段的组成部分，单独不判退化
+                if change > ratio and key != "waits_ms":
+                    text += " ❌"
+                    regressions.append(f"{int(size):,} 行 {label}：{old:,.2f} -> {value:,.2f} {unit}（{change:+.0%}）")
+            lines.append(text)
+    return lines, regressions
+
+
+def print_comparison(result, baseline):
+    if baseline is None:
+        print("ℹ️ 还没有基准（--save-baseline 把本次结果保存为基准）")
+    else:
+        print(f"ℹ️ 基准：{baseline['time']}（{baseline.get('commit') or '未知版本'}）")
+    lines, regressions = compare(result, baseline)
+    print("\n".join(lines))
+    if regressions:
+        print(f"❌ 比基准慢超过 {settings.BENCH_REGRESSION_RATIO:.0%} 的指标 {len(regressions)} 项：")
+        for text in regressions:
+            print(f"  - {text}")
+    elif baseline is not None:
+        print("✅ 未发现明显退化")
+    return regressions
+
+
+def _sizes(value):
+    try:
+        sizes = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"规模必须是逗号分隔的整数：{value}") from None
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError(f"规模必须是正整数：{value}")
+    return sizes
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="测试框架自身的基准测试（合成用例表 + 进程内假驱动）")
+    parser.add_argument("--sizes", type=_sizes, default=list(DEFAULT_SIZES),
+                        help=f"合成用例表的行数（逗号分隔，默认 {','.join(map(str, DEFAULT_SIZES))}）")
+    parser.add_argument("--run-cases", type=int, default=DEFAULT_RUN_CASES,
+                        help="每种规模在假驱动上实际执行的用例数（三个工作表平分，0=只测加载和收集）")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基准")
+    parser.add_argument("--fail-on-regression", action="store_true", help="有指标比基准慢超过阈值时退出码为1")
+    parser.add_argument("--report", action="store_true", help="不执行测量，只把最近一次结果与基准对比")
+    parser.add_argument("--measure-load", help=argparse.SUPPRESS)  # 子进程内部使用
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.chdir(HERE)
+    if args.measure_load:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(measure_load(args.measure_load), f)
+        return 0
+
+    baseline = load_baseline()
+    if args.report:
+        history = load_history()
+        if not history:
+            print("❌ 还没有基准测试结果（先执行 python harness_bench.py）")
+            return 2
+        regressions = print_comparison(history[-1], baseline)
+        return 1 if regressions and args.fail_on_regression else 0
+
+    result = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": _git_commit(),
+              "python": platform.python_version(), "run_cases": args.run_cases, "sizes": {}}
+    workbook_dir = os.path.join(settings.BENCH_DIR, "workbooks")
+    for size in args.sizes:
+        print(f"🚀 {size:,} 行：生成用例表、测量加载/收集/执行...")
+        started = time.perf_counter()
+        metrics = result["sizes"][str(size)] = bench_size(size, args.run_cases, workbook_dir)
+        if metrics.get("run_failed"):
+            print(f"❌ 假驱动上有 {metrics['run_failed']} 个用例失败（用例开销数据不可靠，请先用 pytest --fake-driver 排查）")
+        print(f"✅ {size:,} 行完成（{time.perf_counter() - started:.1f}s）")
+    save_result(result, baseline=args.save_baseline)
+    print()
+    regressions = print_comparison(result, None if args.save_baseline else baseline)
+    print(f"\nℹ️ 结果已追加到 {_history_path()}" + ("，并保存为基准" if args.save_baseline else ""))
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+# --------------------------
+# pytest插件（子进程中通过 -p harness_bench 加载；只有设置了输出文件时才生效）
+# --------------------------
+def pytest_configure(config):
+    config._harness_bench = {"configured": time.time(), "collect_s": 0.0, "items": 0, "cases": 0, "failed": 0,
+                             "setup": 0.0, "call": 0.0, "teardown": 0.0, "finish_s": 0.0} \
+        if os.environ.get(ENV_OUTPUT) else None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection(session):
+    bench = session.config._harness_bench
+    started = time.perf_counter()
+    yield
+    if bench is not None:
+        bench["collect_s"] = round(time.perf_counter() - started, 3)
+        bench["items"] = len(session.items)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    bench = item.config._harness_bench
+    if bench is None:
+        return
+    report = outcome.get_result()
+    bench[report.when] += report.duration
+    if report.when == "call":
+        bench["cases"] += 1
+        bench["failed"] += int(report.failed)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_sessionfinish(session):
+    """会话收尾：包住其他插件的收尾（耗时剖析保存、运行状态保存、Allure落盘等）"""
+    bench = session.config._harness_bench
+    started = time.perf_counter()
+    yield
+    if bench is None:
+        return
+    bench["finish_s"] = round(time.perf_counter() - started, 3)
+    bench["peak_mb"] = peak_memory_mb()
+    with open(os.environ[ENV_OUTPUT], "w", encoding="utf-8") as f:
+        json.dump(bench, f)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
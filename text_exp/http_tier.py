@@ -0,0 +1,155 @@
+from contextlib import nullcontext
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import settings
+
+
+# --------------------------
+# 纯HTTP执行层：不启动浏览器，用连接池化的 requests 会话提交与页面相同的表单，
+# 并按浏览器的跳转规则得到“当前URL”，用例的判定逻辑与浏览器层完全一致
+# --------------------------
+_shared_adapter = None
+
+
+def new_adapter(pool_size=None):
+    """新建连接池；pool_size 为每个站点保持的最大连接数（默认 settings.HTTP_POOL_SIZE）"""
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_size or settings.HTTP_POOL_SIZE)
+
+
+def shared_adapter():
+    """进程内共享的连接池（各用例的会话Cookie相互独立，但复用TCP连接）"""
+    global _shared_adapter
+    if _shared_adapter is None:
+        _shared_adapter = new_adapter()
+    return _shared_adapter
+
+
+def close_shared_adapter():
+    """测试会话结束时关闭共享连接池（各会话不能自己 close，否则会清空所有会话共用的连接）"""
+    global _shared_adapter
+    if _shared_adapter is not None:
+        _shared_adapter.close()
+        _shared_adapter = None
+
+
+def new_session(adapter=None):
+    """新建会话（Cookie独立），挂载到给定的连接池（默认进程内共享的连接池）"""
+    adapter = adapter or shared_adapter()
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def redirect_target(response, base_url):
+    """
+    计算表单提交后浏览器最终停留的URL
+    - 服务端302跳转：requests已跟随，取最终URL
+    - Ajax接口返回 {"code": 0, "data": 跳转地址}：页面脚本会跳转到该地址（未给出时回到首页）
+    - 其他情况（提交失败）：不跳转，返回None
+    """
+    if response.history:
+        return response.url
+    try:
+        payload = response.json()
+    except ValueError:
+        return None
+    if isinstance(payload, dict) and payload.get("code") == 0:
+        data = payload.get("data")
+        if isinstance(data, str) and data.startswith(("http://", "https://", "/")):
+            return urljoin(base_url, data)
+        return base_url
+    return None
+
+
+class HttpShopFlow:
+    """纯HTTP执行层（方法与 shop_flows.BrowserShopFlow 一致）"""
+
+    tier = "http"
+
+    def __init__(self, base_url=None, timeout=15):
+        self.base_url = (base_url or settings.BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = new_session()
+        self.current_url = None
+        self.last_response = None
+        self._form = {}
+
+    def budget(self, step):
+        return nullcontext()
+
+    def screenshot(self, name, force=False):
+        pass  # 纯HTTP层没有页面渲染，不截图
+
+    def open(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        self.last_response = response
+        self.current_url = response.url
+
+    # ---- 登录 ----
+    def goto_login(self):
+        self.open(self.base_url + settings.LOGIN_PAGE_PATH)
+        self._form = {}
+
+    def input_login_username(self, username):
+        self._form["accounts"] = username
+
+    def input_login_password(self, password):
+        self._form["pwd"] = password
+
+    def submit_login(self):
+        self._submit(settings.LOGIN_ACTION_PATH)
+
+    # ---- 注册 ----
+    def goto_register(self):
+        self.open(self.base_url + settings.REGISTER_PAGE_PATH)
+        self._form = {"type": "username"}
+
+    def input_register_username(self, username):
+        self._form["accounts"] = username
+
+    def input_register_password(self, password):
+        self._form["pwd"] = password
+
+    def set_agreement(self, agree):
+        if not agree:
+            self._form.pop("is_agree_agreement", None)
+            return "按用例步骤不勾选协议"
+        self._form["is_agree_agreement"] = "1"
+        return "已勾选协议"
+
+    def submit_register(self):
+        self._submit(settings.REGISTER_ACTION_PATH)
+
+    def _submit(self, action_path):
+        response = self.session.post(
+            self.base_url + action_path,
+            data=self._form,
+            headers={"X-Requested-With": "XMLHttpRequest", "Referer": self.current_url or self.base_url},
+            timeout=self.timeout,
+        )
+        self.last_response = response
+        target = redirect_target(response, self.base_url)
+        if target:
+            self.current_url = target
+
+    # ---- 登录态快照（auth_state使用） ----
+    def export_state(self):
+        cookies = [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+                    "secure": c.secure, **({"expiry": c.expires} if c.expires else {})}
+                   for c in self.session.cookies]
+        return {"cookies": cookies, "local_storage": {}}
+
+    def import_state(self, state):
+        for cookie in state["cookies"]:
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                                     domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        self.current_url = self.base_url
+
+    def close(self):
+        # 只清空本用例的Cookie：session.close() 会关闭共享连接池，后续用例都要重新建立连接
+        self.session.cookies.clear()
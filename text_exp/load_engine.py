@@ -0,0 +1,379 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlencode
+
+import case_loader
+import http_tier
+import settings
+from step_dsl import compile_steps
+
+try:
+    import httpx
+except ImportError:  # 未安装httpx时退回 requests会话 + 线程池（同样复用连接池）
+    httpx = None
+
+
+# --------------------------
+# 压测引擎：把 text_cases.xlsx 中的登录/注册/搜索用例按HTTP流程回放（与功能测试共用同一份用例）
+# 支持闭环模型（固定虚拟用户数循环执行）和开环模型（按到达速率发起流程），支持逐步加压
+# 输出与JMeter报告相同格式的 statistics.json（各请求的响应时间分位数、吞吐量）
+# --------------------------
+# 一个HTTP请求：报告中的标签、方法、地址、表单数据
+Sample = namedtuple("Sample", ["label", "method", "url", "data"])
+# 一个用例对应的请求流程（同一流程内的请求共用一个会话，保持Cookie）
+Flow = namedtuple("Flow", ["case_id", "samples"])
+
+# JMeter报告的三个分位数（pct1/pct2/pct3）
+PERCENTILES = (90, 95, 99)
+DEFAULT_OUTPUT_DIR = "load-results"
+
+
+# ---- 用例 -> 请求流程（表单字段与 http_tier.HttpShopFlow 一致） ----
+def _login_flow(case, base_url):
+    plan = compile_steps(case["测试步骤"])
+    username = plan.arg("input_username")
+    form = {
+        "accounts": "testuser1234" if username is None else username,
+        "pwd": plan.arg("input_password") or "Test123456!",
+    }
+    return [
+        Sample("登录-打开登录页", "GET", base_url + settings.LOGIN_PAGE_PATH, None),
+        Sample("登录-提交", "POST", base_url + settings.LOGIN_ACTION_PATH, form),
+    ]
+
+
+def _register_flow(case, base_url):
+    plan = compile_steps(case["测试步骤"])
+    form = {
+        "type": "username",
+        "accounts": plan.arg("input_username") or "testuser1234",
+        "pwd": plan.arg("input_password") or "Test123456!",
+    }
+    if not plan.has("uncheck_agreement"):
+        form["is_agree_agreement"] = "1"
+    return [
+        Sample("注册-打开注册页", "GET", base_url + settings.REGISTER_PAGE_PATH, None),
+        Sample("注册-提交", "POST", base_url + settings.REGISTER_ACTION_PATH, form),
+    ]
+
+
+def _search_flow(case, base_url):
+    plan = compile_steps(case["测试步骤"])
+    return [
+        Sample("搜索-打开首页", "GET", base_url, None),
+        Sample("搜索-提交", "POST", base_url + settings.SEARCH_PATH, {"wd": plan.arg("input_search") or ""}),
+    ]
+
+
+# 工作表 -> 流程构造函数（Sheet1登录、Sheet2注册、Sheet3搜索，与readexcel02/03/04对应）
+SHEET_FLOWS = {
+    "Sheet1": _login_flow,
+    "Sheet2": _register_flow,
+    "Sheet3": _search_flow,
+}
+
+
+def build_flows(sheets=None, excel_path=None, base_url=None):
+    """从Excel用例构造请求流程列表（用例解析结果由公共加载层缓存）"""
+    base_url = (base_url or settings.BASE_URL).rstrip("/")
+    flows = []
+    for sheet_name in sheets or SHEET_FLOWS:
+        if sheet_name not in SHEET_FLOWS:
+            raise ValueError(f"不支持压测的工作表：{sheet_name}（可选：{'/'.join(SHEET_FLOWS)}）")
+        sheet = case_loader.load_sheet(sheet_name, excel_path)
+        for case_id in sheet.ids():
+            flows.append(Flow(case_id, SHEET_FLOWS[sheet_name](sheet.get(case_id), base_url)))
+    if not flows:
+        raise ValueError("没有可回放的用例")
+    return flows
+
+
+# ---- 统计：与JMeter statistics.json 字段一致 ----
+def percentile(sorted_values, pct):
+    """分位数（与JMeter一致：按 p*(n+1) 位置线性插值）"""
+    n = len(sorted_values)
+    position = pct / 100 * (n + 1)
+    if position < 1:
+        return float(sorted_values[0])
+    if position >= n:
+        return float(sorted_values[-1])
+    lower = int(position)
+    fraction = position - lower
+    return sorted_values[lower - 1] + fraction * (sorted_values[lower] - sorted_values[lower - 1])
+
+
+class LoadStats:
+    """按请求标签汇总采样结果：[开始时间, 结束时间, 耗时ms, 是否成功, 接收字节, 发送字节]"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, label, start, end, ok, received, sent):
+        self.samples.setdefault(label, []).append((start, end, (end - start) * 1000, ok, received, sent))
+
+    def __len__(self):
+        return sum(len(rows) for rows in self.samples.values())
+
+    @staticmethod
+    def _summarize(transaction, rows):
+        elapsed = sorted(row[2] for row in rows)
+        errors = sum(1 for row in rows if not row[3])
+        duration = max(max(row[1] for row in rows) - min(row[0] for row in rows), 1e-3)
+        return {
+            "transaction": transaction,
+            "sampleCount": len(rows),
+            "errorCount": errors,
+            "errorPct": errors * 100 / len(rows),
+            "meanResTime": sum(elapsed) / len(elapsed),
+            "medianResTime": percentile(elapsed, 50),
+            "minResTime": elapsed[0],
+            "maxResTime": elapsed[-1],
+            "pct1ResTime": percentile(elapsed, PERCENTILES[0]),
+            "pct2ResTime": percentile(elapsed, PERCENTILES[1]),
+            "pct3ResTime": percentile(elapsed, PERCENTILES[2]),
+            "throughput": len(rows) / duration,
+            "receivedKBytesPerSec": sum(row[4] for row in rows) / 1024 / duration,
+            "sentKBytesPerSec": sum(row[5] for row in rows) / 1024 / duration,
+        }
+
+    def statistics(self):
+        """返回 statistics.json 内容：Total + 各请求标签"""
+        if not self.samples:
+            return {}
+        result = {"Total": self._summarize("Total", [row for rows in self.samples.values() for row in rows])}
+        for label, rows in self.samples.items():
+            result[label] = self._summarize(label, rows)
+        return result
+
+
+def _request_size(sample, headers):
+    """估算请求字节数（请求行 + 请求头 + 表单）"""
+    body = urlencode(sample.data) if sample.data else ""
+    header_size = sum(len(k) + len(v) + 4 for k, v in headers.items())
+    return len(f"{sample.method} {sample.url} HTTP/1.1\r\n".encode()) + header_size + len(body.encode()) + 2
+
+
+# ---- HTTP客户端：每个虚拟用户一个会话（Cookie独立），底层连接池由引擎统一创建和关闭 ----
+if httpx is not None:
+    class _SharedTransport(httpx.AsyncBaseTransport):
+        """各虚拟用户的 AsyncClient 共用的transport：客户端关闭时不关闭连接池"""
+
+        def __init__(self, transport):
+            self.transport = transport
+
+        async def handle_async_request(self, request):
+            return await self.transport.handle_async_request(request)
+
+        async def aclose(self):
+            pass  # 由引擎结束时统一关闭
+
+
+class _HttpxClient:
+    def __init__(self, transport, timeout):
+        self.client = httpx.AsyncClient(transport=transport, timeout=timeout, follow_redirects=True)
+
+    async def request(self, method, url, data, headers):
+        response = await self.client.request(method, url, data=data, headers=headers)
+        return response.status_code, len(response.content)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class _RequestsClient:
+    def __init__(self, executor, adapter, timeout):
+        self.executor = executor
+        self.timeout = timeout
+        self.session = http_tier.new_session(adapter)
+
+    async def request(self, method, url, data, headers):
+        call = partial(self.session.request, method, url, data=data, headers=headers, timeout=self.timeout)
+        response = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+        return response.status_code, len(response.content)
+
+    async def close(self):
+        # 会话挂在引擎的共享连接池上：session.close() 会关闭整个连接池，这里只清空Cookie
+        self.session.cookies.clear()
+
+
+async def run_flow(client, flow, stats):
+    """按顺序执行一个用例的请求流程；请求失败（异常或4xx/5xx）计为错误，流程继续"""
+    referer = None
+    for sample in flow.samples:
+        headers = {"Referer": referer} if referer else {}
+        if sample.method == "POST":
+            headers["X-Requested-With"] = "XMLHttpRequest"
+        start = time.perf_counter()
+        try:
+            status, received = await client.request(sample.method, sample.url, sample.data, headers)
+            ok = status < 400
+        except Exception:
+            ok, received = False, 0
+        stats.add(sample.label, start, time.perf_counter(), ok, received, _request_size(sample, headers))
+        referer = sample.url
+
+
+class LoadEngine:
+    """
+    压测引擎
+    - closed（闭环）：users个虚拟用户在 ramp_up 秒内依次启动，每人按顺序把全部用例执行 iterations 遍
+      （指定 duration 时改为持续执行到时间结束）
+    - open（开环）：按 rate（流程/秒，泊松到达）发起流程，每个流程使用新会话（Cookie独立，复用引擎的连接池），不等待前一个完成；
+      ramp_up 秒内到达速率从0线性增加到 rate，持续 duration 秒
+    """
+
+    def __init__(self, flows, users=20, timeout=30):
+        self.flows = flows
+        self.users = users
+        self.timeout = timeout
+        self.stats = LoadStats()
+
+    def _client_factory(self):
+        """返回（新建客户端的函数，关闭连接池的协程函数）；连接池大小与虚拟用户数一致"""
+        if httpx is not None:
+            limits = httpx.Limits(max_connections=self.users, max_keepalive_connections=self.users)
+            transport = httpx.AsyncHTTPTransport(limits=limits)
+            return partial(_HttpxClient, _SharedTransport(transport), self.timeout), transport.aclose
+        executor = ThreadPoolExecutor(max_workers=self.users, thread_name_prefix="load")
+        adapter = http_tier.new_adapter(self.users)
+
+        async def close():
+            executor.shutdown(wait=False)
+            adapter.close()
+        return partial(_RequestsClient, executor, adapter, self.timeout), close
+
+    async def run_closed(self, ramp_up=1.0, iterations=1, duration=None):
+        new_client, close = self._client_factory()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ramp_up + duration if duration else None
+
+        async def virtual_user(index):
+            await asyncio.sleep(ramp_up * index / self.users)
+            client = new_client()
+            done = 0
+            try:
+                while True:
+                    for flow in self.flows:
+                        if deadline and loop.time() >= deadline:
+                            return
+                        await run_flow(client, flow, self.stats)
+                    done += 1
+                    if not deadline and done >= iterations:
+                        return
+            finally:
+                await client.close()
+
+        try:
+            await asyncio.gather(*(virtual_user(i) for i in range(self.users)))
+        finally:
+            await close()
+        return self.stats
+
+    async def run_open(self, rate, duration, ramp_up=0.0, seed=None):
+        new_client, close = self._client_factory()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        async def one_flow(flow):
+            client = new_client()
+            try:
+                await run_flow(client, flow, self.stats)
+            finally:
+                await client.close()
+
+        tasks = []
+        try:
+            for index, offset in enumerate(arrival_times(rate, duration, ramp_up, seed)):
+                delay = started + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.ensure_future(one_flow(self.flows[index % len(self.flows)])))
+            await asyncio.gather(*tasks)
+        finally:
+            await close()
+        return self.stats
+
+
+def arrival_times(rate, duration, ramp_up=0.0, seed=None):
+    """
+    开环模型的到达时刻（相对开始的秒数，非齐次泊松过程）
+    按峰值速率 rate 生成候选到达，再以 当前速率/rate 的概率保留（thinning）；
+    加压阶段速率从0线性增加到 rate，单个到达间隔不会因为起始速率低而跨过整个加压阶段
+    """
+    rng = random.Random(seed)
+    now = 0.0
+    while True:
+        now += rng.expovariate(rate)
+        if now >= duration:
+            return
+        if not ramp_up or now >= ramp_up or rng.random() < now / ramp_up:
+            yield now
+
+
+def write_statistics(stats, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "statistics.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats.statistics(), f, ensure_ascii=False, indent=2)
+    return path
+
+
+def print_statistics(statistics):
+    print(f"{'请求':<16}{'样本数':>8}{'错误率%':>9}{'平均ms':>10}{'P90ms':>10}{'P95ms':>10}{'P99ms':>10}{'吞吐/秒':>10}")
+    for name, row in statistics.items():
+        print(f"{name:<16}{row['sampleCount']:>8}{row['errorPct']:>9.1f}{row['meanResTime']:>10.1f}"
+              f"{row['pct1ResTime']:>10.1f}{row['pct2ResTime']:>10.1f}{row['pct3ResTime']:>10.1f}"
+              f"{row['throughput']:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按Excel用例回放HTTP流程的压测引擎")
+    parser.add_argument("--model", choices=("closed", "open"), default="closed", help="负载模型：closed=闭环，open=开环")
+    parser.add_argument("--sheets", default=",".join(SHEET_FLOWS), help="回放的工作表（逗号分隔）")
+    parser.add_argument("--users", type=int, default=20, help="虚拟用户数，同时决定连接池大小（开环模型下为最大并发请求数）")
+    parser.add_argument("--ramp-up", type=float, default=1.0, help="加压时间（秒）")
+    parser.add_argument("--iterations", type=int, default=1, help="闭环模型：每个虚拟用户执行全部用例的遍数")
+    parser.add_argument("--duration", type=float, default=None, help="持续时间（秒）；开环模型必填")
+    parser.add_argument("--rate", type=float, default=None, help="开环模型：每秒发起的流程数")
+    parser.add_argument("--seed", type=int, default=None, help="开环模型：到达间隔随机种子")
+    parser.add_argument("--timeout", type=float, default=30, help="单个请求超时（秒）")
+    parser.add_argument("--base-url", default=None, help="被测商城地址（默认取settings.BASE_URL）")
+    parser.add_argument("--mock-shop", action="store_true", help="启动本地商城替身并对它压测（不受网络影响，用于引擎自测）")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="statistics.json 输出目录")
+    args = parser.parse_args(argv)
+
+    if args.model == "open" and not (args.rate and args.duration):
+        parser.error("开环模型需要同时指定 --rate 和 --duration")
+
+    if args.mock_shop:
+        import mock_shop  # 延迟导入，只有自测时才需要
+
+        args.base_url = mock_shop.start().base_url
+    flows = build_flows([s.strip() for s in args.sheets.split(",") if s.strip()], base_url=args.base_url)
+    engine = LoadEngine(flows, users=max(1, args.users), timeout=args.timeout)
+    client_name = "httpx" if httpx is not None else "requests+线程池"
+    print(f"🚀 压测开始：{args.model} 模型，{len(flows)} 个用例流程，{engine.users} 个虚拟用户（{client_name}）")
+    if args.model == "closed":
+        stats = asyncio.run(engine.run_closed(args.ramp_up, max(1, args.iterations), args.duration))
+    else:
+        stats = asyncio.run(engine.run_open(args.rate, args.duration, args.ramp_up, args.seed))
+
+    if not len(stats):
+        print("❌ 没有产生任何请求样本")
+        return 1
+    path = write_statistics(stats, args.output)
+    print_statistics(stats.statistics())
+    print(f"📊 统计结果已写入：{os.path.abspath(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+import settings
+
+
+# --------------------------
+# 定位器注册表：每个页面元素按顺序登记多种定位方式（原绝对XPath在前，语义化的CSS/XPath作为改版后的兜底；
+# 只有已对照真实站点确认过的 id/链接地址 放在最前），
+# 记住上次成功的定位方式，下次直接先试它（记录保存在 .locator_cache.json，跨运行生效）
+# 页面改版导致某种定位失效时自动尝试下一种，不需要改用例代码
+# --------------------------
+LOGIN_LINK_XPATH = "/html/body/div[1]/div[1]/div[2]/div/ul[1]/div/div/a[1]"
+REGISTER_LINK_XPATH = "/html/body/div[1]/div[1]/div[2]/div/ul[1]/div/div/a[2]"
+
+LOGIN_USERNAME_XPATH = "/html/body/div[1]/div[1]/div[3]/div/div[2]/div[2]/div[2]/div/div[1]/div[1]/form/div[1]/input"
+LOGIN_PASSWORD_XPATH = "/html/body/div[1]/div[1]/div[3]/div/div[2]/div[2]/div[2]/div/div[1]/div[1]/form/div[2]/input"
+LOGIN_BUTTON_XPATH = "/html/body/div[1]/div[1]/div[3]/div/div[2]/div[2]/div[2]/div/div[1]/div[1]/form/div[3]/button"
+
+REGISTER_USERNAME_XPATH = "/html/body/div[1]/div[1]/div[3]/div/div/div[2]/div/div[1]/div[1]/form/div[1]/input"
+REGISTER_PASSWORD_XPATH = "/html/body/div[1]/div[1]/div[3]/div/div/div[2]/div/div[1]/div[1]/form/div[2]/input"
+REGISTER_AGREEMENT_XPATH = "/html/body/div[1]/div[1]/div[3]/div/div/div[2]/div/div[1]/div[1]/form/div[3]/label"
+REGISTER_BUTTON_XPATH = "/html/body/div[1]/div[1]/div[3]/div/div/div[2]/div/div[1]/div[1]/form/div[4]/button"
+
+SEARCH_RESULTS_XPATH = "/html/body/div[1]/div[1]/div[5]/div/div[4]"
+
+# 元素名 -> 按优先级排列的定位方式
+LOCATORS = {
+    # 顶部导航（链接地址与真实站点登录/注册页URL一致：?s=user/logininfo.html、?s=user/reginfo.html）
+    "nav.login_link": [
+        (By.CSS_SELECTOR, 'a[href*="user/logininfo"]'),
+        (By.XPATH, LOGIN_LINK_XPATH),
+    ],
+    "nav.register_link": [
+        (By.CSS_SELECTOR, 'a[href*="user/reginfo"]'),
+        (By.XPATH, REGISTER_LINK_XPATH),
+    ],
+    # 登录表单（CSS候选按纯HTTP层提交的表单字段编写，尚未对照真实站点页面结构确认，排在原XPath之后）
+    "login.username": [
+        (By.XPATH, LOGIN_USERNAME_XPATH),
+        (By.CSS_SELECTOR, 'form[action*="user/login"] input[name="accounts"]'),
+    ],
+    "login.password": [
+        (By.XPATH, LOGIN_PASSWORD_XPATH),
+        (By.CSS_SELECTOR, 'form[action*="user/login"] input[name="pwd"]'),
+    ],
+    "login.submit": [
+        (By.XPATH, LOGIN_BUTTON_XPATH),
+        (By.CSS_SELECTOR, 'form[action*="user/login"] button[type="submit"]'),
+    ],
+    # 注册表单
+    "register.username": [
+        (By.XPATH, REGISTER_USERNAME_XPATH),
+        (By.CSS_SELECTOR, 'form[action*="user/reg"] input[name="accounts"]'),
+    ],
+    "register.password": [
+        (By.XPATH, REGISTER_PASSWORD_XPATH),
+        (By.CSS_SELECTOR, 'form[action*="user/reg"] input[name="pwd"]'),
+    ],
+    "register.agreement": [
+        (By.XPATH, REGISTER_AGREEMENT_XPATH),
+        (By.XPATH, '//form[contains(@action, "user/reg")]//label[.//input[@name="is_agree_agreement"]]'),
+    ],
+    "register.submit": [
+        (By.XPATH, REGISTER_BUTTON_XPATH),
+        (By.CSS_SELECTOR, 'form[action*="user/reg"] button[type="submit"]'),
+    ],
+    # 搜索
+    "search.input": [
+        (By.ID, "search-input"),
+        (By.XPATH, '//*[@id="search-input"]'),
+    ],
+    "search.button": [
+        (By.ID, "ai-topsearch"),
+        (By.XPATH, '//*[@id="ai-topsearch"]'),
+    ],
+    # 搜索结果区（CSS候选的类名尚未对照真实站点页面结构确认，排在原XPath之后）
+    "search.results": [
+        (By.XPATH, SEARCH_RESULTS_XPATH),
+        (By.CSS_SELECTOR, ".search-result .goods-list"),
+    ],
+    "search.result_list": [
+        (By.XPATH, SEARCH_RESULTS_XPATH + "/ul"),
+        (By.CSS_SELECTOR, ".search-result .goods-list > ul"),
+    ],
+    "search.no_result": [
+        (By.XPATH, SEARCH_RESULTS_XPATH + "/p"),
+        (By.CSS_SELECTOR, ".search-result .goods-list > p.no-data"),
+    ],
+}
+
+# 批量读取列表：一次脚本调用取出每一行各字段的文本（未找到的字段为null）
+_EXTRACT_LIST_JS = """
+const [root, itemSelector, fields] = arguments;
+return Array.from(root.querySelectorAll(itemSelector)).map(item => {
+    const row = {};
+    for (const [name, selector] of Object.entries(fields)) {
+        const node = item.querySelector(selector);
+        row[name] = node ? node.innerText.trim() : null;
+    }
+    return row;
+});
+"""
+
+
+class LocatorRegistry:
+    """定位器注册表：候选定位方式 + 上次成功的定位方式（按元素名记录）"""
+
+    def __init__(self, locators, cache_path=None):
+        self.locators = locators
+        self.cache_path = cache_path
+        self._preferred = None     # 元素名 -> [定位方式, 表达式]（首次使用时从文件加载）
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._preferred is not None:
+            return
+        self._preferred = {}
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, encoding="utf-8") as f:
+                    self._preferred = json.load(f)
+            except (OSError, ValueError):
+                pass  # 记录损坏时按默认顺序重新学习
+
+    def candidates(self, name):
+        """按尝试顺序返回定位方式：上次成功的排在最前"""
+        if name not in self.locators:
+            raise KeyError(f"定位器未登记：{name}")
+        candidates = list(self.locators[name])
+        with self._lock:
+            self._load()
+            preferred = self._preferred.get(name)
+        if preferred and tuple(preferred) in candidates:
+            candidates.remove(tuple(preferred))
+            candidates.insert(0, tuple(preferred))
+        return candidates
+
+    def remember(self, name, locator):
+        with self._lock:
+            self._load()
+            if self._preferred.get(name) != list(locator):
+                self._preferred[name] = list(locator)
+                self._dirty = True
+
+    def save(self):
+        """保存上次成功的定位方式（有变化时才写文件）"""
+        with self._lock:
+            if not self._dirty or not self.cache_path:
+                return
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._preferred, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+
+
+registry = LocatorRegistry(LOCATORS, settings.LOCATOR_CACHE_PATH)
+
+
+class located:
+    """
+    等待条件：按候选顺序查找元素，找到第一个（clickable=True 时要求可见且可用）即返回，并记住成功的定位方式
+    可直接用于 WebDriverWait(...).until(located("search.input"))
+    """
+
+    def __init__(self, name, clickable=False, registry=registry):
+        self.name = name
+        self.clickable = clickable
+        self.registry = registry
+
+    def __call__(self, driver):
+        for locator in self.registry.candidates(self.name):
+            try:
+                elements = driver.find_elements(*locator)
+                if not elements:
+                    continue
+                element = elements[0]
+                if self.clickable and not (element.is_displayed() and element.is_enabled()):
+                    continue
+            except StaleElementReferenceException:
+                continue
+            self.registry.remember(self.name, locator)
+            return element
+        return False
+
+
+def find(driver, name):
+    """立即查找（不等待）；所有定位方式都失败时抛出 NoSuchElementException"""
+    element = located(name)(driver)
+    if element is False:
+        raise NoSuchElementException(f"元素未找到：{name}（已尝试 {len(registry.candidates(name))} 种定位方式）")
+    return element
+
+
+def extract_list(driver, root, item_selector, fields):
+    """
+    批量读取列表数据（一次 execute_script 往返，替代每行一次 find_element + text）
+    :param root: 列表容器元素
+    :param item_selector: 行的CSS选择器（如 "li"）
+    :param fields: 字段名 -> 行内CSS选择器
+    返回：[{字段名: 文本或None}]
+    """
+    return driver.execute_script(_EXTRACT_LIST_JS, root, item_selector, fields) or []
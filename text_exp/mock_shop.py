@@ -0,0 +1,397 @@
+import argparse
+import html
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+import settings
+
+
+# --------------------------
+# 本地商城替身：提供首页、登录页、注册页、搜索页（?s=search/index.html，按 &page= 分页）和对应的Ajax提交接口，
+# 页面DOM结构与被测商城一致（用例中的绝对XPath、id、表单字段都能定位到），登录/注册成功后同样跳回首页
+# 用于离线/CI环境运行用例、压测引擎自测，可注入固定或随机延迟模拟网络
+# 启动：python mock_shop.py --port 8082 --latency 0.05    或    pytest --mock-shop ...
+# --------------------------
+# 预置账号（与 text_cases.xlsx 中“已注册账号”的用例一致）
+DEFAULT_USERS = {
+    "number15": "0000001",
+    "nubmber15": "0000001",
+}
+
+# 预置商品（搜索用例：华为笔记本电脑/华为 有结果，太阳 无结果）
+DEFAULT_PRODUCTS = [
+    "华为笔记本电脑 MateBook 14 轻薄本",
+    "华为 Mate 60 Pro 智能手机",
+    "华为 FreeBuds Pro 无线耳机",
+    "小米 14 智能手机",
+    "苹果 iPhone 15 手机",
+    "联想 ThinkPad X1 笔记本电脑",
+]
+
+# 批量搜索自测用的合成商品目录（--products N）：品牌 × 品类 × 型号
+SYNTHETIC_BRANDS = ("华为", "小米", "苹果", "联想", "荣耀", "OPPO", "vivo", "戴尔")
+SYNTHETIC_KINDS = ("笔记本电脑", "智能手机", "无线耳机", "平板电脑", "智能手表", "显示器")
+
+# 注册规则：账号为字母数字下划线2-18位，密码6-18个字符
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_]{2,18}$")
+PASSWORD_LENGTH = (6, 18)
+
+SESSION_COOKIE = "PHPSESSID"
+
+_PAGE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>{title} - 商城</title></head>
+<body>
+<div class="page">
+  <div class="main">
+    <div class="top-bar">欢迎来到商城</div>
+    <div class="top-nav">
+      <div class="nav-inner">
+        <ul class="top-nav-left">
+          <div class="menu-hd">
+            <div class="login-links">
+              <a href="/?s=user/logininfo.html">登录</a><a href="/?s=user/reginfo.html">注册</a>
+            </div>
+          </div>
+        </ul>
+      </div>
+    </div>
+    <div class="content">{content}</div>
+    <div class="search-bar">
+      <form action="/?s=search/index.html" method="POST">
+        <input id="search-input" name="wd" type="text" value="{keyword}" placeholder="搜索商品">
+        <button id="ai-topsearch" type="submit">搜索</button>
+      </form>
+    </div>
+    <div class="search-result">
+      <div class="search-inner">
+        <div class="crumbs">{crumbs}</div>
+        <div class="filter"></div>
+        <div class="sort"></div>
+        <div class="goods-list">{results}</div>
+        <div class="pagination">{pagination}</div>
+      </div>
+    </div>
+  </div>
+</div>
+<script>
+// 表单Ajax提交：code=0 时跳转到 data（未给出时回到首页），否则显示错误信息、停留在当前页
+document.querySelectorAll('form.ajax-form').forEach(function (form) {{
+  form.addEventListener('submit', function (event) {{
+    event.preventDefault();
+    fetch(form.getAttribute('action'), {{
+      method: 'POST', body: new URLSearchParams(new FormData(form)),
+      headers: {{'X-Requested-With': 'XMLHttpRequest'}}, credentials: 'same-origin'
+    }}).then(function (r) {{ return r.json(); }}).then(function (result) {{
+      if (result.code === 0) {{ window.location.href = result.data || '/'; }}
+      else {{ form.querySelector('.form-tips').textContent = result.msg; }}
+    }});
+  }});
+}});
+</script>
+</body>
+</html>
+"""
+
+# 登录表单：content/div/div[2]/div[2]/div[2]/div/div[1]/div[1]/form/div[1..3]
+_LOGIN_FORM = """
+<div class="user-login">
+  <div class="login-banner"></div>
+  <div class="login-box">
+    <div class="login-title">账号登录</div>
+    <div class="login-body">
+      <div class="login-tabs">用户名登录</div>
+      <div class="login-panel">
+        <div class="login-form">
+          <div class="form-wrap">
+            <div class="form-inner">
+              <form class="ajax-form" action="/?s=user/login.html" method="POST">
+                <div class="form-group"><input name="accounts" type="text" placeholder="用户名/手机/邮箱"></div>
+                <div class="form-group"><input name="pwd" type="password" placeholder="登录密码"></div>
+                <div class="form-group"><button type="submit">登录</button></div>
+                <p class="form-tips"></p>
+              </form>
+            </div>
+          </div>
+        </div>
+      </div>
+    </div>
+  </div>
+</div>
+"""
+
+# 注册表单：content/div/div/div[2]/div/div[1]/div[1]/form/div[1..4]
+_REGISTER_FORM = """
+<div class="user-register">
+  <div class="register-box">
+    <div class="register-title">用户名注册</div>
+    <div class="register-body">
+      <div class="register-panel">
+        <div class="register-form">
+          <div class="form-wrap">
+            <form class="ajax-form" action="/?s=user/reg.html" method="POST">
+              <input type="hidden" name="type" value="username">
+              <div class="form-group"><input name="accounts" type="text" placeholder="用户名"></div>
+              <div class="form-group"><input name="pwd" type="password" placeholder="登录密码"></div>
+              <div class="form-group">
+                <label><input name="is_agree_agreement" type="checkbox" value="1"> 阅读并同意《用户注册协议》</label>
+              </div>
+              <div class="form-group"><button type="submit">注册</button></div>
+              <p class="form-tips"></p>
+            </form>
+          </div>
+        </div>
+      </div>
+    </div>
+  </div>
+</div>
+"""
+
+
+def _render(title, content="", keyword="", results="", crumbs="", pagination=""):
+    return _PAGE.format(title=title, content=content, keyword=html.escape(keyword), results=results, crumbs=crumbs,
+                        pagination=pagination)
+
+
+def _render_results(products):
+    if not products:
+        return '<p class="no-data">没有相关数据</p>'
+    items = "".join(f'<li><div class="goods-item"><p class="am-text-truncate-2-md goods-title">{html.escape(name)}</p>'
+                    f'</div></li>' for name in products)
+    return f'<ul class="search-list">{items}</ul>'
+
+
+def _render_pagination(keyword, page, pages):
+    """分页链接（只有一页时不显示）：/?s=search/index.html&wd=关键字&page=页码"""
+    if pages <= 1:
+        return ""
+    links = []
+    for number in range(1, pages + 1):
+        href = html.escape(f"{settings.SEARCH_PATH}&wd={quote(keyword)}&page={number}")
+        active = ' class="am-active"' if number == page else ""
+        links.append(f'<li{active}><a href="{href}">{number}</a></li>')
+    return f'<ul class="am-pagination">{"".join(links)}</ul>'
+
+
+def synthetic_products(count, seed=0):
+    """
+    合成商品目录（固定种子，每次生成相同的目录）
+    以默认商品开头，Sheet3用例中的搜索关键字（如“华为笔记本电脑”）在合成目录中同样有结果
+    """
+    rng = random.Random(seed)
+    templates = DEFAULT_PRODUCTS[:count]
+    return templates + [f"{rng.choice(SYNTHETIC_BRANDS)} {rng.choice(SYNTHETIC_KINDS)} 型号{index:05d}"
+                        for index in range(len(templates), count)]
+
+
+class MockShop:
+    """商城替身：账号/会话/商品数据都在内存中，每个实例相互独立"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, users=None, products=None,
+                 page_size=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.users = dict(DEFAULT_USERS if users is None else users)
+        self.products = list(DEFAULT_PRODUCTS if products is None else products)
+        self.page_size = page_size or settings.MOCK_PAGE_SIZE
+        self.sessions = {}         # 会话Cookie -> 已登录账号
+        self.requests = 0
+        self.connections = 0       # 建立过的TCP连接数（用于验证客户端复用连接）
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """在后台线程中启动，返回站点地址"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-shop", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    # ---- 业务逻辑 ----
+    def login(self, form):
+        username = form.get("accounts", "")
+        if not username:
+            return {"code": -1, "msg": "请输入用户名"}, None
+        if self.users.get(username) != form.get("pwd", ""):
+            return {"code": -2, "msg": "账号或密码错误"}, None
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[token] = username
+        return {"code": 0, "msg": "登录成功", "data": "/"}, token
+
+    def register(self, form):
+        username, password = form.get("accounts", ""), form.get("pwd", "")
+        if form.get("is_agree_agreement") != "1":
+            return {"code": -1, "msg": "请阅读并同意注册协议"}, None
+        if not USERNAME_PATTERN.match(username):
+            return {"code": -2, "msg": "用户名格式为字母数字下划线2-18位"}, None
+        if not PASSWORD_LENGTH[0] <= len(password) <= PASSWORD_LENGTH[1]:
+            return {"code": -3, "msg": "密码长度为6-18个字符"}, None
+        token = secrets.token_hex(16)
+        with self._lock:
+            if username in self.users:
+                return {"code": -4, "msg": "账号已存在"}, None
+            self.users[username] = password
+            self.sessions[token] = username
+        return {"code": 0, "msg": "注册成功", "data": "/"}, token
+
+    def search(self, keyword):
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return []
+        return [name for name in self.products if keyword in name.lower()]
+
+    def search_page(self, keyword, page):
+        """搜索结果的第page页（从1开始）；返回（本页商品，总页数）"""
+        found = self.search(keyword)
+        pages = max(1, -(-len(found) // self.page_size))
+        page = min(max(page, 1), pages)
+        return found[(page - 1) * self.page_size:page * self.page_size], pages
+
+    def _handler_class(self):
+        shop = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头和正文分两次写出：保持连接时Nagle算法+延迟ACK会让每个响应多等约40ms
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with shop._lock:
+                    shop.connections += 1
+
+            def log_message(self, format, *args):
+                pass  # 不输出访问日志
+
+            def _route(self):
+                return parse_qs(urlsplit(self.path).query).get("s", [""])[0]
+
+            def _form(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                return {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+            def _session_user(self):
+                for part in (self.headers.get("Cookie") or "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == SESSION_COOKIE:
+                        return shop.sessions.get(value)
+                return None
+
+            def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def _send_json(self, result, token):
+                headers = {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"} if token else None
+                self._send(200, json.dumps(result, ensure_ascii=False), "application/json; charset=utf-8", headers)
+
+            def do_GET(self):
+                self._handle()
+
+            def do_HEAD(self):
+                self._handle()
+
+            def do_POST(self):
+                self._handle()
+
+            def _handle(self):
+                with shop._lock:
+                    shop.requests += 1
+                shop.delay()
+                route = self._route()
+                path = urlsplit(self.path).path
+                if path != "/":
+                    self._send(404, "Not Found", "text/plain; charset=utf-8")
+                elif route in ("", "index/index.html"):
+                    self._send(200, _render("首页"))
+                elif route == "user/logininfo.html":
+                    self._send(200, _render("用户登录", _LOGIN_FORM))
+                elif route == "user/reginfo.html":
+                    self._send(200, _render("用户注册", _REGISTER_FORM))
+                elif route == "user/login.html" and self.command == "POST":
+                    self._send_json(*shop.login(self._form()))
+                elif route == "user/reg.html" and self.command == "POST":
+                    self._send_json(*shop.register(self._form()))
+                elif route == "search/index.html":
+                    query = parse_qs(urlsplit(self.path).query)
+                    keyword = self._form().get("wd", "") if self.command == "POST" else query.get("wd", [""])[0]
+                    page = int(query.get("page", ["1"])[0]) if query.get("page", [""])[0].isdigit() else 1
+                    products, pages = shop.search_page(keyword, page)
+                    self._send(200, _render("商品搜索", keyword=keyword, results=_render_results(products),
+                                            crumbs=f"搜索：{html.escape(keyword)}",
+                                            pagination=_render_pagination(keyword, page, pages)))
+                elif route == "user/index.html":
+                    user = self._session_user()
+                    if user is None:
+                        self._send(302, "", headers={"Location": settings.LOGIN_PAGE_PATH})
+                    else:
+                        self._send(200, _render("用户中心", f'<div class="user-center">{html.escape(user)}</div>'))
+                else:
+                    self._send(404, "Not Found", "text/plain; charset=utf-8")
+
+        return Handler
+
+
+def start(latency=None, jitter=None, port=0, products=None):
+    """启动一个商城替身（后台线程），返回 MockShop 实例"""
+    shop = MockShop(port=port,
+                    latency=settings.MOCK_LATENCY if latency is None else latency,
+                    jitter=settings.MOCK_JITTER if jitter is None else jitter,
+                    products=products)
+    shop.start()
+    return shop
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地商城替身（离线运行用例/压测自测）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=settings.MOCK_LATENCY, help="每个请求注入的延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=settings.MOCK_JITTER, help="延迟的随机抖动范围（秒）")
+    parser.add_argument("--products", type=int, default=None, help="使用N个合成商品代替预置商品（批量搜索自测）")
+    args = parser.parse_args(argv)
+    products = synthetic_products(args.products) if args.products else None
+    shop = MockShop(args.host, args.port, args.latency, args.jitter, products=products)
+    print(f"🚀 商城替身已启动：{shop.base_url}（延迟 {args.latency}s ± {args.jitter}s）")
+    print(f"ℹ️ 运行用例：BASE_URL={shop.base_url} pytest ...")
+    try:
+        shop.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shop.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
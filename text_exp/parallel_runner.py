@@ -0,0 +1,192 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+
+
+# --------------------------
+# 并行执行：把用例分配到N个独立的worker进程（各自的浏览器 + 各自的allure结果分片），最后合并报告
+# --------------------------
+DEFAULT_MODULES = ["readexcel02.py", "readexcel03.py", "readexcel04.py"]
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# worker进程通过环境变量接收分配的用例清单和进度文件（由conftest读取）
+ENV_CASE_FILE = "PARALLEL_CASE_FILE"
+ENV_PROGRESS_FILE = "PARALLEL_PROGRESS_FILE"
+ENV_WORKER_ID = "PARALLEL_WORKER_ID"
+ENV_WORKER_COUNT = "PARALLEL_WORKER_COUNT"
+# worker的增量执行状态分片（run_state.py）：写在各自的分片目录，全部worker结束后由调度进程合并
+ENV_STATE_FILE = "PARALLEL_STATE_FILE"
+WORKER_STATE_FILE = "run_state.json"
+
+
+def collect_node_ids(modules, extra_args=()):
+    """
+    调用 pytest --collect-only 收集用例节点ID（不启动浏览器）
+    返回：节点ID列表，如 readexcel02.py::test_login[Login-001]
+    """
+    cmd = [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", *extra_args, *modules]
+    proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True, encoding="utf-8")
+    node_ids = [line.strip() for line in proc.stdout.splitlines() if "::" in line]
+    if proc.returncode not in (0, 5) or not node_ids:
+        raise RuntimeError(f"收集用例失败（退出码 {proc.returncode}）：\n{proc.stdout}\n{proc.stderr}")
+    return node_ids
+
+
+def partition(node_ids, workers):
+    """按节点ID排序后轮询分配，保证同一批用例每次分配结果一致"""
+    shards = [[] for _ in range(workers)]
+    for index, node_id in enumerate(sorted(node_ids)):
+        shards[index % workers].append(node_id)
+    return [shard for shard in shards if shard]
+
+
+def start_worker(worker_id, node_ids, shard_dir, extra_args, worker_count=1):
+    os.makedirs(shard_dir, exist_ok=True)
+    case_file = os.path.join(shard_dir, "cases.txt")
+    progress_file = os.path.join(shard_dir, "progress.log")
+    with open(case_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(node_ids))
+    open(progress_file, "w").close()
+
+    env = dict(os.environ)
+    env[ENV_CASE_FILE] = case_file
+    env[ENV_PROGRESS_FILE] = progress_file
+    env[ENV_WORKER_ID] = str(worker_id)
+    env[ENV_WORKER_COUNT] = str(worker_count)
+    env[ENV_STATE_FILE] = os.path.abspath(os.path.join(shard_dir, WORKER_STATE_FILE))
+    modules = sorted({node_id.split("::", 1)[0] for node_id in node_ids})
+    cmd = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+           "--alluredir", shard_dir, *extra_args, *modules]
+    log = open(os.path.join(shard_dir, "worker.log"), "w", encoding="utf-8")
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return proc, log, progress_file
+
+
+def read_progress(progress_file):
+    """读取worker进度文件：返回（已开始的用例集合，已结束的用例集合）"""
+    started, finished = set(), set()
+    with open(progress_file, encoding="utf-8") as f:
+        for line in f:
+            event, _, node_id = line.rstrip("\n").partition("\t")
+            if event == "start":
+                started.add(node_id)
+            elif event == "done":
+                finished.add(node_id)
+    return started, finished
+
+
+def broken_result(node_id, worker_id, message):
+    """为未产出结果的用例生成一条allure结果（状态broken），明确归属到具体worker"""
+    module, _, name = node_id.partition("::")
+    module = os.path.splitext(module)[0]
+    now = int(time.time() * 1000)
+    return {
+        "uuid": str(uuid.uuid4()),
+        "historyId": hashlib.md5(node_id.encode("utf-8")).hexdigest(),
+        "name": name,
+        "fullName": f"{module}#{name.split('[')[0]}",
+        "status": "broken",
+        "statusDetails": {"message": message},
+        "labels": [
+            {"name": "suite", "value": module},
+            {"name": "thread", "value": f"worker-{worker_id}"},
+            {"name": "framework", "value": "pytest"},
+        ],
+        "start": now,
+        "stop": now,
+    }
+
+
+def merge_shards(shard_dirs, results_dir):
+    """把各worker的allure结果分片合并到同一目录（文件名为uuid，不会冲突）"""
+    os.makedirs(results_dir, exist_ok=True)
+    for shard_dir in shard_dirs:
+        for name in os.listdir(shard_dir):
+            if name.endswith(("-result.json", "-container.json")) or "-attachment" in name:
+                shutil.copy2(os.path.join(shard_dir, name), os.path.join(results_dir, name))
+
+
+def merge_run_states(shard_dirs):
+    """把各worker的增量执行状态分片合并到状态文件（路径与worker一致，相对于本目录）"""
+    import run_state  # 延迟导入：run_state 引用本模块的环境变量名
+    import settings
+
+    run_state.merge_states([os.path.join(shard_dir, WORKER_STATE_FILE) for shard_dir in shard_dirs],
+                           os.path.join(HERE, settings.RUN_STATE_PATH))
+
+
+def run_parallel(modules, workers, results_dir, extra_args=()):
+    """
+    并行执行入口
+    返回：（退出码，用例归属清单）
+    """
+    node_ids = collect_node_ids(modules, extra_args)
+    shards = partition(node_ids, workers)
+    shard_root = os.path.join(results_dir, "shards")
+    shutil.rmtree(shard_root, ignore_errors=True)
+    print(f"🚀 共 {len(node_ids)} 个用例，分配到 {len(shards)} 个worker并行执行")
+
+    started_at = time.time()
+    running = []
+    for worker_id, shard in enumerate(shards):
+        shard_dir = os.path.join(shard_root, f"worker-{worker_id}")
+        proc, log, progress_file = start_worker(worker_id, shard, shard_dir, list(extra_args), len(shards))
+        running.append((worker_id, shard, shard_dir, proc, log, progress_file))
+
+    manifest = {}
+    exit_code = 0
+    for worker_id, shard, shard_dir, proc, log, progress_file in running:
+        code = proc.wait()
+        log.close()
+        started, finished = read_progress(progress_file)
+        crashed_on = None
+        for node_id in shard:
+            if node_id in finished:
+                manifest[node_id] = {"worker": worker_id, "status": "done"}
+            elif node_id in started:
+                crashed_on = node_id
+                manifest[node_id] = {"worker": worker_id, "status": "crashed"}
+                message = f"worker-{worker_id} 在执行该用例时退出（退出码 {code}），详见 {shard_dir}/worker.log"
+                write_result(shard_dir, broken_result(node_id, worker_id, message))
+            else:
+                manifest[node_id] = {"worker": worker_id, "status": "not_run"}
+                reason = f"在用例 {crashed_on} 处" if crashed_on else "启动阶段"
+                message = f"未执行：worker-{worker_id} {reason}退出（退出码 {code}）"
+                write_result(shard_dir, broken_result(node_id, worker_id, message))
+        done = len(finished & set(shard))
+        print(f"{'✅' if code in (0, 1) else '❌'} worker-{worker_id}：完成 {done}/{len(shard)} 个用例，退出码 {code}")
+        if code != 0:
+            exit_code = code if exit_code in (0, 1) else exit_code
+
+    merge_shards([item[2] for item in running], results_dir)
+    merge_run_states([item[2] for item in running])
+    with open(os.path.join(results_dir, "parallel-manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"📊 并行执行耗时 {time.time() - started_at:.1f}s，结果已合并至：{os.path.abspath(results_dir)}")
+    return exit_code, manifest
+
+
+def write_result(shard_dir, result):
+    path = os.path.join(shard_dir, f"{result['uuid']}-result.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多worker并行执行Excel驱动的测试用例")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="测试模块文件")
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 2, help="worker进程数")
+    parser.add_argument("--alluredir", default="allure-results-parallel", help="合并后的Allure结果目录")
+    args, extra_args = parser.parse_known_args(argv)
+    exit_code, _ = run_parallel(args.modules, max(1, args.workers), args.alluredir, extra_args)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
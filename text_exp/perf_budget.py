@@ -0,0 +1,186 @@
+import re
+import statistics
+import warnings
+
+import allure
+import pytest
+
+import allure_sink
+import case_loader
+import profiler
+import settings
+from case_loader import PAGE_BUDGET_COLUMN, STEP_BUDGET_COLUMN
+
+
+# --------------------------
+# 性能预算插件：Excel用例行中可选的两列预算，用例主体执行完后按耗时剖析数据检查
+# - “页面加载预算(ms)”：用例访问的每个页面 Navigation Timing loadEventEnd 都不能超过该值
+# - “步骤耗时预算(ms)”：单个数值=每个步骤的上限；或 “关键字=毫秒;...” 按步骤标题包含的关键字分别设置，
+#   不带关键字的一项（如 “点击登录按钮=3000;8000”）作为其余步骤的上限
+# 两列都可以不加，也可以只给部分用例填写：用例首行的预算单元格为空即该用例没有预算
+# （与其他列不同，不沿用上一个用例的值；合并单元格只在本用例的续行内有效）
+# 超出预算：--budget-mode fail 判用例失败，degrade（默认）只标记“性能降级”并在报告中列出
+# 另外与最近几次运行的中位数对比（基准），明显变慢的页面/步骤同样标记降级（只对填写了预算的用例检查）
+# --------------------------
+BUDGET_MODES = ("fail", "degrade", "off")
+DEGRADED_TAG = "性能降级"
+
+
+class BudgetExceeded(AssertionError):
+    """性能预算超出（fail模式下作为用例失败原因）"""
+
+
+class BudgetWarning(UserWarning):
+    """性能预算超出或比基准明显变慢（degrade模式）"""
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and value != value):  # 空单元格（NaN）
+        return ""
+    return str(value).strip()
+
+
+def parse_page_budget(value):
+    """“页面加载预算”单元格 -> 毫秒（未填写时为None）"""
+    text = _text(value)
+    return float(text) if text else None
+
+
+def parse_step_budget(value):
+    """“步骤耗时预算”单元格 -> [(关键字或None, 毫秒)]；格式错误由用例表预检（preflight）提前拦截"""
+    entries = []
+    for part in re.split(r"[;；\n]", _text(value).replace("＝", "=")):
+        if part.strip():
+            keyword, _, limit = part.rpartition("=")
+            entries.append((keyword.strip() or None, float(limit)))
+    return entries
+
+
+def step_limit(entries, title):
+    """步骤标题对应的上限：先按关键字匹配，都不匹配时用不带关键字的一项"""
+    default = None
+    for keyword, limit in entries:
+        if keyword is None:
+            default = limit
+        elif keyword in title:
+            return limit
+    return default
+
+
+def case_budgets(item):
+    """用例行中的预算：{"page_load": 毫秒或None, "steps": [(关键字, 毫秒)]}；没有填写预算时返回None"""
+    marker = item.get_closest_marker("excel_cases")
+    callspec = getattr(item, "callspec", None)
+    if marker is None or callspec is None or "case_id" not in callspec.params:
+        return None
+    row = case_loader.get_case(marker.args[0], callspec.params["case_id"])
+    budgets = {"page_load": parse_page_budget(row.get(PAGE_BUDGET_COLUMN)),
+               "steps": parse_step_budget(row.get(STEP_BUDGET_COLUMN))}
+    return budgets if budgets["page_load"] is not None or budgets["steps"] else None
+
+
+class Baseline:
+    """历史基准：最近N次运行中每个用例各页面/步骤耗时的中位数（毫秒）"""
+
+    def __init__(self, runs):
+        samples = {}
+        for row in profiler.iter_rows(runs, "pages"):
+            if row["load"] > 0:
+                samples.setdefault((row["case"], f"页面 {profiler.page_path(row['url'])}"), []).append(row["load"])
+        for row in profiler.iter_rows(runs, "steps"):
+            samples.setdefault((row["case"], f"步骤【{row['step']}】"), []).append(row["duration"] * 1000)
+        self.medians = {key: statistics.median(values) for key, values in samples.items()}
+
+    def regression(self, case, key, value):
+        """比基准明显变慢时返回说明文本：超出比例且超出绝对值（过滤小耗时的抖动）"""
+        base = self.medians.get((case, key))
+        if not base or value <= base * (1 + settings.BUDGET_REGRESSION_RATIO) \
+                or value - base <= settings.BUDGET_REGRESSION_MIN_MS:
+            return None
+        return f"{key}：{value:.0f}ms，基准 {base:.0f}ms（+{(value - base) / base:.0%}）"
+
+
+def check(recorder, budgets, baseline):
+    """按预算和基准检查本用例的剖析数据；返回（超出预算列表，比基准变慢列表，实测明细）"""
+    breaches, regressions, measured = [], [], []
+    for row in recorder.rows("pages"):
+        if row["load"] <= 0:  # 采集时页面还没加载完成
+            continue
+        key = f"页面 {profiler.page_path(row['url'])}"
+        measured.append(f"{key}：load {row['load']:.0f}ms")
+        limit = budgets["page_load"]
+        if limit is not None and row["load"] > limit:
+            breaches.append(f"{key}：加载 {row['load']:.0f}ms > 预算 {limit:.0f}ms")
+        regressions.append(baseline.regression(recorder.case, key, row["load"]))
+    for row in recorder.rows("steps"):
+        key, duration = f"步骤【{row['step']}】", row["duration"] * 1000
+        measured.append(f"{key}：{duration:.0f}ms")
+        limit = step_limit(budgets["steps"], row["step"])
+        if limit is not None and duration > limit:
+            breaches.append(f"{key}：耗时 {duration:.0f}ms > 预算 {limit:.0f}ms")
+        regressions.append(baseline.regression(recorder.case, key, duration))
+    return breaches, [text for text in regressions if text], measured
+
+
+# --------------------------
+# pytest插件钩子
+# --------------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("perf_budget", "性能预算")
+    group.addoption("--budget-mode", default=settings.BUDGET_MODE, choices=BUDGET_MODES,
+                    help="超出Excel中的性能预算时：fail=用例失败，degrade=标记性能降级（不失败），off=不检查")
+
+
+def pytest_configure(config):
+    config._budget_baseline = None
+    config._degraded = {}
+
+
+def _baseline(config):
+    """第一次用到时才读取历史剖析数据（本次运行的数据在会话结束时才保存，不会计入基准）"""
+    if config._budget_baseline is None:
+        config._budget_baseline = Baseline(profiler.load_runs(last=settings.BUDGET_BASELINE_RUNS))
+    return config._budget_baseline
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_call(item):
+    """用例主体通过后检查性能预算（主体已失败时不再叠加预算问题）"""
+    outcome = yield
+    mode = item.config.getoption("budget_mode")
+    recorder = item.funcargs.get("step_profile")
+    if mode == "off" or recorder is None or outcome.excinfo is not None:
+        return
+    budgets = case_budgets(item)
+    if budgets is None:
+        return
+    recorder.collect_page()  # 最后一个页面（浏览器归还时才会采集，这里提前采集）
+    breaches, regressions, measured = check(recorder, budgets, _baseline(item.config))
+    allure_sink.attach_text("\n".join(measured + [""] + (breaches + regressions or ["✅ 未超出预算"])), "性能预算")
+    if breaches and mode == "fail":
+        outcome.force_exception(BudgetExceeded("超出性能预算：\n" + "\n".join(breaches)))
+        return
+    problems = breaches + [f"比基准变慢 {text}" for text in regressions]
+    if problems:
+        allure.dynamic.tag(DEGRADED_TAG)
+        item.config._degraded[item.nodeid] = problems
+        warnings.warn(BudgetWarning(f"{DEGRADED_TAG}：" + "；".join(problems)))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """超出预算的失败只显示预算明细（不展开钩子调用栈）"""
+    outcome = yield
+    if call.excinfo is not None and call.excinfo.errisinstance(BudgetExceeded):
+        outcome.get_result().longrepr = str(call.excinfo.value)
+
+
+def pytest_terminal_summary(terminalreporter):
+    degraded = terminalreporter.config._degraded
+    if not degraded:
+        return
+    terminalreporter.write_line(f"⏰ {DEGRADED_TAG} {len(degraded)} 个用例（--budget-mode fail 可判为失败）：")
+    for nodeid, problems in degraded.items():
+        terminalreporter.write_line(f"  {nodeid}")
+        for text in problems:
+            terminalreporter.write_line(f"    - {text}")
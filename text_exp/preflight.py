@@ -0,0 +1,181 @@
+import argparse
+import re
+import sys
+import time
+
+import pandas as pd
+
+import settings
+from case_loader import ID_COLUMN, PAGE_BUDGET_COLUMN, STEP_BUDGET_COLUMN, STEPS_COLUMN, clean_value, normalize_rows
+from step_dsl import KEYWORDS
+
+try:
+    import python_calamine  # noqa: F401  可选：Rust实现的xlsx读取，比openpyxl快一个数量级
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+
+# --------------------------
+# 用例表预检：启动任何浏览器之前，用pandas整列运算一次性校验并规整整本Excel
+# - 校验：必要列、用例ID重复、访问地址格式、预期结果取值、测试步骤为空、性能预算格式（可选列）
+# - 规整与展开（case_loader.normalize_rows，收集阶段的流式读取使用同一函数）：去掉单元格首尾空白、统一换行符；
+#   合并单元格向下填充（性能预算列只在本用例内填充）；每个用例ID只保留第一行；
+#   测试步骤中的 {值1|值2|...} 按笛卡尔积展开为多个具体用例（如账号×密码矩阵），
+#   用例ID依次加后缀 -1、-2...，例：输入用户名:{number15|nubmber15} + 输入密码:{000|0000001} -> 4个用例
+# 预检结果随解析缓存保存（case_loader），Excel不变时不会重复校验
+# --------------------------
+EXPECTED_COLUMN = "预期结果"
+REQUIRED_COLUMNS = (ID_COLUMN, STEPS_COLUMN, EXPECTED_COLUMN)
+
+# 工作表 -> 预期结果允许的取值（未登记的工作表只做通用校验）
+EXPECTED_VALUES = {
+    "Sheet1": ("登录成功", "登录失败"),
+    "Sheet2": ("注册成功", "注册失败"),
+    "Sheet3": ("搜索成功", "搜索失败"),
+}
+
+# 访问地址步骤（关键字与步骤编译器一致）及其参数
+_OPEN_KEYWORDS = "|".join(re.escape(keyword) for keyword, action in KEYWORDS.items() if action == "open_url")
+OPEN_URL_PATTERN = rf"(?m)^\s*(?:\d+\s*[.、．]\s*)?(?:{_OPEN_KEYWORDS})\s*[:：][ \t]*(?P<url>[^\n]*?)\s*$"
+URL_PATTERN = r"^https?://[\w.-]+(?::\d+)?(?:[/?#]\S*)?$"
+# 步骤耗时预算：毫秒数，或 “关键字=毫秒” 用分号/换行分隔（perf_budget.parse_step_budget）
+_BUDGET_ENTRY = r"\s*(?:[^=＝;；\n]+[=＝])?\s*\d+(?:\.\d+)?\s*"
+STEP_BUDGET_PATTERN = rf"{_BUDGET_ENTRY}(?:[;；\n](?:{_BUDGET_ENTRY})?)*"
+MAX_REPORTED_ERRORS = 50
+
+
+def format_errors(errors, limit=MAX_REPORTED_ERRORS):
+    """预检问题清单（每条含 sheet/row/case_id/column/message）格式化为文本"""
+    lines = [f"❌ 用例表预检未通过：共 {len(errors)} 个问题"]
+    for error in errors[:limit]:
+        case = f" {error['case_id']}" if error["case_id"] else ""
+        lines.append(f"  {error['sheet']} 第{error['row']}行{case} [{error['column']}] {error['message']}")
+    if len(errors) > limit:
+        lines.append(f"  ……其余 {len(errors) - limit} 个问题未列出")
+    return "\n".join(lines)
+
+
+class CaseValidationError(ValueError):
+    """用例表预检未通过（errors：问题记录列表）；ValueError子类，调用方不必为捕获它而导入pandas"""
+
+    def __init__(self, errors):
+        super().__init__(format_errors(errors))
+        self.errors = errors
+
+
+def _errors(sheet_name, frame, mask, column, message):
+    """把布尔掩码选中的行转换为问题记录（行号为Excel行号：表头占第1行）"""
+    mask = mask.to_numpy(dtype=bool)  # 展开后的索引有重复，按位置选取
+    rows = frame.loc[mask]
+    messages = message if isinstance(message, str) else message[mask]
+    return pd.DataFrame({
+        "sheet": sheet_name,
+        "row": rows.index + 2,
+        "case_id": rows[ID_COLUMN].astype(str) if ID_COLUMN in rows else "",
+        "column": column,
+        "message": messages,
+    })
+
+
+def check_sheet(sheet_name, raw):
+    """
+    校验并规整单个工作表
+    返回：（规整后的DataFrame，问题记录DataFrame）；没有用例ID列的工作表原样返回且不校验
+    """
+    if ID_COLUMN not in raw.columns:
+        return raw, None
+    missing = [column for column in REQUIRED_COLUMNS if column not in raw.columns]
+    if missing:
+        errors = pd.DataFrame([{"sheet": sheet_name, "row": 1, "case_id": "", "column": ", ".join(missing),
+                                "message": "缺少必要列"}])
+        return raw, errors
+
+    problems = []
+    # 逐行规整（与收集阶段的流式读取同一套规则）；索引保留原行位置，问题记录能对应到Excel行
+    duplicates = set()
+    rows = raw.astype(object).where(raw.notna(), None).itertuples(index=False, name=None)
+    normalized = list(normalize_rows(list(raw.columns), rows, duplicates))
+    frame = pd.DataFrame([record for _, record in normalized], columns=raw.columns,
+                         index=[position for position, _ in normalized])
+
+    # 用例ID重复：同一ID出现在多个非空单元格（合并单元格的续行不算）
+    ids = raw[[ID_COLUMN]].assign(**{ID_COLUMN: raw[ID_COLUMN].map(clean_value)})
+    duplicated = pd.Series(raw.index.isin(list(duplicates)), index=raw.index)
+    problems.append(_errors(sheet_name, ids, duplicated, ID_COLUMN, "用例ID重复"))
+
+    collided = frame[ID_COLUMN].astype(str).duplicated(keep=False)
+    problems.append(_errors(sheet_name, frame, collided, ID_COLUMN, "展开后的用例ID与其他用例冲突"))
+
+    steps = frame[STEPS_COLUMN].astype("string")
+    empty_steps = steps.isna() | (steps.str.len() == 0)
+    problems.append(_errors(sheet_name, frame, empty_steps, STEPS_COLUMN, "测试步骤为空"))
+
+    urls = steps.str.extract(OPEN_URL_PATTERN)["url"]
+    bad_url = urls.notna() & ~urls.str.match(URL_PATTERN).fillna(False)
+    problems.append(_errors(sheet_name, frame, bad_url, STEPS_COLUMN, "访问地址格式无效：" + urls.fillna("")))
+
+    allowed = EXPECTED_VALUES.get(sheet_name)
+    if allowed:
+        expected = frame[EXPECTED_COLUMN]
+        bad_expected = ~expected.isin(allowed)
+        message = "预期结果取值无效：" + expected.astype(str) + f"（可选：{'/'.join(allowed)}）"
+        problems.append(_errors(sheet_name, frame, bad_expected, EXPECTED_COLUMN, message))
+
+    if PAGE_BUDGET_COLUMN in frame:
+        budget = frame[PAGE_BUDGET_COLUMN].astype("string").str.strip().fillna("")
+        bad_budget = (budget != "") & ~pd.to_numeric(budget, errors="coerce").gt(0).fillna(False)
+        problems.append(_errors(sheet_name, frame, bad_budget, PAGE_BUDGET_COLUMN,
+                                "页面加载预算应为正数（毫秒）：" + budget))
+    if STEP_BUDGET_COLUMN in frame:
+        budget = frame[STEP_BUDGET_COLUMN].astype("string").str.strip().fillna("")
+        bad_budget = (budget != "") & ~budget.str.fullmatch(STEP_BUDGET_PATTERN)
+        problems.append(_errors(sheet_name, frame, bad_budget, STEP_BUDGET_COLUMN,
+                                "步骤耗时预算格式应为 毫秒 或 关键字=毫秒;...：" + budget))
+
+    errors = pd.concat(problems, ignore_index=True)
+    return frame, errors if len(errors) else None
+
+
+def run(frames):
+    """
+    校验并规整整本Excel（pd.read_excel(sheet_name=None) 的结果）
+    返回：（{工作表名: 规整后的DataFrame}，问题记录列表）
+    """
+    sheets, problems = {}, []
+    for sheet_name, raw in frames.items():
+        sheets[sheet_name], errors = check_sheet(sheet_name, raw)
+        if errors is not None:
+            problems.append(errors)
+    if not problems:
+        return sheets, []
+    errors = pd.concat(problems, ignore_index=True).sort_values(["sheet", "row"], kind="stable")
+    return sheets, errors.astype({"row": int}).to_dict("records")
+
+
+def read_workbook(excel_path):
+    """读取整本Excel（原始值，不做任何清洗）"""
+    return pd.read_excel(excel_path, sheet_name=None, engine=EXCEL_ENGINE)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用例表预检：校验必要列、用例ID、访问地址、预期结果，并展开数据矩阵")
+    parser.add_argument("excel", nargs="?", default=settings.EXCEL_PATH, help="用例Excel路径")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    frames = read_workbook(args.excel)
+    read_done = time.perf_counter()
+    sheets, errors = run(frames)
+    elapsed = f"读取 {(read_done - started) * 1000:.0f}ms（{EXCEL_ENGINE}），校验 {(time.perf_counter() - read_done) * 1000:.0f}ms"
+    if errors:
+        print(format_errors(errors))
+        print(f"ℹ️ {elapsed}")
+        return 1
+    counts = "，".join(f"{name} {len(frame)} 个" for name, frame in sheets.items())
+    print(f"✅ 用例表预检通过：{counts}（{elapsed}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import allure_commons
+
+import settings
+
+
+# --------------------------
+# 耗时剖析：记录每个Allure步骤、每条WebDriver命令、每次显式等待的耗时，
+# 以及页面的 Navigation/Resource Timing；每次运行保存为一个列式压缩文件（.profile/<运行ID>.json.gz），
+# 命令行汇总多次运行，按总耗时排出最慢的步骤、定位器、页面
+# --------------------------
+FORMAT_VERSION = 1
+
+# 各数据表的列（列式存储：每列一个列表，体积小且便于汇总）
+TABLES = {
+    "steps": ("case", "step", "start", "duration", "ok"),
+    "commands": ("case", "step", "command", "locator", "duration", "ok"),
+    "waits": ("case", "step", "condition", "duration", "timeout", "ok"),
+    # transfer：文档本身的传输字节数；bytes：文档+全部资源（跨域且未开放Timing的资源计为0）
+    "pages": ("case", "url", "ttfb", "dom_ready", "load", "transfer", "resources", "bytes"),
+    "resources": ("case", "page", "name", "type", "duration", "transfer"),
+}
+
+# 页面加载耗时（毫秒，相对于导航开始）与资源加载明细
+_PAGE_TIMING_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav || !location.href.startsWith('http')) { return null; }
+const resources = performance.getEntriesByType('resource')
+    .map(r => [r.name, r.initiatorType, r.duration, r.transferSize || 0]);
+return {origin: performance.timeOrigin, url: location.href,
+        ttfb: nav.responseStart - nav.requestStart, dom_ready: nav.domContentLoadedEventEnd,
+        load: nav.loadEventEnd, transfer: nav.transferSize || 0, resources: resources};
+"""
+
+# 带定位参数的查找命令（定位器记为 “策略=表达式”）
+_FIND_COMMANDS = {"findElement", "findElements", "findChildElement", "findChildElements"}
+
+_run = None                # 当前运行的数据（整个测试会话一份）
+_active = None             # 当前用例的记录器
+last_saved = None          # 最近一次保存的文件路径
+
+
+class _Run:
+    def __init__(self):
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.started = time.time()
+        self.tables = {name: {column: [] for column in columns} for name, columns in TABLES.items()}
+
+    def add(self, table, *values):
+        for column, value in zip(TABLES[table], values):
+            self.tables[table][column].append(value)
+
+
+class CaseProfiler:
+    """用例级记录器：当前步骤栈、已采集的页面（按 timeOrigin 去重）"""
+
+    def __init__(self, run, case):
+        self.run = run
+        self.case = case
+        self.driver = None
+        self.steps = []            # [(uuid, 标题, 开始时间)]
+        self.pages_seen = set()
+        self.internal = False      # 采集页面数据时执行的脚本不计入命令耗时
+        self.marks = {name: len(run.tables[name]["case"]) for name in TABLES}  # 本用例数据的起始位置
+
+    def rows(self, table):
+        """本用例已记录的数据行（字典）"""
+        columns = self.run.tables[table]
+        start = self.marks[table]
+        for values in zip(*(column[start:] for column in columns.values())):
+            row = dict(zip(columns, values))
+            if row["case"] == self.case:
+                yield row
+
+    @property
+    def step(self):
+        return self.steps[-1][1] if self.steps else ""
+
+    def start_step(self, step_uuid, title):
+        self.steps.append((step_uuid, title, time.perf_counter()))
+
+    def stop_step(self, step_uuid, ok):
+        for index in range(len(self.steps) - 1, -1, -1):
+            if self.steps[index][0] == step_uuid:
+                _, title, started = self.steps.pop(index)
+                self.run.add("steps", self.case, title, started, time.perf_counter() - started, ok)
+                return
+
+    def command(self, command, params, duration, ok):
+        locator = ""
+        if command in _FIND_COMMANDS and params:
+            locator = f"{params.get('using')}={params.get('value')}"
+        self.run.add("commands", self.case, self.step, command, locator, duration, ok)
+
+    def waits(self, records):
+        """SmartWait的等待记录（步骤名为等待预算的步骤名）"""
+        for record in records:
+            self.run.add("waits", self.case, record["step"] or self.step, record["condition"],
+                         record["elapsed"], record["timeout"], record["ok"])
+
+    def collect_page(self, driver=None):
+        """采集当前页面的 Navigation/Resource Timing（同一次导航只采集一次）"""
+        driver = driver or self.driver
+        if driver is None or self.internal:
+            return
+        self.internal = True
+        try:
+            timing = driver.execute_script(_PAGE_TIMING_JS)
+        except Exception:
+            return  # 页面正在跳转、弹窗未关闭等情况，放弃本次采集
+        finally:
+            self.internal = False
+        if not timing or timing["origin"] in self.pages_seen:
+            return
+        self.pages_seen.add(timing["origin"])
+        resources = sorted(timing["resources"], key=lambda r: r[2], reverse=True)
+        total_bytes = timing["transfer"] + sum(resource[3] for resource in resources)
+        self.run.add("pages", self.case, timing["url"], timing["ttfb"], timing["dom_ready"],
+                     timing["load"], timing["transfer"], len(resources), total_bytes)
+        for name, kind, duration, transfer in resources[:settings.PROFILE_MAX_RESOURCES]:
+            self.run.add("resources", self.case, timing["url"], name, kind, duration, transfer)
+
+
+def instrument(driver):
+    """给驱动的 execute 加计时（驱动池中的驱动只包装一次，元素上的命令同样经过 execute）"""
+    if getattr(driver, "_profiled", False):
+        return driver
+    execute = driver.execute
+
+    def timed_execute(driver_command, params=None):
+        recorder = _active
+        if recorder is None or recorder.internal:
+            return execute(driver_command, params)
+        if driver_command == "get":
+            recorder.collect_page(driver)  # 离开当前页面前采集其加载数据
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = execute(driver_command, params)
+            ok = True
+            return result
+        finally:
+            recorder.command(driver_command, params, time.perf_counter() - started, ok)
+
+    driver.execute = timed_execute
+    driver._profiled = True
+    return driver
+
+
+def start_case(case):
+    """用例开始：激活用例级记录器（未开启剖析时返回None）"""
+    global _run, _active
+    if not settings.PROFILE_ENABLED:
+        return None
+    if _run is None:
+        _run = _Run()
+    _active = CaseProfiler(_run, case)
+    return _active
+
+
+def attach_driver(driver):
+    """用例借出浏览器后调用：包装命令计时，并记下驱动供步骤结束时采集页面数据"""
+    if _active is not None:
+        _active.driver = instrument(driver)
+
+
+def before_release(driver):
+    """浏览器归还驱动池（会清空页面）之前，采集最后一个页面"""
+    if _active is not None:
+        _active.collect_page(driver)
+        _active.driver = None
+
+
+def record_waits(records):
+    if _active is not None:
+        _active.waits(records)
+
+
+def finish_case(recorder):
+    global _active
+    if _active is recorder:
+        _active = None
+
+
+def save_run(directory=None):
+    """写出本次运行的列式数据；返回文件路径（没有数据时返回None）"""
+    global _run, last_saved
+    run, _run = _run, None
+    if run is None or not any(run.tables[name]["case"] for name in TABLES):
+        return None
+    directory = directory or settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    worker = os.environ.get("PARALLEL_WORKER_ID")
+    path = os.path.join(directory, f"{run.run_id}{f'-w{worker}' if worker else ''}.json.gz")
+    payload = {"version": FORMAT_VERSION, "run_id": run.run_id, "started": run.started,
+               "browser_profile": settings.BROWSER_PROFILE, "tables": run.tables}
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    last_saved = path
+    return path
+
+
+class _StepTimer:
+    """Allure钩子：记录步骤耗时；步骤结束时若页面已跳转，采集新页面的加载数据"""
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        if _active is not None:
+            _active.start_step(uuid, title)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        if _active is not None:
+            _active.stop_step(uuid, exc_type is None)
+            _active.collect_page()
+
+
+step_timer = _StepTimer()
+
+
+# --------------------------
+# 命令行：汇总多次运行，排出最慢的步骤/定位器/命令/页面/资源
+# --------------------------
+def load_run(path):
+    """读取单次运行的数据；格式版本不符时返回None"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        payload = json.load(f)
+    return payload if payload.get("version") == FORMAT_VERSION else None
+
+
+def load_runs(directory=None, last=None):
+    paths = sorted(glob.glob(os.path.join(directory or settings.PROFILE_DIR, "*.json.gz")))
+    runs = [load_run(path) for path in (paths[-last:] if last else paths)]
+    return [run for run in runs if run is not None]
+
+
+def iter_rows(runs, table):
+    for run in runs:
+        columns = run["tables"][table]
+        yield from (dict(zip(columns, values)) for values in zip(*columns.values()))
+
+
+def rank(rows, key, value, top):
+    """按 key 分组汇总 value：次数、总计、平均、最大；按总计降序"""
+    groups = {}
+    for row in rows:
+        name = key(row)
+        if name:
+            groups.setdefault(name, []).append(value(row))
+    ranked = [(name, len(values), sum(values), sum(values) / len(values), max(values))
+              for name, values in groups.items()]
+    ranked.sort(key=lambda item: item[2], reverse=True)
+    return ranked[:top]
+
+
+def page_path(url):
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "") or "/"
+
+
+def page_savings(runs, baselines):
+    """
+    按页面路径对比两组运行：只统计两组都访问过的页面，先按页面求平均再在页面间求平均
+    返回：{"pages": 页面数, "load": (基准, 本组), "bytes": (基准, 本组)}；没有共同页面时返回None
+    """
+    def averages(group):
+        samples = {}
+        for row in iter_rows(group, "pages"):
+            if row.get("bytes") is not None:  # 早期剖析数据没有 bytes 列
+                samples.setdefault(page_path(row["url"]), []).append((row["load"], row["bytes"]))
+        return {path: [sum(column) / len(column) for column in zip(*values)] for path, values in samples.items()}
+
+    before, after = averages(baselines), averages(runs)
+    common = sorted(set(before) & set(after))
+    if not common:
+        return None
+
+    def mean(table, index):
+        return sum(table[path][index] for path in common) / len(common)
+
+    return {"pages": len(common),
+            "load": (mean(before, 0), mean(after, 0)),
+            "bytes": (mean(before, 1), mean(after, 1))}
+
+
+def report(runs, top=10):
+    """生成排行文本（单位：毫秒）"""
+    sections = [
+        ("最慢步骤", rank(iter_rows(runs, "steps"), lambda r: r["step"], lambda r: r["duration"] * 1000, top)),
+        ("最慢定位器", rank(iter_rows(runs, "commands"), lambda r: r["locator"], lambda r: r["duration"] * 1000, top)),
+        ("最慢WebDriver命令", rank(iter_rows(runs, "commands"), lambda r: r["command"], lambda r: r["duration"] * 1000, top)),
+        ("最慢等待", rank(iter_rows(runs, "waits"), lambda r: f"{r['step']} | {r['condition']}",
+                       lambda r: r["duration"] * 1000, top)),
+        ("最慢页面（load）", rank(iter_rows(runs, "pages"), lambda r: page_path(r["url"]), lambda r: r["load"], top)),
+        ("最慢资源", rank(iter_rows(runs, "resources"), lambda r: r["name"], lambda r: r["duration"], top)),
+    ]
+    lines = [f"📊 耗时剖析：共 {len(runs)} 次运行"]
+    for title, ranked in sections:
+        lines.append(f"\n【{title}】")
+        if not ranked:
+            lines.append("  （无数据）")
+        for name, count, total, mean, longest in ranked:
+            lines.append(f"  总计{total:>10.0f}  平均{mean:>8.0f}  最大{longest:>8.0f}  次数{count:>5}  {name}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="汇总耗时剖析数据，排出最慢的步骤、定位器和页面")
+    parser.add_argument("--dir", default=settings.PROFILE_DIR, help="剖析数据目录")
+    parser.add_argument("--last", type=int, default=None, help="只统计最近N次运行")
+    parser.add_argument("--top", type=int, default=10, help="每个排行显示的条数")
+    args = parser.parse_args(argv)
+    runs = load_runs(args.dir, args.last)
+    if not runs:
+        print(f"❌ 未找到剖析数据：{os.path.abspath(args.dir)}")
+        return 1
+    print(report(runs, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+import argparse
+import glob
+import html
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+
+import settings
+
+
+# --------------------------
+# 结果库：把Allure结果目录（*-result.json / *-container.json）增量导入SQLite，保留每个用例的状态和耗时历史
+# 日常只生成轻量的汇总/趋势报告（文本或单个HTML文件，毫秒级），完整的Allure HTML报告按需再生成
+# 用法：
+#   python results_db.py ingest allure-results02 allure-results03     导入（只处理新增的结果文件）
+#   python results_db.py report [--html trend.html]                   汇总/趋势报告
+#   python results_db.py allure allure-results02                      按需生成完整Allure报告
+# --------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    ingested_at REAL NOT NULL,
+    started INTEGER,
+    stopped INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    uuid TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    history_id TEXT NOT NULL,
+    case_name TEXT NOT NULL,
+    title TEXT,
+    status TEXT NOT NULL,
+    start INTEGER,
+    stop INTEGER,
+    duration_ms INTEGER,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_history ON results (history_id, start);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id);
+CREATE TABLE IF NOT EXISTS fixtures (
+    container_uuid TEXT NOT NULL,
+    result_uuid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT,
+    duration_ms INTEGER,
+    UNIQUE (container_uuid, result_uuid, name, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_fixtures_result ON fixtures (result_uuid);
+"""
+
+# 失败类状态（Allure：failed=断言失败，broken=异常）
+FAILED_STATUSES = ("failed", "broken")
+STATUS_MARKS = {"passed": "✅", "failed": "❌", "broken": "💥", "skipped": "⏭️", "unknown": "❔"}
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or settings.RESULTS_DB_PATH)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _param_value(value):
+    # 早期结果按整行用例字典参数化，只保留其中的用例ID
+    match = re.search(r"'用例 ID': '([^']+)'", value)
+    value = match.group(1) if match else value.strip("'\"")
+    return value if len(value) <= 40 else value[:40] + "…"
+
+
+def _case_name(result):
+    """用例名：模块#函数[参数]（与节点ID对应，便于和其他记录关联）"""
+    params = ",".join(_param_value(str(p.get("value", ""))) for p in result.get("parameters", []))
+    return f"{result.get('fullName') or result.get('name')}{f'[{params}]' if params else ''}"
+
+
+def ingest(conn, results_dir):
+    """
+    导入一个Allure结果目录中新增的结果/容器文件（已导入过的文件跳过）
+    本次新增的文件记为一次运行；返回导入的用例结果数
+    """
+    source = os.path.abspath(results_dir)
+    known = {row[0] for row in conn.execute("SELECT path FROM files WHERE path LIKE ?", (source + os.sep + "%",))}
+    new_files = [path for path in sorted(glob.glob(os.path.join(source, "*-result.json")) +
+                                         glob.glob(os.path.join(source, "*-container.json")))
+                 if path not in known]
+    if not new_files:
+        return 0
+
+    with conn:
+        run_id = conn.execute("INSERT INTO runs (source, ingested_at) VALUES (?, ?)", (source, time.time())).lastrowid
+        count = 0
+        for path in new_files:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # 写入中断的残缺文件不导入（下次仍会重试）
+            if path.endswith("-result.json"):
+                start, stop = data.get("start"), data.get("stop")
+                conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (data["uuid"], run_id, data.get("historyId") or data["uuid"], _case_name(data), data.get("name"),
+                     data.get("status", "unknown"), start, stop,
+                     stop - start if start is not None and stop is not None else None,
+                     (data.get("statusDetails") or {}).get("message")))
+                count += 1
+            else:
+                for kind in ("befores", "afters"):
+                    for fixture in data.get(kind, []):
+                        start, stop = fixture.get("start"), fixture.get("stop")
+                        for child in data.get("children", []):
+                            conn.execute("INSERT OR IGNORE INTO fixtures VALUES (?, ?, ?, ?, ?, ?)",
+                                         (data["uuid"], child, fixture.get("name", ""), kind, fixture.get("status"),
+                                          stop - start if start is not None and stop is not None else None))
+            conn.execute("INSERT INTO files VALUES (?, ?)", (path, run_id))
+        conn.execute("UPDATE runs SET started = (SELECT MIN(start) FROM results WHERE run_id = ?),"
+                     " stopped = (SELECT MAX(stop) FROM results WHERE run_id = ?) WHERE id = ?",
+                     (run_id, run_id, run_id))
+    return count
+
+
+# ---- 汇总/趋势（全部由SQL聚合完成，不读取附件） ----
+def run_trend(conn, last=10):
+    """最近N次运行：运行ID、来源目录、开始时间、各状态数量、总耗时"""
+    rows = conn.execute("""
+        SELECT r.id, r.source, r.started, r.stopped,
+               SUM(res.status = 'passed'), SUM(res.status IN ('failed', 'broken')), SUM(res.status = 'skipped'),
+               COUNT(res.uuid)
+        FROM runs r JOIN results res ON res.run_id = r.id
+        GROUP BY r.id ORDER BY r.id DESC LIMIT ?""", (last,)).fetchall()
+    return list(reversed(rows))
+
+
+def case_history(conn, last=10):
+    """每个用例最近N次的状态、平均耗时、失败次数、状态翻转次数（翻转多说明不稳定）"""
+    rows = conn.execute("""
+        SELECT history_id, case_name, status, duration_ms FROM (
+            SELECT history_id, case_name, status, duration_ms, start,
+                   ROW_NUMBER() OVER (PARTITION BY history_id ORDER BY start DESC) AS n
+            FROM results)
+        WHERE n <= ? ORDER BY case_name, start""", (last,)).fetchall()
+    cases = {}
+    for history_id, name, status, duration in rows:
+        case = cases.setdefault(history_id, {"name": name, "statuses": [], "durations": []})
+        case["name"] = name
+        case["statuses"].append(status)
+        if duration is not None:
+            case["durations"].append(duration)
+    for case in cases.values():
+        statuses = case["statuses"]
+        case["failures"] = sum(status in FAILED_STATUSES for status in statuses)
+        case["flips"] = sum(a != b for a, b in zip(statuses, statuses[1:]))
+        case["avg_ms"] = sum(case["durations"]) / len(case["durations"]) if case["durations"] else 0
+    return sorted(cases.values(), key=lambda c: c["name"])
+
+
+def _time(ms):
+    return time.strftime("%m-%d %H:%M", time.localtime(ms / 1000)) if ms else "-"
+
+
+def text_report(conn, last=10):
+    lines = [f"📊 最近 {last} 次运行"]
+    for run_id, source, started, stopped, passed, failed, skipped, total in run_trend(conn, last):
+        duration = (stopped - started) / 1000 if started and stopped else 0
+        lines.append(f"  #{run_id:<4} {_time(started)}  通过 {passed:>3}  失败 {failed:>3}  跳过 {skipped:>3}  "
+                     f"共 {total:>3}  耗时 {duration:>7.1f}s  {os.path.basename(source)}")
+    lines.append(f"\n📋 用例历史（最近 {last} 次，左旧右新）")
+    for case in case_history(conn, last):
+        marks = "".join(STATUS_MARKS.get(status, "❔") for status in case["statuses"])
+        flaky = "  ⚠️不稳定" if case["flips"] >= 2 else ""
+        lines.append(f"  {marks:<{last * 2}} 平均 {case['avg_ms'] / 1000:>6.1f}s  {case['name']}{flaky}")
+    return "\n".join(lines)
+
+
+def html_report(conn, last=10):
+    """单文件HTML趋势报告（无外部资源，几KB）"""
+    trend = run_trend(conn, last)
+    peak = max((row[7] for row in trend), default=1) or 1
+    bars = "".join(
+        f'<div class="bar" title="#{run_id} 通过{passed} 失败{failed}">'
+        f'<span class="fail" style="height:{failed * 100 / peak:.0f}px"></span>'
+        f'<span class="pass" style="height:{passed * 100 / peak:.0f}px"></span>'
+        f'<small>#{run_id}<br>{_time(started)}</small></div>'
+        for run_id, _, started, _, passed, failed, _, _ in trend)
+    rows = "".join(
+        f"<tr><td>{html.escape(case['name'])}</td>"
+        f"<td>{''.join(STATUS_MARKS.get(s, '❔') for s in case['statuses'])}</td>"
+        f"<td>{case['avg_ms'] / 1000:.1f}s</td><td>{case['failures']}</td>"
+        f"<td>{'⚠️' if case['flips'] >= 2 else ''}</td></tr>"
+        for case in case_history(conn, last))
+    return f"""<!DOCTYPE html><html lang="zh-CN"><head><meta charset="utf-8"><title>测试趋势</title>
+<style>
+body{{font-family:sans-serif;margin:24px}} .trend{{display:flex;align-items:flex-end;gap:8px;height:150px}}
+.bar{{display:flex;flex-direction:column;justify-content:flex-end;align-items:center;width:56px}}
+.bar span{{width:28px;display:block}} .pass{{background:#97cc64}} .fail{{background:#fd5a3e}}
+small{{color:#666;text-align:center}} table{{border-collapse:collapse;margin-top:24px}}
+td,th{{border:1px solid #ddd;padding:4px 8px;text-align:left}}
+</style></head><body>
+<h2>最近 {len(trend)} 次运行</h2><div class="trend">{bars}</div>
+<h2>用例历史</h2><table><tr><th>用例</th><th>最近状态（左旧右新）</th><th>平均耗时</th><th>失败次数</th><th>不稳定</th></tr>
+{rows}</table><p><small>生成时间：{time.strftime('%Y-%m-%d %H:%M:%S')}</small></p></body></html>"""
+
+
+def ingest_and_report(results_dir, last=10):
+    """用例模块直接运行后调用：导入本次结果并打印汇总/趋势"""
+    conn = connect()
+    try:
+        ingest(conn, results_dir)
+        print(text_report(conn, last))
+    finally:
+        conn.close()
+
+
+def generate_allure(results_dirs, output="allure-report"):
+    """按需生成完整的Allure HTML报告（较慢，只在需要查看步骤/截图明细时使用）"""
+    allure_cmd = shutil.which("allure")
+    if allure_cmd is None:
+        raise FileNotFoundError("未找到Allure命令，请先安装Allure并配置环境变量")
+    subprocess.run([allure_cmd, "generate", *results_dirs, "-o", output, "--clean"], check=True)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测试结果库：增量导入Allure结果，生成汇总/趋势报告")
+    parser.add_argument("--db", default=settings.RESULTS_DB_PATH, help="结果库文件")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="导入Allure结果目录（只处理新增文件）")
+    ingest_parser.add_argument("dirs", nargs="+")
+    report_parser = commands.add_parser("report", help="输出汇总/趋势报告")
+    report_parser.add_argument("--last", type=int, default=10, help="统计最近N次运行")
+    report_parser.add_argument("--html", default=None, help="同时写出单文件HTML报告")
+    allure_parser = commands.add_parser("allure", help="按需生成完整Allure HTML报告")
+    allure_parser.add_argument("dirs", nargs="+")
+    allure_parser.add_argument("-o", "--output", default="allure-report")
+    args = parser.parse_args(argv)
+
+    if args.command == "allure":
+        try:
+            print(f"✅ 完整报告已生成：{os.path.abspath(generate_allure(args.dirs, args.output))}")
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"❌ 报告生成失败：{e}")
+            return 1
+        return 0
+
+    conn = connect(args.db)
+    try:
+        if args.command == "ingest":
+            for results_dir in args.dirs:
+                print(f"✅ {results_dir}：新增 {ingest(conn, results_dir)} 条用例结果")
+        else:
+            started = time.perf_counter()
+            print(text_report(conn, args.last))
+            if args.html:
+                with open(args.html, "w", encoding="utf-8") as f:
+                    f.write(html_report(conn, args.last))
+                print(f"\n📊 HTML报告：{os.path.abspath(args.html)}")
+            print(f"ℹ️ 报告生成耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import math
+import os
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+import settings
+from parallel_runner import ENV_WORKER_COUNT
+from run_state import case_fingerprint
+
+
+# --------------------------
+# 失败重试与隔离插件：
+# - 只重试可判定为瞬时错误的失败（等待超时、元素失效、驱动崩溃/连接中断），断言失败不重试
+# - 重试前归还（丢弃）出错的浏览器会话，重试时从驱动池借出新会话；每次运行有重试总预算
+# - 重试后才通过、或用例和代码都没变却从失败恢复为通过，计为一次“不稳定”，
+#   不稳定评分（运行状态文件中按用例记录）达到阈值的用例默认照常执行、只在报告中列出；
+#   --quarantine skip 时隔离跳过，每跳过一次评分衰减一次，降到阈值以下后自动重新执行复查
+# --------------------------
+QUARANTINE_MODES = ("skip", "run")
+
+# 瞬时错误：异常类名（含父类） -> 分类（按类名匹配，不需要导入Selenium/requests）
+TRANSIENT_ERRORS = {
+    "TimeoutException": "等待超时",                   # WebDriverWait 超时
+    "Timeout": "等待超时",                            # requests 超时（纯HTTP层）
+    "TimeoutError": "等待超时",
+    "StaleElementReferenceException": "元素已失效",
+    "InvalidSessionIdException": "驱动崩溃",
+    "NoSuchWindowException": "驱动崩溃",
+    "MaxRetryError": "驱动崩溃",                      # 驱动进程已退出，WebDriver命令连不上
+    "ProtocolError": "驱动崩溃",
+    "ConnectionError": "连接中断",                    # requests / 内置连接错误
+}
+# WebDriverException 中表示浏览器/驱动已崩溃的消息片段
+DRIVER_CRASH_MESSAGES = ("not reachable", "disconnected", "session deleted", "invalid session id",
+                         "target crashed", "tab crashed")
+
+
+def classify(exc):
+    """判定异常是否为瞬时错误：返回分类（如“等待超时”），不可重试时返回None"""
+    names = [cls.__name__ for cls in type(exc).__mro__]
+    for name in names:
+        if name in TRANSIENT_ERRORS:
+            return TRANSIENT_ERRORS[name]
+    if "WebDriverException" in names and any(text in str(exc).lower() for text in DRIVER_CRASH_MESSAGES):
+        return "驱动崩溃"
+    return None
+
+
+class RetryPolicy:
+    """重试策略：单个用例最多重试 max_retries 次，整个运行最多重试 budget 次"""
+
+    def __init__(self, max_retries, budget):
+        self.max_retries = max(0, max_retries)
+        self.budget = max(0, budget)
+        self.used = 0
+        self.recovered = []       # 重试后通过的用例
+        self.denied = 0           # 预算耗尽而未重试的次数
+        self.reasons = {}         # 分类 -> 重试次数
+
+    def allow(self, reason, attempt):
+        if reason is None or attempt >= self.max_retries:
+            return False
+        if self.used >= self.budget:
+            self.denied += 1
+            return False
+        self.used += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        return True
+
+    def summary(self):
+        detail = "，".join(f"{reason} {count}" for reason, count in self.reasons.items()) or "无"
+        text = f"失败重试：共重试 {self.used}/{self.budget} 次（{detail}），重试后通过 {len(self.recovered)} 个用例"
+        if self.denied:
+            text += f"；重试预算耗尽，{self.denied} 次瞬时错误未重试"
+        return text
+
+
+def _close_allure_attempt(item):
+    """把失败的这次执行作为独立的Allure结果落盘（historyId相同，报告中显示为该用例的重试记录）"""
+    listener = item.config.pluginmanager.get_plugin("allure_listener")
+    if listener is None:
+        return
+    uuid = listener._cache.pop(item.nodeid)
+    if uuid:
+        listener.allure_logger.close_test(uuid)
+
+
+# --------------------------
+# pytest插件钩子
+# --------------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("retry_policy", "失败重试与隔离")
+    group.addoption("--retries", type=int, default=settings.RETRY_MAX,
+                    help="单个用例遇到瞬时错误（超时/元素失效/驱动崩溃）时最多重试几次，0=不重试")
+    group.addoption("--retry-budget", type=int, default=settings.RETRY_BUDGET,
+                    help="本次运行最多重试多少次（并行时按worker数均分），避免环境故障时运行时间成倍增长")
+    group.addoption("--quarantine", default=settings.QUARANTINE_MODE, choices=QUARANTINE_MODES,
+                    help="不稳定评分达到阈值的用例：run=照常执行（只在报告中列出），skip=隔离跳过（评分逐次衰减后自动复查）")
+
+
+def pytest_configure(config):
+    budget = config.getoption("retry_budget")
+    workers = int(os.environ.get(ENV_WORKER_COUNT, "1"))
+    config._retry_policy = RetryPolicy(config.getoption("retries"), math.ceil(budget / max(workers, 1)))
+    config._quarantined = {}
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    state = config._run_state
+    fingerprints = getattr(config, "_run_fingerprints", {})
+    skip = config.getoption("quarantine") == "skip"
+    for item in items:
+        score = state.flaky_score(item.nodeid, fingerprints.get(item.nodeid) or case_fingerprint(item))
+        if score < settings.QUARANTINE_SCORE:
+            continue
+        config._quarantined[item.nodeid] = score
+        if skip:
+            item.add_marker(pytest.mark.skip(reason=f"已隔离：不稳定评分 {score:.2f}（--quarantine run 可照常执行）"))
+            if not config.option.collectonly:  # 只收集（如并行调度）不算一次跳过
+                state.decay(item.nodeid)
+
+
+def pytest_report_collectionfinish(config, items):
+    quarantined = [nodeid for nodeid in config._quarantined if nodeid in {item.nodeid for item in items}]
+    if not quarantined:
+        return None
+    if config.getoption("quarantine") == "skip":
+        return f"ℹ️ 已隔离 {len(quarantined)} 个不稳定用例（跳过执行，评分降到阈值以下后重新执行）：{', '.join(quarantined)}"
+    return f"ℹ️ 不稳定用例 {len(quarantined)} 个（照常执行，--quarantine skip 可隔离跳过）：{', '.join(quarantined)}"
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """失败时在报告上标注瞬时错误分类（transient），供重试判断和Fixture丢弃会话"""
+    outcome = yield
+    report = outcome.get_result()
+    report.transient = classify(call.excinfo.value) if report.failed and call.excinfo else None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    执行用例；失败且为瞬时错误、预算充足时重新执行整个用例（setup/call/teardown）
+    被重试的失败报告标记为 rerun，不计入失败；运行状态插件据此识别“重试后才通过”
+    """
+    policy = item.config._retry_policy
+    if policy.max_retries == 0:
+        return None
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    attempt = 0
+    while True:
+        reports = runtestprotocol(item, nextitem=nextitem, log=False)
+        failed = next((report for report in reports if report.failed), None)
+        retry = failed is not None and policy.allow(failed.transient, attempt)
+        for report in reports:
+            if retry and report.failed:
+                report.outcome = "rerun"
+            item.ihook.pytest_runtest_logreport(report=report)
+        if not retry:
+            break
+        attempt += 1
+        _close_allure_attempt(item)
+    if attempt and failed is None:
+        policy.recovered.append(item.nodeid)
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+def pytest_report_teststatus(report):
+    if report.outcome == "rerun":
+        return "rerun", "R", ("RERUN", {"yellow": True})
+    return None
+
+
+def pytest_terminal_summary(terminalreporter):
+    policy = terminalreporter.config._retry_policy
+    if policy.used or policy.denied:
+        terminalreporter.write_line(f"ℹ️ {policy.summary()}")
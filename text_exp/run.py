@@ -0,0 +1,219 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import settings
+
+
+# --------------------------
+# 统一执行入口：一条命令选择工作表/模块、worker数、执行层级、结果目录和报告方式
+#   python run.py list [login search ...] [--case-prefix ...]     只列出用例（读用例缓存，不导入pytest/Selenium/pandas）
+#   python run.py test [login search ...] -n 4 --tier http ...      执行用例（未识别的参数原样传给pytest）
+#   python run.py harvest --keywords keywords.txt -w 16               批量搜索校验（参数见 search_harvest.py --help）
+#   python run.py bench --sizes 10,1000,100000                        框架自身基准测试（参数见 harness_bench.py --help）
+# 顶层只导入标准库和配置；pytest、Selenium、allure 在真正执行时才导入
+# --------------------------
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 工作表 -> 测试模块
+SHEET_MODULES = {
+    "Sheet1": "readexcel02.py",
+    "Sheet2": "readexcel03.py",
+    "Sheet3": "readexcel04.py",
+}
+# 工作表 -> 按用例参数化的测试函数（用于不经过pytest收集直接拼出节点ID）
+SHEET_TESTS = {
+    "Sheet1": "test_login",
+    "Sheet2": "test_register_cases",
+    "Sheet3": "test_search_function",
+}
+# 别名 -> 工作表（也可以直接写工作表名或模块文件名）
+ALIASES = {
+    "login": "Sheet1",
+    "register": "Sheet2",
+    "search": "Sheet3",
+}
+REPORT_MODES = ("summary", "allure", "none")
+DEFAULT_RESULTS_DIR = "allure-results"
+
+
+def resolve_sheets(targets):
+    """把 别名/工作表名/模块文件名 统一解析为工作表名（保持顺序、去重）；为空表示全部"""
+    if not targets:
+        return list(SHEET_MODULES)
+    module_sheets = {module: sheet for sheet, module in SHEET_MODULES.items()}
+    sheets = []
+    for target in targets:
+        name = os.path.basename(target)
+        sheet = ALIASES.get(name.lower()) or module_sheets.get(name) or (name if name in SHEET_MODULES else None)
+        if sheet is None:
+            choices = ", ".join([*ALIASES, *SHEET_MODULES, *module_sheets])
+            raise SystemExit(f"❌ 未知的工作表/模块：{target}（可选：{choices}）")
+        if sheet not in sheets:
+            sheets.append(sheet)
+    return sheets
+
+
+def _split_option(value):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+
+def _add_filter_options(parser):
+    parser.add_argument("targets", nargs="*", help="工作表/模块：login register search、Sheet1…、readexcel02.py…（默认全部）")
+    parser.add_argument("--case-prefix", default=os.environ.get("CASE_PREFIX"), help="用例ID前缀（逗号分隔）")
+    parser.add_argument("--case-module", default=os.environ.get("CASE_MODULE"), help="“模块”列（逗号分隔）")
+    parser.add_argument("--case-priority", default=os.environ.get("CASE_PRIORITY"), help="“优先级”列（逗号分隔）")
+
+
+def list_cases(args):
+    """列出选中的用例（节点ID + 测试标题），与pytest收集结果一致"""
+    import case_loader
+
+    started_at = time.perf_counter()
+    try:
+        case_loader.load_workbook()  # 预检整本Excel（结果随Excel缓存）
+    except ValueError as e:  # preflight.CaseValidationError：捕获基类，缓存命中时不必导入pandas
+        print(e)
+        return 2
+    total = 0
+    for sheet_name in resolve_sheets(args.targets):
+        records = case_loader.filter_records(
+            case_loader.load_sheet(sheet_name),
+            prefixes=_split_option(args.case_prefix),
+            modules=_split_option(args.case_module),
+            priorities=_split_option(args.case_priority),
+        )
+        node_prefix = f"{SHEET_MODULES[sheet_name]}::{SHEET_TESTS[sheet_name]}"
+        for record in records:
+            print(f"{node_prefix}[{record[case_loader.ID_COLUMN]}]  {record.get('测试标题') or ''}")
+            total += 1
+    print(f"\nℹ️ 共 {total} 个用例（{(time.perf_counter() - started_at) * 1000:.0f}ms）")
+    return 0
+
+
+def _pytest_args(args):
+    """把统一入口的选项转换为pytest参数（并行执行时同样传给每个worker）"""
+    # 固定rootdir：结果目录为绝对路径时pytest会把它算进rootdir推断，导致节点ID带上多余的路径前缀
+    pytest_args = ["--rootdir", HERE, "--tier", args.tier, "--select", args.select]
+    if args.browser_profile:
+        pytest_args += ["--browser-profile", args.browser_profile]
+    if args.budget_mode:
+        pytest_args += ["--budget-mode", args.budget_mode]
+    if args.screenshots:
+        pytest_args += ["--screenshots", args.screenshots]
+    if args.base_url:
+        pytest_args += ["--base-url", args.base_url]
+    if args.mock_shop:
+        pytest_args.append("--mock-shop")
+    for option in ("case_prefix", "case_module", "case_priority"):
+        value = getattr(args, option)
+        if value:
+            pytest_args += [f"--{option.replace('_', '-')}", value]
+    return pytest_args
+
+
+def serve_allure(results_dir):
+    """用 allure serve 打开完整报告（不经过shell，路径中有空格也没问题）"""
+    allure_cmd = shutil.which("allure")
+    if allure_cmd is None:
+        print("❌ 未找到Allure命令，请先安装Allure并配置环境变量")
+        return
+    print("\n📊 正在生成Allure报告...")
+    try:
+        subprocess.run([allure_cmd, "serve", results_dir], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ 报告生成失败：{e}")
+        print("ℹ️ 请确认：1. Allure已安装 2. 环境变量已配置 3. 结果目录有.json文件")
+
+
+def run_tests(args, extra_args):
+    modules = [SHEET_MODULES[sheet] for sheet in resolve_sheets(args.targets)]
+    results_dir = args.alluredir
+    os.makedirs(results_dir, exist_ok=True)
+    pytest_args = _pytest_args(args) + list(extra_args)
+
+    print(f"🚀 开始执行：{' '.join(modules)}（执行层级 {args.tier}，结果目录 {os.path.abspath(results_dir)}）")
+    if args.workers > 1:
+        import parallel_runner
+
+        exit_code, _ = parallel_runner.run_parallel(modules, args.workers, results_dir, pytest_args)
+    else:
+        import pytest
+
+        exit_code = pytest.main(["--alluredir", results_dir, *pytest_args, *modules])
+
+    if args.report != "none":
+        if os.listdir(results_dir):
+            import results_db
+
+            print()
+            results_db.ingest_and_report(results_dir)
+            if args.report == "allure":
+                serve_allure(results_dir)
+            else:
+                print(f"ℹ️ 需要查看步骤/截图明细时：python run.py test ... --report allure"
+                      f"（或 python results_db.py allure {results_dir}）")
+        else:
+            print("❌ Allure结果目录为空，无法生成报告（测试可能未执行或执行失败）")
+    print(f"\n📋 测试退出码：{int(exit_code)}（0=全部通过，非0=存在失败）")
+    return int(exit_code)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Excel驱动测试的统一执行入口", allow_abbrev=False)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="列出选中的用例（不启动浏览器）", allow_abbrev=False)
+    _add_filter_options(list_parser)
+
+    test_parser = commands.add_parser("test", help="执行用例（未识别的参数原样传给pytest，如 -s -v -x）",
+                                      allow_abbrev=False)
+    _add_filter_options(test_parser)
+    test_parser.add_argument("-n", "--workers", type=int, default=1, help="worker进程数（>1时并行执行）")
+    test_parser.add_argument("--tier", default=settings.EXEC_TIER, choices=settings.EXEC_TIERS,
+                             help="执行层级：browser / headless / http")
+    test_parser.add_argument("--alluredir", default=DEFAULT_RESULTS_DIR, help="Allure结果目录")
+    test_parser.add_argument("--browser-profile", default=None, choices=settings.BROWSER_PROFILES,
+                             help="浏览器配置：default=原样加载，fast=屏蔽图片/字体/媒体/统计脚本、关闭动画、固定视口")
+    test_parser.add_argument("--budget-mode", default=None, choices=("fail", "degrade", "off"),
+                             help="超出Excel中的性能预算时：fail=用例失败，degrade=标记性能降级，off=不检查")
+    test_parser.add_argument("--screenshots", default=None, choices=settings.SCREENSHOT_MODES, help="截图策略")
+    test_parser.add_argument("--select", default=settings.RUN_SELECT, choices=("all", "changed"),
+                             help="all=全部执行，changed=只执行新增/有变化/上次失败的用例")
+    test_parser.add_argument("--base-url", default=None, help="被测站点地址")
+    test_parser.add_argument("--mock-shop", action="store_true", help="启动本地模拟商城并以它为被测站点")
+    test_parser.add_argument("--report", default="allure" if settings.ALLURE_FULL_REPORT else "summary",
+                             choices=REPORT_MODES,
+                             help="执行后报告：summary=结果库汇总/趋势，allure=汇总后打开完整Allure报告，none=不输出")
+    commands.add_parser("harvest", help="批量搜索校验：并发抓取全部结果页并评分相关度（参数原样传给search_harvest）",
+                        add_help=False)
+    commands.add_parser("bench", help="框架自身基准测试：合成用例表+假驱动测量加载/收集/用例开销（参数原样传给harness_bench）",
+                        add_help=False)
+    return parser
+
+
+def main(argv=None):
+    args, extra_args = build_parser().parse_known_args(argv)
+    if args.command == "harvest":
+        import search_harvest
+
+        return search_harvest.main(extra_args)
+    if args.command == "bench":
+        import harness_bench
+
+        return harness_bench.main(extra_args)
+    if args.command == "test":
+        args.alluredir = os.path.abspath(args.alluredir)
+    os.chdir(HERE)  # 模块路径、用例Excel均相对于本目录（结果目录已按调用时的目录转为绝对路径）
+    if args.command == "list":
+        if extra_args:
+            raise SystemExit(f"❌ 无法识别的参数：{' '.join(extra_args)}")
+        return list_cases(args)
+    return run_tests(args, extra_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
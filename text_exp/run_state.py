@@ -0,0 +1,247 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+
+import pytest
+
+import case_loader
+import settings
+from parallel_runner import ENV_CASE_FILE, ENV_STATE_FILE
+
+
+# --------------------------
+# 增量执行插件：记录每个用例的指纹（用例行内容 + 测试代码版本）、历史结果和耗时（.run_state.json）
+# --select changed 时只执行 新增 / 内容或代码有变化 / 上次失败 的用例，
+# 并按历史失败率从高到低、耗时从短到长排序（尽早暴露失败）；默认 --select all 仍执行全部用例
+# --------------------------
+SELECT_MODES = ("all", "changed")
+STATE_VERSION = 1
+FLAKY_WEIGHT = 0.3         # 不稳定评分的指数滑动平均权重（连续两次不稳定即超过默认阈值0.5）
+
+_code_versions = {}        # 模块名 -> 代码版本（同一会话只计算一次）
+
+
+def _file_digest(path, digest):
+    with open(path, "rb") as f:
+        digest.update(f.read())
+
+
+def code_version(module):
+    """
+    测试代码版本：测试模块、conftest，以及测试模块直接引用的本目录模块（页面流程、步骤编译器等）的内容哈希
+    """
+    if module.__name__ in _code_versions:
+        return _code_versions[module.__name__]
+    here = os.path.dirname(os.path.abspath(module.__file__))
+    files = {os.path.abspath(module.__file__), os.path.join(here, "conftest.py")}
+    for value in vars(module).values():
+        source = value if inspect.ismodule(value) else sys.modules.get(getattr(value, "__module__", None) or "")
+        path = getattr(source, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == here:
+            files.add(os.path.abspath(path))
+    digest = hashlib.sha1()
+    for path in sorted(files):
+        if os.path.exists(path):
+            digest.update(os.path.basename(path).encode("utf-8"))
+            _file_digest(path, digest)
+    _code_versions[module.__name__] = digest.hexdigest()
+    return _code_versions[module.__name__]
+
+
+def case_fingerprint(item):
+    """用例指纹：Excel用例行（测试步骤、预期结果等所有列）+ 测试代码版本"""
+    digest = hashlib.sha1(code_version(item.module).encode("utf-8"))
+    marker = item.get_closest_marker("excel_cases")
+    callspec = getattr(item, "callspec", None)
+    if marker is not None and callspec is not None and "case_id" in callspec.params:
+        row = case_loader.get_case(marker.args[0], callspec.params["case_id"])
+        digest.update(json.dumps(row, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+    else:
+        digest.update(item.nodeid.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_cases(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return {}  # 状态文件损坏时视为没有历史（全部用例都会被选中）
+    return payload.get("cases", {}) if payload.get("version") == STATE_VERSION else {}
+
+
+def _write_cases(path, cases):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": STATE_VERSION, "cases": cases}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def merge_states(shard_paths, path=None):
+    """调度进程：全部worker结束后，把各worker的状态分片按节点ID合并到状态文件（各worker的用例互不重叠）"""
+    path = path or settings.RUN_STATE_PATH
+    cases = _read_cases(path)
+    updated = {}
+    for shard_path in shard_paths:
+        updated.update(_read_cases(shard_path))
+    if updated:
+        cases.update(updated)
+        _write_cases(path, cases)
+    return len(updated)
+
+
+class RunState:
+    """
+    运行状态存储：节点ID -> {指纹、执行次数、失败次数、上次结果、平均耗时、不稳定评分、上次执行时间}
+    保存时按节点ID合并（只覆盖本进程执行过的用例）；并行worker只写自己的状态分片，由调度进程统一合并
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.RUN_STATE_PATH
+        self.cases = _read_cases(self.path)
+        self._updated = {}
+
+    def due_reason(self, nodeid, fingerprint):
+        """需要执行的原因；无需执行时返回None"""
+        entry = self.cases.get(nodeid)
+        if entry is None:
+            return "新增"
+        if entry["fingerprint"] != fingerprint:
+            return "已变更"
+        if entry["last_outcome"] == "failed":
+            return "上次失败"
+        return None
+
+    def order_key(self, nodeid):
+        """排序：新增用例优先，其次历史失败率高的，同失败率耗时短的优先"""
+        entry = self.cases.get(nodeid)
+        if entry is None:
+            return (0, 0.0, 0.0)
+        return (1, -entry["failures"] / max(entry["runs"], 1), entry["avg_duration"])
+
+    def flaky_score(self, nodeid, fingerprint):
+        """不稳定评分（0~1）；用例内容或代码有变化后重新评估（返回0）"""
+        entry = self.cases.get(nodeid)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return 0.0
+        return entry.get("flaky_score", 0.0)
+
+    def record(self, nodeid, fingerprint, outcome, duration, retried=False):
+        previous = self.cases.get(nodeid)
+        entry = dict(previous or {"runs": 0, "failures": 0, "avg_duration": duration})
+        entry["runs"] += 1
+        entry["failures"] += outcome == "failed"
+        # 平均耗时用指数滑动平均，近期结果权重更高
+        entry["avg_duration"] = round(entry["avg_duration"] * 0.7 + duration * 0.3, 3)
+        # 不稳定：重试后才通过，或用例和代码都没变却从失败恢复为通过；指纹变化后评分清零重新累计
+        unchanged = previous is not None and previous["fingerprint"] == fingerprint
+        flaky = outcome == "passed" and (retried or (unchanged and previous["last_outcome"] == "failed"))
+        score = entry.get("flaky_score", 0.0) if unchanged else 0.0
+        entry["flaky_score"] = round(score * (1 - FLAKY_WEIGHT) + FLAKY_WEIGHT * flaky, 3)
+        entry["flaky_runs"] = entry.get("flaky_runs", 0) + flaky
+        entry.update(fingerprint=fingerprint, last_outcome=outcome, last_duration=round(duration, 3),
+                     last_run=time.time())
+        self.cases[nodeid] = entry
+        self._updated[nodeid] = entry
+
+    def decay(self, nodeid):
+        """隔离跳过一次：评分按一次稳定运行衰减（降到阈值以下后重新执行复查，不会永久隔离）"""
+        entry = self.cases.get(nodeid)
+        if entry is None:
+            return
+        entry = dict(entry, flaky_score=round(entry.get("flaky_score", 0.0) * (1 - FLAKY_WEIGHT), 3))
+        self.cases[nodeid] = entry
+        self._updated[nodeid] = entry
+
+    def save(self):
+        """
+        读取-合并-写回状态文件；并行worker（设置了 ENV_STATE_FILE）写到自己的分片，
+        避免多个worker同时结束时读-合并-写互相覆盖，分片由调度进程合并（merge_states）
+        """
+        if not self._updated:
+            return
+        path = os.environ.get(ENV_STATE_FILE) or self.path
+        cases = _read_cases(path)
+        cases.update(self._updated)
+        _write_cases(path, cases)
+        self._updated = {}
+
+
+# --------------------------
+# pytest插件钩子
+# --------------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("run_state", "增量执行")
+    group.addoption("--select", default=settings.RUN_SELECT, choices=SELECT_MODES,
+                    help="用例选择：all=全部执行，changed=只执行新增/有变化/上次失败的用例")
+
+
+def pytest_configure(config):
+    config._run_state = RunState()
+    config._run_fingerprints = {}
+    config._run_outcomes = {}
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    state = config._run_state
+    for item in items:
+        config._run_fingerprints[item.nodeid] = case_fingerprint(item)
+    # 并行worker只执行调度进程分配的用例（选择已在调度进程的收集阶段完成）
+    if config.getoption("select") == "all" or os.environ.get(ENV_CASE_FILE):
+        return
+    reasons = {item.nodeid: state.due_reason(item.nodeid, config._run_fingerprints[item.nodeid]) for item in items}
+    selected = [item for item in items if reasons[item.nodeid]]
+    deselected = [item for item in items if not reasons[item.nodeid]]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = sorted(selected, key=lambda item: state.order_key(item.nodeid))
+    config._run_selection = {nodeid: reason for nodeid, reason in reasons.items() if reason}
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    item._run_reports.append(outcome.get_result())
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    按用例汇总各阶段结果：任一阶段失败即为失败，耗时为各阶段之和（含重试）；跳过的用例不记录
+    被重试的失败报告（rerun）不计入结果，只标记该用例经过重试
+    """
+    item._run_reports = []
+    yield
+    reports = item._run_reports
+    if not reports or any(report.skipped for report in reports):
+        return
+    outcome = "failed" if any(report.failed for report in reports) else "passed"
+    retried = any(report.outcome == "rerun" for report in reports)
+    item.config._run_outcomes[item.nodeid] = (outcome, sum(report.duration for report in reports), retried)
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    state = config._run_state
+    for nodeid, (outcome, duration, retried) in config._run_outcomes.items():
+        fingerprint = config._run_fingerprints.get(nodeid)
+        if fingerprint:
+            state.record(nodeid, fingerprint, outcome, duration, retried)
+    state.save()
+
+
+def pytest_report_collectionfinish(config, items):
+    selection = getattr(config, "_run_selection", None)
+    if selection is None:
+        return None
+    counts = {}
+    for reason in selection.values():
+        counts[reason] = counts.get(reason, 0) + 1
+    detail = "，".join(f"{reason} {count}" for reason, count in counts.items()) or "无"
+    return f"ℹ️ 增量执行：选中 {len(selection)} 个用例（{detail}）"
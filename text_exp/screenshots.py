@@ -0,0 +1,191 @@
+import hashlib
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import allure_commons
+
+import settings
+
+try:
+    from PIL import Image  # 可选依赖：缩放/转码/感知哈希去重
+except ImportError:
+    Image = None
+
+
+# --------------------------
+# 截图策略：控制何时截图，并对截图去重（感知哈希）、缩放、转码（JPEG/WebP）
+# 编码在后台线程完成，用例结束（Fixture清理）时才统一等待并附加到Allure报告，步骤结束时不等待，不占用用例的关键路径
+# 附件名称前加上截图时所在的步骤标题，报告中仍能看出是哪个步骤的截图
+# --------------------------
+_executor = None
+_executor_lock = threading.Lock()
+_active = None             # 当前用例的截图记录器
+_steps = {}                # 正在执行的Allure步骤：uuid -> 标题（按开始顺序，最后一个为当前步骤）
+totals = {"captured": 0, "deduplicated": 0, "raw_bytes": 0, "stored_bytes": 0}  # 整个测试会话的汇总
+
+_FORMATS = {
+    "jpeg": ("JPEG", allure.attachment_type.JPG, None),
+    "webp": ("WEBP", "image/webp", "webp"),
+    "png": ("PNG", allure.attachment_type.PNG, None),
+}
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # 单线程：保证同一用例的截图按顺序去重
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-encoder")
+        return _executor
+
+
+def perceptual_hash(image, size=16):
+    """
+    感知哈希（512位）：差值哈希（相邻像素明暗变化）+ 均值哈希（整体明暗分布）
+    两张截图哈希的汉明距离越小越相似
+    """
+    gray = image.convert("L")
+    pixels = gray.resize((size + 1, size)).tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            bits = (bits << 1) | (pixels[row * (size + 1) + col] > pixels[row * (size + 1) + col + 1])
+    pixels = gray.resize((size, size)).tobytes()
+    mean = sum(pixels) / len(pixels)
+    for value in pixels:
+        bits = (bits << 1) | (value > mean)
+    return bits
+
+
+class ScreenshotRecorder:
+    """
+    单个用例的截图记录器
+    - capture()：按策略决定是否截图；截图后交给后台线程去重/编码
+    - flush()：等待编码完成并附加到Allure报告（用例结束时自动调用）
+    """
+
+    def __init__(self, mode=None, fmt=None):
+        self.mode = mode or settings.SCREENSHOT_MODE
+        self.fmt = (fmt or settings.SCREENSHOT_FORMAT).lower()
+        if Image is None:
+            self.fmt = "png"  # 没有Pillow时只做精确去重，原样保存PNG
+        self._pending = []
+        self._last_frame = None     # first_last 模式下暂存的最后一张（未编码）
+        self._captured = 0
+        self._last_hash = None      # 仅在编码线程中读写
+        self.failure_captured = False
+        self.stats = {"captured": 0, "deduplicated": 0, "raw_bytes": 0, "stored_bytes": 0}
+
+    def capture(self, driver, name, force=False):
+        """
+        按策略截图
+        :param force: 失败/异常截图，任何策略（off除外）都保留
+        """
+        if self.mode == "off" or (self.mode == "failure" and not force):
+            return
+        if self.mode == "first_last" and not force and self._captured > 0:
+            self._last_frame = (name, driver.get_screenshot_as_png())
+            self._captured += 1
+            return
+        self._captured += 1
+        if force:
+            self.failure_captured = True
+        self._submit(name, driver.get_screenshot_as_png(), dedupe=not force)
+
+    def _submit(self, name, png, dedupe=True):
+        step = next(reversed(_steps.values()), None)
+        future = _get_executor().submit(self._encode, png, dedupe)
+        self._pending.append((f"{step}：{name}" if step else name, future))
+
+    def _encode(self, png, dedupe):
+        """后台线程：去重 + 缩放 + 转码，重复截图返回None"""
+        self.stats["captured"] += 1
+        self.stats["raw_bytes"] += len(png)
+        if Image is None:
+            digest = hashlib.sha1(png).hexdigest()
+            if dedupe and digest == self._last_hash:
+                self.stats["deduplicated"] += 1
+                return None
+            self._last_hash = digest
+            self.stats["stored_bytes"] += len(png)
+            return png
+        image = Image.open(io.BytesIO(png))
+        digest = perceptual_hash(image)
+        if dedupe and self._last_hash is not None and \
+                bin(digest ^ self._last_hash).count("1") <= settings.SCREENSHOT_DEDUP_DISTANCE:
+            self.stats["deduplicated"] += 1
+            return None
+        self._last_hash = digest
+        if image.width > settings.SCREENSHOT_MAX_WIDTH:
+            height = round(image.height * settings.SCREENSHOT_MAX_WIDTH / image.width)
+            image = image.resize((settings.SCREENSHOT_MAX_WIDTH, height))
+        pil_format = _FORMATS[self.fmt][0]
+        if pil_format == "JPEG":
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, pil_format, quality=settings.SCREENSHOT_QUALITY)
+        data = output.getvalue()
+        self.stats["stored_bytes"] += len(data)
+        return data
+
+    def flush(self, final=False):
+        """等待编码完成并把截图附加到当前Allure用例；final=True时同时处理first_last暂存的最后一张"""
+        if final and self._last_frame is not None:
+            name, png = self._last_frame
+            self._last_frame = None
+            self._submit(name, png)
+        pending, self._pending = self._pending, []
+        _, attachment_type, extension = _FORMATS[self.fmt]
+        for name, future in pending:
+            data = future.result()
+            if data is not None:
+                allure.attach(data, name, attachment_type, extension)
+
+
+def start_case(mode=None):
+    """用例开始：创建并激活截图记录器"""
+    global _active
+    _active = ScreenshotRecorder(mode)
+    return _active
+
+
+def finish_case(recorder):
+    """用例结束：刷新剩余截图并注销记录器"""
+    global _active
+    try:
+        recorder.flush(final=True)
+    finally:
+        if _active is recorder:
+            _active = None
+        for key, value in recorder.stats.items():
+            totals[key] += value
+
+
+def summary():
+    return (f"截图统计：截取 {totals['captured']} 张，去重丢弃 {totals['deduplicated']} 张，"
+            f"原始 {totals['raw_bytes'] / 1048576:.1f}MB -> 存储 {totals['stored_bytes'] / 1048576:.1f}MB")
+
+
+def capture(driver, name, force=False):
+    """供用例/页面流程调用的快捷方法；未激活记录器时（如直接运行函数）按原方式直接附加PNG"""
+    if _active is None:
+        allure.attach(driver.get_screenshot_as_png(), name, allure.attachment_type.PNG)
+    else:
+        _active.capture(driver, name, force)
+
+
+class _StepTracker:
+    """Allure钩子：记录当前步骤标题，用于截图附件命名（步骤结束时不等待编码）"""
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        _steps[uuid] = title
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        _steps.pop(uuid, None)
+
+
+step_tracker = _StepTracker()
@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+
+import case_loader
+import http_tier
+import settings
+from step_dsl import compile_steps
+
+try:
+    from selectolax.parser import HTMLParser as FastHTMLParser  # 可选：C实现的HTML解析，比标准库快一个数量级
+except ImportError:
+    FastHTMLParser = None
+
+
+# --------------------------
+# 批量搜索校验：对关键字列表逐个搜索，并发抓取每个关键字的全部结果页（纯HTTP，连接池复用），
+# 解析出商品标题后做归一化（全角/半角、大小写、空白）并按关键字评分相关度
+#   python search_harvest.py --keywords keywords.txt -w 16        关键字文件：每行“关键字[<Tab>预期结果]”
+#   python search_harvest.py --mock-shop --mock-products 5000      对本地商城替身自测（默认关键字取Sheet3用例）
+# 判定：预期“搜索成功”= 至少一个商品的相关度达到阈值；预期“搜索失败”= 没有任何结果
+# --------------------------
+SUCCESS, FAILURE = "搜索成功", "搜索失败"
+TITLE_CLASS = "goods-title"              # 商品标题元素的class
+PAGINATION_CLASSES = ("am-pagination", "pagination")
+PAGE_PATTERN = re.compile(r"[?&/]page[=/](\d+)")
+DEFAULT_OUTPUT_DIR = "search-results"
+PARSER_NAME = "selectolax" if FastHTMLParser is not None else "html.parser"
+
+
+# ---- 标题归一化与相关度 ----
+def normalize(text):
+    """全角转半角（NFKC）、统一小写、合并空白"""
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def _bigrams(words):
+    grams = set()
+    for word in words:
+        grams.update(word[i:i + 2] for i in range(len(word) - 1))
+        if len(word) == 1:
+            grams.add(word)
+    return grams
+
+
+def relevance(title, keyword):
+    """
+    商品标题与搜索关键字的相关度（0~1）：
+    归一化后整个关键字出现在标题中（忽略空格）为1；否则按关键字中每个词计分再取平均——
+    词出现在标题中计1分，没出现时按二字片段的重合比例计分（中文没有分词，如“华为手机”对“华为 Mate 智能手机”）
+    """
+    title, keyword = normalize(title), normalize(keyword)
+    if not keyword:
+        return 0.0
+    if keyword.replace(" ", "") in title.replace(" ", ""):
+        return 1.0
+    title_grams = _bigrams(title.split())
+    scores = []
+    for word in keyword.split():
+        if word in title:
+            scores.append(1.0)
+        else:
+            grams = _bigrams([word])
+            scores.append(len(grams & title_grams) / len(grams))
+    return sum(scores) / len(scores)
+
+
+# ---- 结果页解析：商品标题 + 最大页码 ----
+def _max_page(hrefs):
+    pages = [int(match.group(1)) for href in hrefs if href for match in PAGE_PATTERN.finditer(href)]
+    return max(pages, default=1)
+
+
+class _ResultPageParser(HTMLParser):
+    """标准库解析器（未安装selectolax时使用）：收集商品标题文本和分页区域内的链接"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.titles = []
+        self.hrefs = []
+        self._title = None          # 正在读取的标题：[标签名, 嵌套深度, 文本片段]
+        self._pagination = None     # 正在读取的分页区域：[标签名, 嵌套深度]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        for state in (self._title, self._pagination):
+            if state is not None and state[0] == tag:
+                state[1] += 1
+        if self._title is None and TITLE_CLASS in classes:
+            self._title = [tag, 1, []]
+        if self._pagination is None and any(name in classes for name in PAGINATION_CLASSES):
+            self._pagination = [tag, 1]
+        if self._pagination is not None and tag == "a":
+            self.hrefs.append(attrs.get("href"))
+
+    def handle_endtag(self, tag):
+        if self._title is not None and self._title[0] == tag:
+            self._title[1] -= 1
+            if self._title[1] == 0:
+                self.titles.append("".join(self._title[2]).strip())
+                self._title = None
+        if self._pagination is not None and self._pagination[0] == tag:
+            self._pagination[1] -= 1
+            if self._pagination[1] == 0:
+                self._pagination = None
+
+    def handle_data(self, data):
+        if self._title is not None:
+            self._title[2].append(data)
+
+
+def parse_results(text):
+    """解析搜索结果页：返回（商品标题列表，总页数）"""
+    if FastHTMLParser is not None:
+        tree = FastHTMLParser(text)
+        titles = [node.text(strip=True) for node in tree.css(f".{TITLE_CLASS}")]
+        selector = ", ".join(f".{name} a" for name in PAGINATION_CLASSES)
+        return titles, _max_page(node.attributes.get("href") for node in tree.css(selector))
+    parser = _ResultPageParser()
+    parser.feed(text)
+    parser.close()
+    return parser.titles, _max_page(parser.hrefs)
+
+
+# ---- 关键字列表 ----
+def keywords_from_file(path):
+    """关键字文件：每行“关键字”或“关键字<Tab>预期结果”，#开头为注释；未写预期结果时按“搜索成功”"""
+    keywords = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            keyword, _, expected = line.partition("\t")
+            keywords.append((keyword.strip(), expected.strip() or SUCCESS))
+    return keywords
+
+
+def keywords_from_sheet(sheet_name="Sheet3", excel_path=None):
+    """Excel搜索用例中的关键字和预期结果（与 readexcel04 同一份用例）"""
+    return [(compile_steps(record["测试步骤"]).arg("input_search") or "", str(record["预期结果"]).strip())
+            for record in case_loader.load_sheet(sheet_name, excel_path).records]
+
+
+# ---- 并发抓取 ----
+class SearchHarvester:
+    """
+    批量搜索：线程池并发请求，连接池由各线程的会话共享（http_tier.shared_adapter）
+    先抓取每个关键字的第1页，得到总页数后再把其余页加入队列；所有页都在同一个线程池中排队
+    """
+
+    def __init__(self, base_url=None, workers=None, max_pages=None, timeout=15):
+        self.base_url = (base_url or settings.BASE_URL).rstrip("/")
+        self.workers = max(1, workers or settings.HARVEST_WORKERS)
+        self.max_pages = max(1, max_pages or settings.HARVEST_MAX_PAGES)
+        self.timeout = timeout
+        self.requests = 0
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = http_tier.new_session()
+        return session
+
+    def fetch(self, keyword, page):
+        """抓取并解析一页结果：返回（商品标题列表，总页数）"""
+        response = self._session().get(self.base_url + settings.SEARCH_PATH, params={"wd": keyword, "page": page},
+                                       timeout=self.timeout)
+        response.raise_for_status()
+        return parse_results(response.text)
+
+    def harvest(self, keywords):
+        """抓取全部关键字的全部结果页；返回 {关键字: {"titles": [...], "pages": 页数, "error": 错误或None}}"""
+        results = {keyword: {"titles": {}, "pages": 0, "error": None} for keyword in keywords}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="harvest") as executor:
+            pending = {executor.submit(self.fetch, keyword, 1): (keyword, 1) for keyword in results}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    keyword, page = pending.pop(future)
+                    self.requests += 1
+                    result = results[keyword]
+                    try:
+                        titles, pages = future.result()
+                    except Exception as e:
+                        result["error"] = f"第{page}页：{type(e).__name__}: {e}"
+                        continue
+                    result["titles"][page] = titles
+                    if page == 1:
+                        result["pages"] = min(pages, self.max_pages)
+                        for next_page in range(2, result["pages"] + 1):
+                            pending[executor.submit(self.fetch, keyword, next_page)] = (keyword, next_page)
+        for result in results.values():
+            result["titles"] = [title for page in sorted(result["titles"]) for title in result["titles"][page]]
+        return results
+
+
+def evaluate(keyword, expected, harvested, min_score=None):
+    """按预期结果判定一个关键字的搜索结果，返回结果记录"""
+    min_score = settings.SEARCH_MIN_RELEVANCE if min_score is None else min_score
+    titles = harvested["titles"]
+    scores = [relevance(title, keyword) for title in titles]
+    relevant = sum(score >= min_score for score in scores)
+    if harvested["error"]:
+        ok = False
+    elif expected == FAILURE:
+        ok = not titles
+    else:
+        ok = relevant > 0
+    best = max(range(len(titles)), key=scores.__getitem__, default=None)
+    return {
+        "keyword": keyword, "expected": expected, "ok": ok, "error": harvested["error"],
+        "pages": harvested["pages"], "results": len(titles), "relevant": relevant,
+        "relevant_ratio": round(relevant / len(titles), 3) if titles else 0.0,
+        "best": titles[best] if best is not None else None,
+        "best_score": round(scores[best], 3) if best is not None else 0.0,
+    }
+
+
+def run(keywords, base_url=None, workers=None, max_pages=None, min_score=None):
+    """批量搜索并判定；返回（结果记录列表，统计信息）"""
+    expected = dict(keywords)  # 同一关键字出现多次时只搜索一次（以最后一次的预期为准）
+    harvester = SearchHarvester(base_url, workers, max_pages)
+    started = time.perf_counter()
+    harvested = harvester.harvest(list(expected))
+    elapsed = time.perf_counter() - started
+    records = [evaluate(keyword, expected[keyword], harvested[keyword], min_score) for keyword in expected]
+    stats = {"keywords": len(records), "requests": harvester.requests, "elapsed": round(elapsed, 3),
+             "failed": sum(not record["ok"] for record in records), "workers": harvester.workers,
+             "parser": PARSER_NAME}
+    return records, stats
+
+
+def write_results(records, stats, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "harvest.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stats": stats, "results": records}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量搜索校验：并发抓取全部结果页，按关键字评分商品标题相关度")
+    parser.add_argument("--keywords", default=None, help="关键字文件（每行“关键字[<Tab>预期结果]”）；默认取Sheet3用例")
+    parser.add_argument("-w", "--workers", type=int, default=settings.HARVEST_WORKERS, help="并发请求数")
+    parser.add_argument("--max-pages", type=int, default=settings.HARVEST_MAX_PAGES, help="每个关键字最多抓取的页数")
+    parser.add_argument("--min-score", type=float, default=settings.SEARCH_MIN_RELEVANCE, help="视为相关的最低相关度")
+    parser.add_argument("--base-url", default=None, help="被测商城地址（默认取settings.BASE_URL）")
+    parser.add_argument("--mock-shop", action="store_true", help="启动本地商城替身并对它搜索（自测）")
+    parser.add_argument("--mock-products", type=int, default=None, help="商城替身使用N个合成商品（需配合 --mock-shop）")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="harvest.json 输出目录")
+    parser.add_argument("--show", type=int, default=20, help="最多列出多少个未通过的关键字")
+    args = parser.parse_args(argv)
+
+    keywords = keywords_from_file(args.keywords) if args.keywords else keywords_from_sheet()
+    if not keywords:
+        print("❌ 没有可搜索的关键字")
+        return 1
+    if args.mock_shop:
+        import mock_shop  # 延迟导入，只有自测时才需要
+
+        products = mock_shop.synthetic_products(args.mock_products) if args.mock_products else None
+        args.base_url = mock_shop.start(products=products).base_url
+
+    print(f"🚀 批量搜索：{len(keywords)} 个关键字，{max(1, args.workers)} 个并发（解析器 {PARSER_NAME}）")
+    records, stats = run(keywords, args.base_url, args.workers, args.max_pages, args.min_score)
+    failed = [record for record in records if not record["ok"]]
+    for record in failed[:args.show]:
+        detail = record["error"] or (f"{record['results']} 个结果，相关 {record['relevant']} 个，"
+                                     f"最相关：{record['best']}（{record['best_score']}）")
+        print(f"  ❌ {record['keyword'] or '（空）'} [预期{record['expected']}] {detail}")
+    if len(failed) > args.show:
+        print(f"  ……其余 {len(failed) - args.show} 个未通过的关键字见结果文件")
+    path = write_results(records, stats, args.output)
+    rate = stats["requests"] / stats["elapsed"] if stats["elapsed"] else 0
+    print(f"{'✅' if not failed else '❌'} 通过 {len(records) - len(failed)}/{len(records)} 个关键字；"
+          f"{stats['requests']} 个请求，耗时 {stats['elapsed']:.2f}s（{rate:.0f} 页/秒）")
+    print(f"📊 结果已写入：{os.path.abspath(path)}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import os
+
+
+# --------------------------
+# 公共配置（readexcel02/03/04 共用，均支持环境变量覆盖）
+# --------------------------
+# Edge驱动路径（未设置时为None，由Selenium Manager自动查找/下载与本机Edge匹配的驱动）
+# 例：EDGE_DRIVER_PATH=D:\Users\29430\PycharmProjects\PythonProject1\msedgedriver.exe
+EDGE_DRIVER_PATH = os.environ.get("EDGE_DRIVER_PATH") or None
+
+# 驱动池：单个浏览器会话最多执行多少个用例后回收重建（防止长时间运行导致内存膨胀）
+DRIVER_POOL_MAX_USES = int(os.environ.get("DRIVER_POOL_MAX_USES", "20"))
+# 驱动池：最多保留多少个空闲会话
+DRIVER_POOL_MAX_IDLE = int(os.environ.get("DRIVER_POOL_MAX_IDLE", "2"))
+# 使用进程内假驱动代替Edge（harness_bench.py 测量测试框架自身开销时使用，也可 pytest --fake-driver）
+FAKE_DRIVER = os.environ.get("FAKE_DRIVER", "0") == "1"
+
+# 用例Excel路径（相对路径以执行目录为准，与各模块原来的写法一致）
+EXCEL_PATH = os.environ.get("CASE_EXCEL_PATH", "text_cases.xlsx")
+# 解析后的用例缓存目录（按Excel文件的修改时间/内容哈希失效）
+CASE_CACHE_DIR = os.environ.get("CASE_CACHE_DIR", ".case_cache")
+
+# 执行层级：browser=完整浏览器，headless=无头浏览器，http=纯HTTP提交表单（不启动浏览器）
+EXEC_TIERS = ("browser", "headless", "http")
+EXEC_TIER = os.environ.get("EXEC_TIER", "browser")
+# 无头浏览器的固定窗口大小（无头模式下 maximize_window 无效）
+HEADLESS_WINDOW_SIZE = os.environ.get("HEADLESS_WINDOW_SIZE", "1920,1080")
+
+# 浏览器配置：default=原样加载页面并最大化窗口，fast=屏蔽下列资源、关闭动画、固定视口（browser_profile.py）
+BROWSER_PROFILES = ("default", "fast")
+BROWSER_PROFILE = os.environ.get("BROWSER_PROFILE", "default")
+# 极速配置屏蔽的资源类型（image/media/font/analytics，逗号分隔）及额外的URL通配符（如 *.gif,*cdn.example.com*）
+BLOCK_RESOURCE_TYPES = os.environ.get("BLOCK_RESOURCE_TYPES", "image,media,font,analytics")
+BLOCK_URL_PATTERNS = os.environ.get("BLOCK_URL_PATTERNS", "")
+# 极速配置的固定视口大小（有头/无头一致）
+VIEWPORT_SIZE = os.environ.get("VIEWPORT_SIZE", "1366,768")
+
+# 被测商城地址（可用环境变量 BASE_URL 或 pytest --base-url / --mock-shop 切换），
+# 以及纯HTTP层使用的表单页面/提交地址（与页面上登录、注册表单的Ajax提交地址一致）
+# Excel“测试步骤”中写的是 CASE_SITE_URL，运行时会替换为 BASE_URL
+CASE_SITE_URL = "http://120.24.56.229:8082"
+BASE_URL = os.environ.get("BASE_URL", CASE_SITE_URL).rstrip("/")
+LOGIN_PAGE_PATH = "/?s=user/logininfo.html"
+LOGIN_ACTION_PATH = "/?s=user/login.html"
+REGISTER_PAGE_PATH = "/?s=user/reginfo.html"
+REGISTER_ACTION_PATH = "/?s=user/reg.html"
+# 商品搜索提交地址（首页搜索框表单，关键字字段 wd）
+SEARCH_PATH = "/?s=search/index.html"
+# 纯HTTP层连接池大小
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "20"))
+# 批量搜索校验（search_harvest.py）：并发请求数（不超过连接池大小）、每个关键字最多抓取的页数，
+# 以及商品标题视为与关键字相关的最低相关度（0~1，仅批量搜索校验使用；readexcel04 的功能断言要求完整包含关键字）
+HARVEST_WORKERS = int(os.environ.get("HARVEST_WORKERS", "16"))
+HARVEST_MAX_PAGES = int(os.environ.get("HARVEST_MAX_PAGES", "50"))
+SEARCH_MIN_RELEVANCE = float(os.environ.get("SEARCH_MIN_RELEVANCE", "0.6"))
+
+# 登录态快照：保存目录、有效期（秒），以及用于校验登录态的用户中心地址（未登录会被重定向到登录页）
+AUTH_STATE_DIR = os.environ.get("AUTH_STATE_DIR", ".auth_state")
+AUTH_STATE_TTL = int(os.environ.get("AUTH_STATE_TTL", "1800"))
+USER_CENTER_PATH = "/?s=user/index.html"
+
+# 截图策略：all=每步截图，first_last=只保留首张和最后一张，failure=仅失败时截图，off=不截图
+SCREENSHOT_MODES = ("all", "first_last", "failure", "off")
+SCREENSHOT_MODE = os.environ.get("SCREENSHOT_MODE", "all")
+# 截图存储格式（jpeg/webp/png）、压缩质量、最大宽度（超过按比例缩小）
+SCREENSHOT_FORMAT = os.environ.get("SCREENSHOT_FORMAT", "jpeg")
+SCREENSHOT_QUALITY = int(os.environ.get("SCREENSHOT_QUALITY", "70"))
+SCREENSHOT_MAX_WIDTH = int(os.environ.get("SCREENSHOT_MAX_WIDTH", "1280"))
+# 感知哈希汉明距离不超过该值的相邻截图视为重复，不再附加
+SCREENSHOT_DEDUP_DISTANCE = int(os.environ.get("SCREENSHOT_DEDUP_DISTANCE", "6"))
+
+# Allure结果写入：默认由后台线程异步写入，小文本附件按步骤合并（设为0恢复同步写入）
+ALLURE_ASYNC_WRITER = os.environ.get("ALLURE_ASYNC_WRITER", "1") != "0"
+
+# 耗时剖析：是否记录步骤/WebDriver命令/等待/页面加载耗时，数据目录，每个页面保留的最慢资源条数
+PROFILE_ENABLED = os.environ.get("PROFILE_ENABLED", "1") != "0"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", ".profile")
+PROFILE_MAX_RESOURCES = int(os.environ.get("PROFILE_MAX_RESOURCES", "30"))
+
+# 定位器注册表：记录每个元素上次成功的定位方式（跨运行复用）
+LOCATOR_CACHE_PATH = os.environ.get("LOCATOR_CACHE_PATH", ".locator_cache.json")
+
+# 本地商城替身（mock_shop.py）：每个请求注入的延迟及随机抖动（秒）
+MOCK_LATENCY = float(os.environ.get("MOCK_LATENCY", "0"))
+MOCK_JITTER = float(os.environ.get("MOCK_JITTER", "0"))
+# 本地商城替身搜索结果每页商品数
+MOCK_PAGE_SIZE = int(os.environ.get("MOCK_PAGE_SIZE", "20"))
+
+# 增量执行：运行状态文件（用例指纹、历史结果和耗时），默认用例选择方式（all=全部，changed=只跑有变化/上次失败的）
+RUN_STATE_PATH = os.environ.get("RUN_STATE_PATH", ".run_state.json")
+RUN_SELECT = os.environ.get("RUN_SELECT", "all")
+
+# 失败重试：单个用例遇到瞬时错误（超时/元素失效/驱动崩溃）时最多重试次数，每次运行的重试总预算
+RETRY_MAX = int(os.environ.get("RETRY_MAX", "1"))
+RETRY_BUDGET = int(os.environ.get("RETRY_BUDGET", "5"))
+# 隔离：不稳定评分（0~1，近期越常“重试后才通过”越高）达到阈值的用例，run=照常执行（只报告），
+# skip=隔离跳过（每跳过一次评分衰减一次，降到阈值以下后重新执行复查）
+QUARANTINE_SCORE = float(os.environ.get("QUARANTINE_SCORE", "0.5"))
+QUARANTINE_MODE = os.environ.get("QUARANTINE_MODE", "run")
+
+# 性能预算：超出Excel中“页面加载预算(ms)”/“步骤耗时预算(ms)”时 fail=用例失败，degrade=标记性能降级，off=不检查
+BUDGET_MODE = os.environ.get("BUDGET_MODE", "degrade")
+# 历史基准：最近N次运行的中位数；比基准慢出该比例且超出该毫秒数才算明显变慢（过滤小耗时的抖动）
+BUDGET_BASELINE_RUNS = int(os.environ.get("BUDGET_BASELINE_RUNS", "10"))
+BUDGET_REGRESSION_RATIO = float(os.environ.get("BUDGET_REGRESSION_RATIO", "0.5"))
+BUDGET_REGRESSION_MIN_MS = float(os.environ.get("BUDGET_REGRESSION_MIN_MS", "300"))
+
+# 测试结果库（results_db.py）：SQLite文件；run.py 执行后是否打开完整Allure报告（默认只输出汇总/趋势）
+RESULTS_DB_PATH = os.environ.get("RESULTS_DB_PATH", ".results.db")
+ALLURE_FULL_REPORT = os.environ.get("ALLURE_FULL_REPORT", "0") == "1"
+
+# 框架自身基准测试（harness_bench.py）：合成用例表、历史结果和基准的目录；比基准慢出该比例视为退化
+BENCH_DIR = os.environ.get("BENCH_DIR", ".bench")
+BENCH_REGRESSION_RATIO = float(os.environ.get("BENCH_REGRESSION_RATIO", "0.2"))
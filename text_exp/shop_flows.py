@@ -0,0 +1,115 @@
+import screenshots
+import settings
+
+
+# --------------------------
+# 浏览器执行层：登录/注册页面操作（元素定位见 locators.py：CSS优先，原XPath兜底）
+# 纯HTTP执行层（http_tier.HttpShopFlow）提供相同的方法，用例代码不区分执行层级
+# --------------------------
+# add_cookie 支持的字段（get_cookies 返回的 sameSite 等字段部分浏览器不接受）
+COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry")
+
+# 每个步骤的等待总预算（秒），以及提交表单后等待跳转的最长时间
+STEP_WAIT_BUDGET = 20
+REDIRECT_TIMEOUT = 3
+# 提交失败时显示的提示（ShopXO前端 Prompt() 弹出的提示框；商城替身表单下方的提示）：出现即不再等待跳转
+FORM_MESSAGE_SELECTOR = ".common-prompt, .form-tips"
+
+
+class BrowserShopFlow:
+    """浏览器执行层（完整浏览器/无头浏览器共用）"""
+
+    tier = "browser"
+
+    def __init__(self, driver, waiter):
+        self.driver = driver
+        self.waiter = waiter
+
+    @property
+    def current_url(self):
+        return self.driver.current_url
+
+    def budget(self, step):
+        return self.waiter.budget(step, STEP_WAIT_BUDGET)
+
+    def screenshot(self, name, force=False):
+        """按截图策略截图；force=True 用于异常/失败截图"""
+        screenshots.capture(self.driver, name, force)
+
+    def open(self, url):
+        self.driver.get(url)
+        self.waiter.document_ready()  # 等待页面加载完成（替代固定休眠）
+
+    # ---- 登录 ----
+    def goto_login(self):
+        self.waiter.clickable("nav.login_link").click()
+        # 等待登录表单出现（即进入登录页）
+        self.waiter.present("login.username")
+
+    def input_login_username(self, username):
+        self._fill("login.username", username)
+
+    def input_login_password(self, password):
+        self._fill("login.password", password)
+
+    def submit_login(self):
+        self._submit("login.submit")
+
+    # ---- 注册 ----
+    def goto_register(self):
+        self.waiter.clickable("nav.register_link").click()
+        self.waiter.present("register.username")
+
+    def input_register_username(self, username):
+        self._fill("register.username", username, clear=False)
+
+    def input_register_password(self, password):
+        self._fill("register.password", password, clear=False)
+
+    def set_agreement(self, agree):
+        """按用例步骤勾选/不勾选协议，返回协议状态说明"""
+        checkbox = self.waiter.clickable("register.agreement")
+        if not agree:
+            return "按用例步骤不勾选协议"
+        if checkbox.is_selected():
+            return "协议已默认勾选，无需操作"
+        checkbox.click()
+        return "已勾选协议"
+
+    def submit_register(self):
+        self._submit("register.submit")
+
+    # ---- 登录态快照（auth_state使用） ----
+    def export_state(self):
+        local_storage = self.driver.execute_script(
+            "var data = {}; for (var i = 0; i < localStorage.length; i++) {"
+            " var key = localStorage.key(i); data[key] = localStorage.getItem(key); } return data;")
+        return {"cookies": self.driver.get_cookies(), "local_storage": local_storage or {}}
+
+    def import_state(self, state):
+        # 必须先打开目标站点，Cookie/localStorage才能写入对应域名
+        self.open(settings.BASE_URL)
+        for cookie in state["cookies"]:
+            self.driver.add_cookie({key: value for key, value in cookie.items() if key in COOKIE_FIELDS})
+        if state.get("local_storage"):
+            self.driver.execute_script(
+                "var data = arguments[0]; for (var key in data) { localStorage.setItem(key, data[key]); }",
+                state["local_storage"])
+        self.driver.refresh()
+        self.waiter.document_ready()
+
+    # ---- 公共操作 ----
+    def _fill(self, name, value, clear=True):
+        element = self.waiter.present(name)
+        if clear:
+            element.clear()  # 清空后输入，避免残留
+        element.send_keys(value)
+        self.waiter.value_to_be(element, value)  # 确认输入已生效
+
+    def _submit(self, button_name):
+        button = self.waiter.clickable(button_name)
+        page_url = self.driver.current_url
+        button.click()
+        # 先等请求结束，再等跳转或失败提示（先出现哪个算哪个；都没有时最多等 REDIRECT_TIMEOUT，超时不报错）
+        self.waiter.network_idle(timeout=10)
+        self.waiter.url_changes_or_message(page_url, FORM_MESSAGE_SELECTOR, timeout=REDIRECT_TIMEOUT, required=False)
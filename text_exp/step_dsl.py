@@ -0,0 +1,142 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import settings
+
+
+# --------------------------
+# “测试步骤”列的步骤语法：每行一个步骤，格式为  [序号.] 关键字[:或：参数]
+# 例：1. 访问登录页面:http://120.24.56.229:8082   /   2. 在搜索框商品名称：华为   /   4.勾选同意协议
+# 编译器把整段步骤文本编译成动作计划（按文本缓存），调度器按动作名分发到处理函数
+# --------------------------
+# 序号部分兼容 “1.” “1、” “1．”；关键字与参数之间兼容半角和全角冒号（只按第一个冒号切分，URL中的冒号不受影响）
+STEP_PATTERN = re.compile(r"^\s*(?:\d+\s*[.、．]\s*)?(?P<keyword>[^:：]+?)\s*(?:[:：]\s*(?P<arg>.*?))?\s*$")
+EMPTY_ARG = "空"  # 参数写“空”表示空输入
+
+# 关键字 -> 动作名（新增关键字只需在这里登记，或调用 register_keyword）
+KEYWORDS = {
+    "访问登录页面": "open_url",
+    "访问注册页面": "open_url",
+    "进入首页": "open_url",
+    "进入登录页面": "goto_login",
+    "输入用户名": "input_username",
+    "输入符合规则的用户名": "input_username",
+    "输入密码": "input_password",
+    "输入符合规则的密码": "input_password",
+    "勾选同意协议": "check_agreement",
+    "不勾选同意协议": "uncheck_agreement",
+    "点击登录按钮": "submit_login",
+    "点击注册按钮": "submit_register",
+    "在搜索框商品名称": "input_search",
+    "点击搜索按钮": "submit_search",
+}
+
+Action = namedtuple("Action", ["keyword", "action", "arg", "text"])
+
+
+class StepPlan:
+    """编译后的动作计划：按步骤顺序排列的 Action 列表，并可按动作名直接取参数"""
+
+    def __init__(self, actions):
+        self.actions = tuple(actions)
+        self._first = {}
+        for action in self.actions:
+            self._first.setdefault(action.action, action)
+
+    def has(self, action):
+        return action in self._first
+
+    def arg(self, action, default=None):
+        """取某个动作的参数（同一动作出现多次时取第一次）；步骤中没有该动作时返回default"""
+        found = self._first.get(action)
+        return default if found is None or found.arg is None else found.arg
+
+    def unknown(self):
+        """未登记关键字的步骤（用于提示用例书写问题）"""
+        return [action.text for action in self.actions if action.action is None]
+
+    def __iter__(self):
+        return iter(self.actions)
+
+    def __len__(self):
+        return len(self.actions)
+
+
+def rebase_url(url):
+    """用例步骤中写的站点地址（settings.CASE_SITE_URL）替换为当前被测地址（settings.BASE_URL）"""
+    site = settings.CASE_SITE_URL
+    if url and (url == site or url.startswith((site + "/", site + "?"))):
+        return settings.BASE_URL + url[len(site):]
+    return url
+
+
+def _resolve(keyword):
+    action = KEYWORDS.get(keyword)
+    if action is not None:
+        return action
+    # 兼容关键字前后有补充描述的写法：取包含在步骤中的最长关键字（“不勾选同意协议”优先于“勾选同意协议”）
+    for known in sorted(KEYWORDS, key=len, reverse=True):
+        if known in keyword:
+            return KEYWORDS[known]
+    return None
+
+
+@lru_cache(maxsize=4096)
+def compile_steps(steps_text):
+    """
+    编译步骤文本为动作计划（同样的步骤文本只编译一次；切换 settings.BASE_URL 后需调用 compile_steps.cache_clear()）
+    :param steps_text: Excel“测试步骤”单元格内容（多行）
+    """
+    actions = []
+    for line in str(steps_text or "").splitlines():
+        match = STEP_PATTERN.match(line)
+        if not line.strip() or not match:
+            continue
+        keyword, arg = match.group("keyword"), match.group("arg")
+        if arg is not None and arg.lower() == EMPTY_ARG:
+            arg = ""
+        action = _resolve(keyword)
+        if action == "open_url":
+            arg = rebase_url(arg)
+        actions.append(Action(keyword, action, arg, line.strip()))
+    return StepPlan(actions)
+
+
+def register_keyword(keyword, action):
+    """登记新关键字（已编译的计划缓存随之失效）"""
+    KEYWORDS[keyword] = action
+    compile_steps.cache_clear()
+
+
+class StepDispatcher:
+    """
+    动作调度器：按动作名把计划中的每一步分发给处理函数
+    用法：
+        steps = StepDispatcher()
+        @steps.on("open_url")
+        def _open(driver, arg): ...
+        steps.run(compile_steps(text), driver)
+    """
+
+    def __init__(self):
+        self._handlers = {}
+
+    def on(self, action):
+        def decorator(func):
+            self._handlers[action] = func
+            return func
+        return decorator
+
+    def run(self, plan, driver, strict=False):
+        """
+        执行计划
+        :param strict: True时遇到没有处理函数的步骤抛异常；默认跳过（与原来的 if/elif 链行为一致）
+        """
+        for action in plan:
+            handler = self._handlers.get(action.action)
+            if handler is None:
+                if strict:
+                    raise ValueError(f"无法执行的步骤：{action.text}")
+                continue
+            handler(driver, action.arg)
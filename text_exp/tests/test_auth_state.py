@@ -0,0 +1,95 @@
+import os
+import time
+
+import pytest
+
+import auth_state
+import mock_shop
+import settings
+from http_tier import HttpShopFlow
+
+
+# --------------------------
+# 登录态快照（auth_state.py）：对本地商城替身走纯HTTP执行层，验证复用、过期和服务端拒绝后重新登录
+# --------------------------
+USERNAME, PASSWORD = "number15", mock_shop.DEFAULT_USERS["number15"]
+EXCEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "text_cases.xlsx")
+
+
+@pytest.fixture
+def mock_site(monkeypatch, tmp_path):
+    """启动商城替身并把被测地址、快照目录指向它；清空进程内缓存，统计真正走UI登录的次数"""
+    shop = mock_shop.start()
+    monkeypatch.setattr(settings, "BASE_URL", shop.base_url)
+    monkeypatch.setattr(settings, "EXEC_TIER", "http")
+    monkeypatch.setattr(settings, "AUTH_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EXCEL_PATH", EXCEL_PATH)  # 默认账号取自Sheet1，不依赖当前目录
+    monkeypatch.setattr(auth_state, "_memo", {})
+    logins = []
+    login_and_capture = auth_state.login_and_capture
+
+    def counting_login(*args):
+        logins.append(args[1])
+        return login_and_capture(*args)
+
+    monkeypatch.setattr(auth_state, "login_and_capture", counting_login)
+    shop.logins = logins
+    yield shop
+    shop.stop()
+
+
+def _logged_in(flow):
+    flow.open(flow.base_url + settings.USER_CENTER_PATH)
+    return settings.LOGIN_PAGE_PATH.lstrip("/") not in flow.current_url
+
+
+def _authenticate():
+    flow = HttpShopFlow()
+    auth_state.authenticate(flow, USERNAME, PASSWORD)
+    return flow
+
+
+def test_first_call_logs_in_and_saves_snapshot(mock_site):
+    flow = _authenticate()
+    assert mock_site.logins == [USERNAME]
+    assert _logged_in(flow)
+    assert auth_state.load_state(USERNAME)["username"] == USERNAME
+
+
+def test_snapshot_is_reused_in_process_and_from_disk(mock_site):
+    _authenticate()
+    assert _logged_in(_authenticate())       # 进程内缓存
+    auth_state._memo.clear()
+    assert _logged_in(_authenticate())       # 磁盘快照（服务端校验通过）
+    assert mock_site.logins == [USERNAME]
+
+
+def test_expired_snapshot_logs_in_again(mock_site):
+    _authenticate()
+    state = auth_state.load_state(USERNAME)
+    state["captured_at"] = time.time() - settings.AUTH_STATE_TTL - 1
+    auth_state.save_state(state)
+    auth_state._memo.clear()
+    assert _logged_in(_authenticate())
+    assert mock_site.logins == [USERNAME, USERNAME]
+
+
+def test_snapshot_rejected_by_server_logs_in_again(mock_site):
+    _authenticate()
+    mock_site.sessions.clear()               # 服务端会话失效：用户中心重定向到登录页
+    auth_state._memo.clear()
+    assert not auth_state.validate_on_server(auth_state.load_state(USERNAME))
+    assert _logged_in(_authenticate())
+    assert mock_site.logins == [USERNAME, USERNAME]
+
+
+def test_invalidate_removes_snapshot(mock_site, tmp_path):
+    _authenticate()
+    auth_state.invalidate(USERNAME)
+    assert auth_state.load_state(USERNAME) is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_logged_in_shop_fixture(mock_site, logged_in_shop):
+    assert isinstance(logged_in_shop, HttpShopFlow)
+    assert _logged_in(logged_in_shop)
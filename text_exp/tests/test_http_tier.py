@@ -0,0 +1,46 @@
+import pytest
+
+import http_tier
+import mock_shop
+import settings
+from http_tier import HttpShopFlow
+
+
+# --------------------------
+# 纯HTTP执行层（http_tier.py）：用例之间复用共享连接池中的TCP连接，Cookie互不影响
+# --------------------------
+@pytest.fixture
+def site(monkeypatch):
+    shop = mock_shop.start()
+    monkeypatch.setattr(settings, "BASE_URL", shop.base_url)
+    http_tier.close_shared_adapter()
+    yield shop
+    http_tier.close_shared_adapter()
+    shop.stop()
+
+
+def _login(username, password):
+    flow = HttpShopFlow()
+    flow.goto_login()
+    flow.input_login_username(username)
+    flow.input_login_password(password)
+    flow.submit_login()
+    return flow
+
+
+def test_flows_reuse_pooled_connections(site):
+    for _ in range(2):
+        flow = _login("number15", mock_shop.DEFAULT_USERS["number15"])
+        assert flow.current_url.rstrip("/") == site.base_url
+        flow.close()
+    assert site.requests == 4
+    assert site.connections == 1
+
+
+def test_closed_flow_keeps_no_cookies(site):
+    flow = _login("number15", mock_shop.DEFAULT_USERS["number15"])
+    assert len(flow.session.cookies)
+    flow.close()
+    assert not len(flow.session.cookies)
+    flow.open(site.base_url + settings.USER_CENTER_PATH)
+    assert settings.LOGIN_PAGE_PATH.lstrip("/") in flow.current_url
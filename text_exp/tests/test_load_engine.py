@@ -0,0 +1,88 @@
+import asyncio
+import os
+import statistics
+
+import pytest
+
+import load_engine
+import mock_shop
+from load_engine import Flow, LoadEngine, LoadStats, Sample, arrival_times, percentile
+
+EXCEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "text_cases.xlsx")
+
+
+# --------------------------
+# 压测引擎（load_engine.py）：分位数、开环模型的到达过程和实际发起的流程数
+# --------------------------
+def test_percentile_interpolates_like_jmeter():
+    values = list(range(1, 11))
+    assert percentile(values, 50) == 5.5
+    assert percentile(values, 90) == 9.9
+    assert percentile(values, 99) == 10.0
+    assert percentile(values, 1) == 1.0
+    assert percentile([42], 95) == 42.0
+
+
+def test_statistics_summary():
+    stats = LoadStats()
+    stats.add("登录-提交", 0.0, 0.1, True, 100, 50)
+    stats.add("登录-提交", 0.1, 0.4, False, 0, 50)
+    summary = stats.statistics()
+    assert set(summary) == {"Total", "登录-提交"}
+    row = summary["登录-提交"]
+    assert row["sampleCount"] == 2
+    assert row["errorPct"] == 50.0
+    assert row["meanResTime"] == pytest.approx(200.0)
+    assert LoadStats().statistics() == {}
+
+
+def test_arrivals_are_sorted_within_duration_and_reproducible():
+    times = list(arrival_times(20, 2, ramp_up=1, seed=7))
+    assert times == sorted(times)
+    assert all(0 < t < 2 for t in times)
+    assert times == list(arrival_times(20, 2, ramp_up=1, seed=7))
+
+
+@pytest.mark.parametrize("ramp_up, expected", [(0, 40), (1, 30)])
+def test_arrival_counts_match_the_integrated_rate(ramp_up, expected):
+    # 速率20/秒、持续2秒：无加压时期望40次；加压1秒（线性从0到20）时期望 10 + 20 = 30 次
+    counts = [len(list(arrival_times(20, 2, ramp_up=ramp_up, seed=seed))) for seed in range(200)]
+    assert statistics.mean(counts) == pytest.approx(expected, rel=0.05)
+    assert min(counts) > expected / 3  # 不会出现一次到达间隔跨过整个加压阶段的情况
+
+
+def test_ramp_up_does_not_stall_on_a_long_first_gap():
+    assert len(list(arrival_times(20, 2, ramp_up=1, seed=2))) > 15
+
+
+def test_ramp_up_thins_early_arrivals():
+    early = late = 0
+    for seed in range(200):
+        for t in arrival_times(20, 2, ramp_up=1, seed=seed):
+            early += t < 0.5
+            late += 1.5 <= t
+    assert early < late / 2  # 加压前半段平均速率只有峰值的1/4
+
+
+@pytest.fixture
+def shop():
+    shop = mock_shop.start()
+    yield shop
+    shop.stop()
+
+
+def test_open_model_starts_one_flow_per_arrival(shop, monkeypatch):
+    monkeypatch.setattr(load_engine, "httpx", None)  # requests+线程池（httpx为可选依赖）
+    flow = Flow("Search-001", [Sample("搜索-打开首页", "GET", shop.base_url + "/", None)])
+    engine = LoadEngine([flow], users=4)
+    stats = asyncio.run(engine.run_open(rate=40, duration=0.5, ramp_up=0.2, seed=3))
+    assert len(stats) == len(list(arrival_times(40, 0.5, ramp_up=0.2, seed=3)))
+    assert all(row[3] for row in stats.samples["搜索-打开首页"])
+
+
+def test_open_model_flows_share_the_engine_pool(shop, monkeypatch):
+    monkeypatch.setattr(load_engine, "httpx", None)
+    flows = load_engine.build_flows(["Sheet3"], excel_path=EXCEL_PATH, base_url=shop.base_url)
+    stats = asyncio.run(LoadEngine(flows, users=4).run_open(rate=50, duration=0.6, seed=1))
+    assert shop.requests == len(stats) > 4
+    assert shop.connections <= 4  # 连接池大小=虚拟用户数，流程结束不关闭连接
@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+import perf_budget
+import settings
+from perf_budget import Baseline, check, parse_page_budget, parse_step_budget, step_limit
+
+
+# --------------------------
+# 性能预算（perf_budget.py）：单元格解析（含空单元格）、步骤上限匹配、超出预算与比基准变慢的判断
+# --------------------------
+@pytest.mark.parametrize("value", [None, math.nan, "", "  "])
+def test_blank_cells_mean_no_budget(value):
+    assert parse_page_budget(value) is None
+    assert parse_step_budget(value) == []
+
+
+def test_page_budget():
+    assert parse_page_budget(3000) == 3000.0
+    assert parse_page_budget(" 2500.5 ") == 2500.5
+
+
+def test_step_budget_entries():
+    assert parse_step_budget(8000) == [(None, 8000.0)]
+    assert parse_step_budget("点击登录按钮=3000;8000") == [("点击登录按钮", 3000.0), (None, 8000.0)]
+    # 全角等号/分号、换行分隔、多余的分隔符
+    assert parse_step_budget("输入用户名＝500；\n点击登录按钮 = 3000;") == [("输入用户名", 500.0), ("点击登录按钮", 3000.0)]
+
+
+def test_step_limit_prefers_keyword_then_default():
+    entries = parse_step_budget("点击登录按钮=3000;8000")
+    assert step_limit(entries, "步骤5：点击登录按钮") == 3000.0
+    assert step_limit(entries, "步骤1：访问登录页面") == 8000.0
+    assert step_limit(parse_step_budget("点击登录按钮=3000"), "步骤1：访问登录页面") is None
+
+
+class _Recorder:
+    """最小的用例剖析记录器：只提供 check() 用到的 case 和 rows()"""
+
+    def __init__(self, pages=(), steps=()):
+        self.case = "readexcel02.py::test_login[Login-001]"
+        self._rows = {"pages": [{"url": url, "load": load} for url, load in pages],
+                      "steps": [{"step": step, "duration": seconds} for step, seconds in steps]}
+
+    def rows(self, table):
+        return self._rows[table]
+
+
+def test_check_reports_breaches_and_skips_unfinished_pages():
+    recorder = _Recorder(pages=[("http://shop/?s=user/logininfo.html", 4200), ("http://shop/", 0)],
+                         steps=[("点击登录按钮", 3.5), ("输入用户名", 0.2)])
+    budgets = {"page_load": 3000.0, "steps": parse_step_budget("点击登录按钮=3000;8000")}
+    breaches, regressions, measured = check(recorder, budgets, Baseline([]))
+    assert len(breaches) == 2
+    assert "加载 4200ms > 预算 3000ms" in breaches[0]
+    assert "耗时 3500ms > 预算 3000ms" in breaches[1]
+    assert regressions == []
+    assert len(measured) == 3  # load=0 的页面（采集时未加载完）不计
+
+
+def test_regression_needs_both_ratio_and_absolute_increase(monkeypatch):
+    monkeypatch.setattr(settings, "BUDGET_REGRESSION_RATIO", 0.5)
+    monkeypatch.setattr(settings, "BUDGET_REGRESSION_MIN_MS", 300)
+    baseline = Baseline([])
+    case = _Recorder().case
+    baseline.medians = {(case, "步骤【点击登录按钮】"): 1000.0, (case, "步骤【输入用户名】"): 100.0}
+    assert baseline.regression(case, "步骤【点击登录按钮】", 1400) is None      # 未超出比例
+    assert "+80%" in baseline.regression(case, "步骤【点击登录按钮】", 1800)
+    assert baseline.regression(case, "步骤【输入用户名】", 350) is None         # 比例超出但绝对值太小
+    assert baseline.regression(case, "步骤【没有基准】", 99999) is None
+
+
+def test_budget_modes():
+    assert perf_budget.BUDGET_MODES == ("fail", "degrade", "off")
+    assert settings.BUDGET_MODE in perf_budget.BUDGET_MODES
@@ -0,0 +1,182 @@
+import os
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import case_discovery
+import case_loader
+import preflight
+from case_loader import ID_COLUMN, PAGE_BUDGET_COLUMN, STEP_BUDGET_COLUMN
+
+
+# --------------------------
+# 用例表预检（preflight.py）、与收集阶段流式读取的一致性（case_discovery.py）和解析缓存（case_loader.py）
+# --------------------------
+def _sheet(rows, columns=(ID_COLUMN, "测试步骤", "预期结果")):
+    return pd.DataFrame(rows, columns=list(columns))
+
+
+def _messages(errors):
+    return [(error["case_id"], error["column"], error["message"].split("：")[0]) for error in errors]
+
+
+def test_expand_text_is_a_cartesian_product():
+    assert case_loader.expand_text("用户名:{a|b}\n密码:{1|2}") == [
+        "用户名:a\n密码:1", "用户名:a\n密码:2", "用户名:b\n密码:1", "用户名:b\n密码:2"]
+    assert case_loader.expand_text("没有占位") == ["没有占位"]
+
+
+def test_matrix_rows_expand_with_suffixed_ids():
+    frame, errors = preflight.check_sheet("Sheet1", _sheet([
+        ["Login-001", "1.输入用户名:{number15|nubmber15}\n2.输入密码:{000|0000001}", "登录成功"],
+        ["Login-002", "1.输入用户名:x", "登录失败"],
+    ]))
+    assert errors is None
+    assert list(frame[ID_COLUMN]) == ["Login-001-1", "Login-001-2", "Login-001-3", "Login-001-4", "Login-002"]
+    assert list(frame["测试步骤"])[3] == "1.输入用户名:nubmber15\n2.输入密码:0000001"
+    assert list(frame.index) == [0, 0, 0, 0, 1]  # 保留原行号，问题记录能对应到Excel行
+
+
+def test_merged_cells_are_filled_and_text_is_normalised():
+    frame, errors = preflight.check_sheet("Sheet1", _sheet([
+        ["Login-001", " 1.输入用户名:a\r\n2.点击登录按钮 ", "登录成功"],
+        [None, None, None],
+        ["Login-002", "1.输入用户名:b", None],
+    ]))
+    assert errors is None
+    assert list(frame[ID_COLUMN]) == ["Login-001", "Login-002"]
+    assert list(frame["测试步骤"])[0] == "1.输入用户名:a\n2.点击登录按钮"
+    assert list(frame["预期结果"]) == ["登录成功", "登录成功"]
+
+
+def test_errors_name_the_excel_row_and_column():
+    _, errors = preflight.run({"Sheet1": _sheet([
+        ["Login-001", "1.访问登录页面:not-a-url", "登录成功"],
+        ["Login-001", "1.输入用户名:a", "登录成功"],
+        ["Login-002", "", "成功"],
+    ])})
+    assert {(error["row"], error["column"]) for error in errors} >= {(2, ID_COLUMN), (3, ID_COLUMN)}
+    assert ("Login-001", "测试步骤", "访问地址格式无效") in _messages(errors)
+    assert ("Login-002", "测试步骤", "测试步骤为空") in _messages(errors)
+    assert ("Login-002", "预期结果", "预期结果取值无效") in _messages(errors)
+    assert f"Sheet1 第2行 Login-001 [{ID_COLUMN}] 用例ID重复" in preflight.format_errors(errors)
+
+
+def test_missing_required_column():
+    _, errors = preflight.run({"Sheet1": _sheet([["Login-001", "1.点击登录按钮"]], columns=(ID_COLUMN, "测试步骤"))})
+    assert _messages(errors) == [("", "预期结果", "缺少必要列")]
+
+
+def test_budget_columns_are_not_inherited_from_the_previous_case():
+    frame, errors = preflight.check_sheet("Sheet1", _sheet([
+        ["Login-001", "1.点击登录按钮", "登录成功", 3000, "点击登录按钮=3000;8000"],
+        [None, None, None, None, None],
+        ["Login-002", "1.点击登录按钮", "登录失败", None, None],
+    ], columns=(ID_COLUMN, "测试步骤", "预期结果", PAGE_BUDGET_COLUMN, STEP_BUDGET_COLUMN)))
+    assert errors is None
+    budgets = frame.set_index(ID_COLUMN)
+    assert budgets.loc["Login-001", PAGE_BUDGET_COLUMN] == 3000
+    assert pd.isna(budgets.loc["Login-002", PAGE_BUDGET_COLUMN])
+    assert pd.isna(budgets.loc["Login-002", STEP_BUDGET_COLUMN])
+
+
+@pytest.mark.parametrize("page, step, ok", [
+    (3000, "8000", True),
+    (None, "点击登录按钮=3000；8000", True),
+    (-1, None, False),
+    ("很快", None, False),
+    (None, "点击登录按钮=快", False),
+])
+def test_budget_format(page, step, ok):
+    _, errors = preflight.check_sheet("Sheet1", _sheet(
+        [["Login-001", "1.点击登录按钮", "登录成功", page, step]],
+        columns=(ID_COLUMN, "测试步骤", "预期结果", PAGE_BUDGET_COLUMN, STEP_BUDGET_COLUMN)))
+    assert (errors is None) == ok
+
+
+# ---- 解析缓存 ----
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(case_loader.settings, "CASE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(case_loader, "_memo", {})
+    path = tmp_path / "cases.xlsx"
+
+    def write(*case_ids, mtime=None):
+        book = Workbook()
+        sheet = book.active
+        sheet.title = "Sheet1"
+        sheet.append([ID_COLUMN, "测试步骤", "预期结果"])
+        for case_id in case_ids:
+            sheet.append([case_id, "1.点击登录按钮", "登录成功"])
+        book.save(path)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return str(path)
+
+    return write
+
+
+def _parse_counter(monkeypatch):
+    parses = []
+    parse = case_loader._parse_workbook
+
+    def counting_parse(excel_path):
+        parses.append(excel_path)
+        return parse(excel_path)
+
+    monkeypatch.setattr(case_loader, "_parse_workbook", counting_parse)
+    return parses
+
+
+def test_cache_is_reused_until_the_file_changes(workbook, monkeypatch):
+    parses = _parse_counter(monkeypatch)
+    path = workbook("Login-001")
+    assert case_loader.load_sheet("Sheet1", path).ids() == ["Login-001"]
+    case_loader._memo.clear()
+    assert case_loader.load_sheet("Sheet1", path).ids() == ["Login-001"]
+    assert len(parses) == 1
+
+    mtime = os.stat(path).st_mtime_ns
+    workbook("Login-001", "Login-002", mtime=mtime)  # 修改时间不变，大小变化
+    assert case_loader.load_sheet("Sheet1", path).ids() == ["Login-001", "Login-002"]
+    assert len(parses) == 2
+
+
+def test_touched_file_with_same_content_keeps_the_cache(workbook, monkeypatch):
+    parses = _parse_counter(monkeypatch)
+    path = workbook("Login-001")
+    case_loader.load_workbook(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    case_loader._memo.clear()
+    assert case_loader.load_sheet("Sheet1", path).ids() == ["Login-001"]
+    assert len(parses) == 1
+
+
+def test_preflight_verdict_is_cached_per_workbook_version(workbook, monkeypatch):
+    parses = _parse_counter(monkeypatch)
+    path = workbook("Login-001", "Login-001")
+    for _ in range(2):
+        with pytest.raises(preflight.CaseValidationError, match="用例ID重复"):
+            case_loader.preflight_workbook(path)
+    assert len(parses) == 1
+    workbook("Login-001", "Login-002", mtime=os.stat(path).st_mtime_ns + 10 ** 9)
+    case_loader.preflight_workbook(path)
+    assert len(parses) == 2
+
+
+def test_streaming_discovery_matches_the_preflighted_sheet(workbook, tmp_path):
+    book = Workbook()
+    sheet = book.active
+    sheet.title = "Sheet1"
+    sheet.append([ID_COLUMN, "测试步骤", "预期结果", PAGE_BUDGET_COLUMN])
+    sheet.append(["Login-001", " 1.输入用户名:{a|b}\r\n2.点击登录按钮 ", "登录成功", 3000])
+    sheet.append([None, None, None, None])
+    sheet.append(["Login-002", "1.输入用户名:c", None, None])
+    sheet.append(["Login-003", "1.输入用户名:d", "登录失败", None])
+    path = str(tmp_path / "stream.xlsx")
+    book.save(path)
+    streamed = list(case_discovery.iter_sheet_rows("Sheet1", path))
+    assert [record[ID_COLUMN] for record in streamed] == ["Login-001-1", "Login-001-2", "Login-002", "Login-003"]
+    assert streamed == case_loader.load_sheet("Sheet1", path).records
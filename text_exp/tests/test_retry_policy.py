@@ -0,0 +1,29 @@
+from retry_policy import RetryPolicy, classify
+
+
+# --------------------------
+# 重试插件（retry_policy.py）：瞬时错误分类和重试预算
+# --------------------------
+def test_classify_transient_errors():
+    class TimeoutException(Exception):
+        pass
+
+    class WebDriverException(Exception):
+        pass
+
+    assert classify(TimeoutException()) == "等待超时"
+    assert classify(ConnectionResetError()) == "连接中断"
+    assert classify(type("SessionLost", (WebDriverException,), {})("chrome not reachable")) == "驱动崩溃"
+    assert classify(WebDriverException("element not interactable")) is None
+    assert classify(AssertionError("登录失败")) is None
+
+
+def test_retry_policy_limits_per_case_and_per_run():
+    policy = RetryPolicy(max_retries=2, budget=3)
+    assert not policy.allow(None, 0)                     # 非瞬时错误不重试
+    assert policy.allow("等待超时", 0) and policy.allow("等待超时", 1)
+    assert not policy.allow("等待超时", 2)               # 单个用例最多重试2次
+    assert policy.allow("驱动崩溃", 0)
+    assert not policy.allow("驱动崩溃", 0)               # 运行预算3次已用完
+    assert (policy.used, policy.denied) == (3, 1)
+    assert policy.reasons == {"等待超时": 2, "驱动崩溃": 1}
@@ -0,0 +1,108 @@
+import pytest
+
+import settings
+from parallel_runner import ENV_STATE_FILE
+from run_state import RunState, merge_states
+
+
+# --------------------------
+# 运行状态（run_state.py）：按指纹和上次结果选择用例，不稳定评分与隔离衰减，并行worker的结果合并
+# --------------------------
+NODE = "readexcel02.py::test_login[Login-001]"
+
+
+@pytest.fixture
+def state(tmp_path):
+    return RunState(str(tmp_path / "run_state.json"))
+
+
+def _quarantined(state, fingerprint="v1"):
+    return state.flaky_score(NODE, fingerprint) >= settings.QUARANTINE_SCORE
+
+
+def test_stable_passes_keep_the_score_at_zero(state):
+    for _ in range(5):
+        state.record(NODE, "v1", "passed", 1.0)
+    assert state.flaky_score(NODE, "v1") == 0.0
+
+
+def test_two_retried_passes_cross_the_threshold(state):
+    state.record(NODE, "v1", "passed", 1.0, retried=True)
+    assert state.flaky_score(NODE, "v1") == 0.3
+    assert not _quarantined(state)
+    state.record(NODE, "v1", "passed", 1.0, retried=True)
+    assert state.flaky_score(NODE, "v1") == 0.51
+    assert _quarantined(state)
+
+
+def test_fail_then_pass_with_unchanged_fingerprint_is_flaky(state):
+    state.record(NODE, "v1", "failed", 1.0)
+    state.record(NODE, "v1", "passed", 1.0)
+    assert state.flaky_score(NODE, "v1") == 0.3
+    assert state.cases[NODE]["flaky_runs"] == 1
+
+
+def test_changed_fingerprint_resets_the_score(state):
+    state.record(NODE, "v1", "passed", 1.0, retried=True)
+    state.record(NODE, "v1", "passed", 1.0, retried=True)
+    assert state.flaky_score(NODE, "v2") == 0.0
+    state.record(NODE, "v2", "failed", 1.0)
+    state.record(NODE, "v2", "passed", 1.0)  # 指纹变化后的首次失败 -> 通过不继承旧评分
+    assert state.flaky_score(NODE, "v2") == 0.3
+
+
+def test_skipped_quarantine_decays_until_the_case_runs_again(state):
+    for _ in range(4):
+        state.record(NODE, "v1", "passed", 1.0, retried=True)
+    skips = 0
+    while _quarantined(state):
+        state.decay(NODE)
+        skips += 1
+    assert 0 < skips <= 3
+    state.record(NODE, "v1", "passed", 1.0)  # 复查通过，评分继续下降
+    assert not _quarantined(state)
+
+
+def test_due_reason_follows_fingerprint_and_last_outcome(state):
+    assert state.due_reason(NODE, "v1") == "新增"
+    state.record(NODE, "v1", "failed", 1.0)
+    assert state.due_reason(NODE, "v1") == "上次失败"
+    state.record(NODE, "v1", "passed", 1.0)
+    assert state.due_reason(NODE, "v1") is None
+    assert state.due_reason(NODE, "v2") == "已变更"
+
+
+def test_save_merges_with_other_workers(tmp_path):
+    path = str(tmp_path / "run_state.json")
+    first, second = RunState(path), RunState(path)
+    first.record(NODE, "v1", "passed", 1.0)
+    second.record("readexcel03.py::test_register_cases[Register-001]", "v1", "failed", 2.0)
+    first.save()
+    second.save()
+    assert set(RunState(path).cases) == {NODE, "readexcel03.py::test_register_cases[Register-001]"}
+
+
+def test_parallel_workers_write_shards_merged_by_the_scheduler(tmp_path, monkeypatch):
+    path = str(tmp_path / "run_state.json")
+    history = RunState(path)
+    history.record(NODE, "v1", "failed", 1.0)
+    history.save()
+    shards = []
+    for worker, node in enumerate([NODE, "readexcel03.py::test_register_cases[Register-001]"]):
+        shards.append(str(tmp_path / f"worker-{worker}.json"))
+        monkeypatch.setenv(ENV_STATE_FILE, shards[-1])
+        state = RunState(path)   # 各worker同时启动，读到的是同一份历史
+        state.record(node, "v1", "passed", 1.0)
+        state.save()
+    monkeypatch.delenv(ENV_STATE_FILE)
+    assert RunState(path).cases[NODE]["last_outcome"] == "failed"  # worker不直接改写状态文件
+    assert merge_states(shards, path) == 2
+    cases = RunState(path).cases
+    assert cases[NODE]["last_outcome"] == "passed" and cases[NODE]["runs"] == 2
+    assert "readexcel03.py::test_register_cases[Register-001]" in cases
+
+
+def test_corrupt_state_file_means_no_history(tmp_path):
+    path = tmp_path / "run_state.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert RunState(str(path)).cases == {}
@@ -0,0 +1,79 @@
+import pytest
+
+import settings
+from step_dsl import StepDispatcher, compile_steps, rebase_url
+
+
+# --------------------------
+# 步骤编译器（step_dsl.py）：步骤文本 -> 动作计划、站点地址替换、调度
+# --------------------------
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    compile_steps.cache_clear()
+    yield
+    compile_steps.cache_clear()
+
+
+@pytest.fixture
+def local_site(monkeypatch):
+    monkeypatch.setattr(settings, "BASE_URL", "http://127.0.0.1:9000")
+    return settings.BASE_URL
+
+
+def test_numbering_and_colons():
+    plan = compile_steps("1.输入用户名:number15\n2、输入密码：0000001\n3．点击登录按钮")
+    assert [action.action for action in plan] == ["input_username", "input_password", "submit_login"]
+    assert plan.arg("input_username") == "number15"
+    assert plan.arg("input_password") == "0000001"
+    assert plan.arg("submit_login") is None
+
+
+def test_empty_argument_and_missing_action():
+    plan = compile_steps("1. 在搜索框商品名称：空\n2. 点击搜索按钮")
+    assert plan.arg("input_search") == ""
+    assert plan.arg("input_username", "默认") == "默认"
+    assert not plan.has("input_username")
+
+
+def test_longest_keyword_wins_and_unknown_steps_are_reported():
+    plan = compile_steps("1. 不勾选同意协议（默认状态）\n2. 摇一摇手机")
+    assert [action.action for action in plan] == ["uncheck_agreement", None]
+    assert plan.unknown() == ["2. 摇一摇手机"]
+
+
+def test_blank_lines_are_skipped_and_plans_are_cached():
+    text = "\n1. 点击搜索按钮\n\n"
+    assert len(compile_steps(text)) == 1
+    assert compile_steps(text) is compile_steps(text)
+    assert len(compile_steps(None)) == 0
+
+
+def test_url_keeps_its_colons_and_is_rebased(local_site):
+    plan = compile_steps(f"1. 访问登录页面:{settings.CASE_SITE_URL}/?s=user/logininfo.html")
+    assert plan.arg("open_url") == f"{local_site}/?s=user/logininfo.html"
+
+
+def test_rebase_url(local_site):
+    site = settings.CASE_SITE_URL
+    assert rebase_url(site) == local_site
+    assert rebase_url(site + "?s=search/index.html") == local_site + "?s=search/index.html"
+    # 只替换完整的站点地址：端口不同、其他站点、空值都原样返回
+    assert rebase_url(site + "1/index") == site + "1/index"
+    assert rebase_url("https://example.com/a") == "https://example.com/a"
+    assert rebase_url(None) is None
+    assert rebase_url("") == ""
+
+
+def test_dispatcher_skips_or_rejects_unhandled_steps():
+    calls = []
+    steps = StepDispatcher()
+
+    @steps.on("input_search")
+    def _input(driver, arg):
+        calls.append((driver, arg))
+
+    plan = compile_steps("1. 在搜索框商品名称：华为\n2. 点击搜索按钮")
+    steps.run(plan, "driver")
+    assert calls == [("driver", "华为")]
+    with pytest.raises(ValueError, match="点击搜索按钮"):
+        steps.run(plan, "driver", strict=True)
@@ -0,0 +1,185 @@
+import time
+from contextlib import contextmanager
+
+import allure
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import locators
+
+
+# --------------------------
+# 自适应等待：基于 WebDriverWait/expected_conditions，替代固定的 time.sleep
+# --------------------------
+DEFAULT_TIMEOUT = 15        # 单次等待默认超时（与各用例原来的 WebDriverWait(driver, 15) 一致）
+POLL_FREQUENCY = 0.1        # 轮询间隔，页面就绪后最多多等100ms
+NETWORK_IDLE_TIME = 0.5     # 连续多久没有新请求视为网络空闲
+
+# 一次取回页面状态：readyState、已加载资源数、jQuery未完成的Ajax数
+_PAGE_STATE_JS = """
+return [document.readyState,
+        performance.getEntriesByType('resource').length,
+        (window.jQuery && window.jQuery.active) || 0];
+"""
+
+
+# 页面上是否有可见且有文字的提示（表单提交失败时显示的错误信息）
+_MESSAGE_SHOWN_JS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .some(element => element.offsetParent !== null && element.textContent.trim() !== "");
+"""
+
+
+def document_ready(driver):
+    """条件：document.readyState == complete"""
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+class network_idle:
+    """条件：页面加载完成，且在 idle_time 内没有新的资源请求、没有进行中的Ajax"""
+
+    def __init__(self, idle_time=NETWORK_IDLE_TIME):
+        self.idle_time = idle_time
+        self._last_count = None
+        self._since = None
+
+    def __call__(self, driver):
+        ready, count, active = driver.execute_script(_PAGE_STATE_JS)
+        now = time.monotonic()
+        if ready != "complete" or active or count != self._last_count:
+            self._last_count = count
+            self._since = now
+            return False
+        return now - self._since >= self.idle_time
+
+
+class url_changes_or_message:
+    """条件：URL已变化（提交成功后跳转），或页面显示了提示信息（提交失败，不会再跳转），先满足哪个算哪个"""
+
+    def __init__(self, old_url, message_selector):
+        self.old_url = old_url
+        self.message_selector = message_selector
+
+    def __call__(self, driver):
+        if driver.current_url != self.old_url:
+            return "跳转"
+        return "提示" if driver.execute_script(_MESSAGE_SHOWN_JS, self.message_selector) else False
+
+
+class value_to_be:
+    """条件：输入框的value等于期望值（send_keys完成后确认输入已生效）"""
+
+    def __init__(self, element, value):
+        self.element = element
+        self.value = value
+
+    def __call__(self, driver):
+        return self.element.get_attribute("value") == self.value
+
+
+class SmartWait:
+    """
+    等待引擎：按条件等待（而非固定休眠），支持按步骤设置超时预算，并记录每次等待的实际耗时
+    用法：
+        with waiter.budget("1. 访问首页", 10):
+            waiter.document_ready()
+    """
+
+    def __init__(self, driver, default_timeout=DEFAULT_TIMEOUT, poll_frequency=POLL_FREQUENCY):
+        self.driver = driver
+        self.default_timeout = default_timeout
+        self.poll_frequency = poll_frequency
+        self.records = []         # 每次等待的记录：步骤、条件、耗时、超时、是否满足
+        self._step = ""
+        self._deadline = None
+
+    @contextmanager
+    def budget(self, step, seconds=None):
+        """为一个步骤设置等待总预算（秒），步骤内所有等待共享该预算"""
+        previous = (self._step, self._deadline)
+        self._step = step
+        self._deadline = time.monotonic() + seconds if seconds else None
+        try:
+            yield self
+        finally:
+            self._step, self._deadline = previous
+
+    def _timeout(self, timeout):
+        timeout = timeout or self.default_timeout
+        if self._deadline is not None:
+            timeout = min(timeout, self._deadline - time.monotonic())
+            if timeout <= 0:
+                raise TimeoutException(f"步骤【{self._step}】等待预算已用完")
+        return timeout
+
+    def until(self, condition, description, timeout=None, required=True):
+        """
+        等待条件满足并记录耗时
+        :param required: False时超时不抛异常，返回False（用于“可能发生”的跳转等）
+        """
+        timeout = self._timeout(timeout)
+        started = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+            self._record(description, started, timeout, True)
+            return result
+        except TimeoutException:
+            self._record(description, started, timeout, False)
+            if required:
+                raise TimeoutException(f"等待超时（{timeout:.1f}s）：{description}")
+            return False
+
+    def _record(self, description, started, timeout, ok):
+        self.records.append({
+            "step": self._step,
+            "condition": description,
+            "elapsed": time.monotonic() - started,
+            "timeout": timeout,
+            "ok": ok,
+        })
+
+    # ---- 常用条件 ----
+    def document_ready(self, timeout=None):
+        return self.until(document_ready, "页面加载完成", timeout)
+
+    def network_idle(self, timeout=None, idle_time=NETWORK_IDLE_TIME):
+        return self.until(network_idle(idle_time), "网络空闲", timeout)
+
+    def url_changes(self, old_url, timeout=None, required=True):
+        return self.until(EC.url_changes(old_url), f"URL变化（原：{old_url}）", timeout, required)
+
+    def url_changes_or_message(self, old_url, message_selector, timeout=None, required=True):
+        """等待跳转或提示信息出现；返回 "跳转"/"提示"，required=False 时超时返回False"""
+        return self.until(url_changes_or_message(old_url, message_selector),
+                          f"URL变化或出现提示（原：{old_url}）", timeout, required)
+
+    def url_to_be(self, url, timeout=None):
+        return self.until(EC.url_to_be(url), f"URL等于 {url}", timeout)
+
+    def present(self, locator, timeout=None):
+        """locator 可以是 (By, 表达式)，也可以是定位器注册表中的元素名"""
+        if isinstance(locator, str):
+            return self.until(locators.located(locator), f"元素出现 {locator}", timeout)
+        return self.until(EC.presence_of_element_located(locator), f"元素出现 {locator[1]}", timeout)
+
+    def clickable(self, locator, timeout=None):
+        if isinstance(locator, str):
+            return self.until(locators.located(locator, clickable=True), f"元素可点击 {locator}", timeout)
+        return self.until(EC.element_to_be_clickable(locator), f"元素可点击 {locator[1]}", timeout)
+
+    def value_to_be(self, element, value, timeout=None):
+        return self.until(value_to_be(element, value), f"输入值为 {value!r}", timeout)
+
+    # ---- 报告 ----
+    def summary(self):
+        lines = [f"{'✅' if r['ok'] else '⏰'} [{r['step']}] {r['condition']}："
+                 f"{r['elapsed'] * 1000:.0f}ms / 超时{r['timeout']:.1f}s" for r in self.records]
+        total = sum(r["elapsed"] for r in self.records)
+        lines.append(f"合计等待：{total * 1000:.0f}ms（{len(self.records)} 次）")
+        return "\n".join(lines)
+
+    def attach(self):
+        """把等待耗时记录附加到Allure报告"""
+        if self.records:
+            allure.attach(self.summary(), "等待耗时统计", allure.attachment_type.TEXT)